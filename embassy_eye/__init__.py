@@ -2,8 +2,14 @@
 embassy_eye package exposing automation helpers for embassy appointment scheduling.
 """
 
-# Backward compatibility: import from Hungary config
-from .scrapers.hungary.config import DEFAULT_VALUES, FIELD_MAP
-
 __all__ = ["DEFAULT_VALUES", "FIELD_MAP"]
 
+
+def __getattr__(name):
+    # Backward compatibility: re-export from Hungary config, resolved on first access
+    if name in __all__:
+        from .scrapers.hungary import config
+
+        return getattr(config, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
@@ -11,17 +11,20 @@ from .form_helpers import (
     fill_select_dropdowns,
     fill_textareas,
 )
-from .modal_checker import check_appointment_availability, detect_blocked_ip
+from .modal_checker import check_appointment_availability, detect_blocked_ip, wait_for_form_or_block
 from .webdriver_utils import (
+    ProxyConnectionError,
     create_driver,
     get_full_page_screenshot,
     get_ip_from_chrome,
     inspect_form_fields,
     navigate_to_booking_page,
+    quit_driver,
     scroll_to_element,
 )
 
 __all__ = [
+    "ProxyConnectionError",
     "check_appointment_availability",
     "click_next_button",
     "create_driver",
@@ -36,8 +39,10 @@ __all__ = [
     "get_ip_from_chrome",
     "inspect_form_fields",
     "navigate_to_booking_page",
+    "quit_driver",
     "scroll_to_element",
     "select_consulate_option",
     "select_visa_type_option",
+    "wait_for_form_or_block",
 ]
 
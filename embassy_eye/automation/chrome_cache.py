@@ -0,0 +1,220 @@
+"""
+Chrome version and patched chromedriver cache.
+
+Detecting the Chrome version means spawning `google-chrome --version`, and
+undetected-chromedriver patches a fresh driver binary for every new driver.
+Both only change when Chrome is upgraded. This module records the version in
+EMBASSY_EYE_CACHE_DIR/chrome/index.json, keyed by the Chrome binary's path and
+mtime, and keeps one patched chromedriver per Chrome major version next to it.
+create_driver passes that binary to uc.Chrome, which sees it is already
+patched and skips the work.
+
+Pre-warm at image build time (run as the user that runs the scraper):
+
+    python -m embassy_eye.automation.chrome_cache
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import undetected_chromedriver as uc
+    UC_AVAILABLE = True
+except ImportError:
+    UC_AVAILABLE = False
+
+from ..config.settings import get_settings
+from ..storage.cache import get_cache_dir
+from ..telemetry import get_logger
+
+logger = get_logger(__name__)
+
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+VERSION_TIMEOUT_S = 5
+VERSION_REGEX = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+_lock = threading.Lock()
+_installs: Dict[str, "ChromeInstall"] = {}
+
+
+@dataclass
+class ChromeInstall:
+    """A Chrome binary as it was when last inspected."""
+
+    binary: str
+    mtime_ns: int
+    version: str
+    version_main: int
+    driver_path: Optional[str] = None
+
+
+def find_chrome_binary() -> Optional[str]:
+    """CHROME_BIN if set, else the first Chrome/Chromium on PATH; resolved to the real file."""
+    candidates = [get_settings().chrome_bin] + [shutil.which(name) for name in CHROME_BINARIES]
+    for candidate in candidates:
+        if candidate and os.path.isfile(candidate):
+            return os.path.realpath(candidate)
+    return None
+
+
+def _index_path() -> Path:
+    return get_cache_dir("chrome") / "index.json"
+
+
+def _load_index() -> Dict[str, dict]:
+    try:
+        return json.loads(_index_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index: Dict[str, dict]) -> None:
+    path = _index_path()
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=".index.")
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        json.dump(index, handle, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _store(install: ChromeInstall) -> None:
+    index = _load_index()
+    index[install.binary] = asdict(install)
+    _save_index(index)
+    _installs[install.binary] = install
+
+
+def _run_version(binary: str) -> Optional[str]:
+    try:
+        output = subprocess.check_output(
+            [binary, "--version"], stderr=subprocess.STDOUT, timeout=VERSION_TIMEOUT_S
+        ).decode("utf-8", "replace")
+    except (subprocess.TimeoutExpired, subprocess.CalledProcessError, OSError):
+        return None
+    match = VERSION_REGEX.search(output)
+    return match.group(0) if match else None
+
+
+def get_chrome_install(binary: Optional[str] = None) -> Optional[ChromeInstall]:
+    """
+    Return the cached version info for the Chrome binary, detecting it only after an upgrade.
+
+    Returns None when no Chrome binary is found or its version cannot be read.
+    """
+    binary = binary or find_chrome_binary()
+    if not binary:
+        return None
+    try:
+        mtime_ns = os.stat(binary).st_mtime_ns
+    except OSError:
+        return None
+
+    with _lock:
+        cached = _installs.get(binary)
+        if cached and cached.mtime_ns == mtime_ns:
+            return cached
+        entry = _load_index().get(binary)
+        if entry and entry.get("mtime_ns") == mtime_ns:
+            install = ChromeInstall(**entry)
+            _installs[binary] = install
+            return install
+
+        version = _run_version(binary)
+        if not version:
+            return None
+        install = ChromeInstall(binary=binary, mtime_ns=mtime_ns, version=version,
+                                version_main=int(version.split(".")[0]))
+        _store(install)
+        logger.info(f"  Detected Chrome {version} ({binary})")
+        return install
+
+
+def _system_driver(version_main: int) -> Optional[str]:
+    """The chromedriver installed with the image, if it matches the Chrome major version."""
+    for candidate in (get_settings().chromedriver_path, shutil.which("chromedriver")):
+        if candidate and os.path.isfile(candidate):
+            version = _run_version(candidate)
+            if version and int(version.split(".")[0]) == version_main:
+                return candidate
+    return None
+
+
+def _download_driver(version_main: int) -> Optional[str]:
+    """Let undetected-chromedriver fetch a matching driver into its own data directory."""
+    patcher = uc.Patcher(version_main=version_main)
+    patcher.auto()
+    return patcher.executable_path if os.path.isfile(patcher.executable_path) else None
+
+
+def get_patched_driver(install: ChromeInstall) -> Optional[str]:
+    """
+    Return a patched chromedriver for the install's major version, building it on first use.
+
+    Returns None when undetected-chromedriver is missing or patching fails, in
+    which case uc.Chrome falls back to patching a driver of its own.
+    """
+    if not UC_AVAILABLE:
+        return None
+    if install.driver_path and os.path.isfile(install.driver_path):
+        return install.driver_path
+
+    target = get_cache_dir("chrome") / f"chromedriver-{install.version_main}"
+    with _lock:
+        if not target.is_file():
+            try:
+                source = _system_driver(install.version_main) or _download_driver(install.version_main)
+                if not source:
+                    return None
+                # Patch a private copy, then move it into place so concurrent runs never see a half-patched file
+                fd, tmp_path = tempfile.mkstemp(dir=str(target.parent), prefix=f".{target.name}.")
+                os.close(fd)
+                try:
+                    shutil.copy2(source, tmp_path)
+                    os.chmod(tmp_path, 0o755)
+                    uc.Patcher(executable_path=tmp_path, version_main=install.version_main).auto()
+                    os.replace(tmp_path, target)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+            except Exception as exc:
+                logger.warning(f"  Could not prepare a cached chromedriver ({exc})")
+                return None
+            logger.info(f"  Cached patched chromedriver for Chrome {install.version_main} at {target}")
+        install.driver_path = str(target)
+        _store(install)
+    return install.driver_path
+
+
+def uc_chrome_kwargs() -> dict:
+    """Keyword arguments for uc.Chrome that reuse the cached version and driver."""
+    install = get_chrome_install()
+    if not install:
+        return {}
+    kwargs = {"version_main": install.version_main}
+    driver_path = get_patched_driver(install)
+    if driver_path:
+        kwargs["driver_executable_path"] = driver_path
+    return kwargs
+
+
+def main() -> int:
+    install = get_chrome_install()
+    if not install:
+        print("Chrome not found or its version could not be read", file=sys.stderr)
+        return 1
+    driver_path = get_patched_driver(install)
+    print(f"Chrome {install.version} ({install.binary})")
+    print(f"chromedriver: {driver_path or 'not cached (undetected-chromedriver unavailable or patching failed)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
 Handlers for dropdown selection logic.
 """
 
+import logging
 import time
 
 from selenium.common.exceptions import NoSuchElementException
@@ -15,8 +16,11 @@ from ..scrapers.hungary.config import (
     VISA_TYPE_OPTION_TEXT,
     get_consulate_config,
 )
+from ..telemetry import get_logger
 from .webdriver_utils import scroll_to_element
 
+logger = get_logger(__name__)
+
 
 def find_dropdown_element(driver, name=None, element_id=None, css_selector=None, text_hint=None):
     """Find a dropdown element using multiple search strategies."""
@@ -26,7 +30,7 @@ def find_dropdown_element(driver, name=None, element_id=None, css_selector=None,
     if name:
         try:
             dropdown = driver.find_element(By.NAME, name)
-            print(f"  Found dropdown by name '{name}'")
+            logger.info(f"  Found dropdown by name '{name}'")
             return dropdown
         except:
             pass
@@ -35,7 +39,7 @@ def find_dropdown_element(driver, name=None, element_id=None, css_selector=None,
     if element_id and not dropdown:
         try:
             dropdown = driver.find_element(By.ID, element_id)
-            print(f"  Found dropdown by id '{element_id}'")
+            logger.info(f"  Found dropdown by id '{element_id}'")
             return dropdown
         except:
             pass
@@ -47,7 +51,7 @@ def find_dropdown_element(driver, name=None, element_id=None, css_selector=None,
                 By.XPATH,
                 f"//*[@name and contains(@name, '{name}')] | //*[@id and contains(@id, '{name}')]"
             )
-            print(f"  Found dropdown by partial match on '{name}'")
+            logger.info(f"  Found dropdown by partial match on '{name}'")
             return dropdown
         except:
             pass
@@ -58,7 +62,7 @@ def find_dropdown_element(driver, name=None, element_id=None, css_selector=None,
                 By.XPATH,
                 f"//*[@id='{element_id}'] | //*[@id and contains(@id, '{element_id[:8]}')]"
             )
-            print(f"  Found dropdown by id/partial id '{element_id}'")
+            logger.info(f"  Found dropdown by id/partial id '{element_id}'")
             return dropdown
         except:
             pass
@@ -67,7 +71,7 @@ def find_dropdown_element(driver, name=None, element_id=None, css_selector=None,
     if css_selector and not dropdown:
         try:
             dropdown = driver.find_element(By.CSS_SELECTOR, css_selector)
-            print(f"  Found dropdown by CSS selector")
+            logger.info(f"  Found dropdown by CSS selector")
             return dropdown
         except:
             pass
@@ -79,7 +83,7 @@ def find_dropdown_element(driver, name=None, element_id=None, css_selector=None,
                 By.XPATH,
                 f"//input[contains(@name, '{name}')] | //button[contains(@name, '{name}')] | //div[contains(@name, '{name}')]"
             )
-            print(f"  Found dropdown element by XPATH")
+            logger.info(f"  Found dropdown element by XPATH")
             return dropdown
         except:
             pass
@@ -90,7 +94,7 @@ def find_dropdown_element(driver, name=None, element_id=None, css_selector=None,
                 By.XPATH,
                 f"//*[contains(normalize-space(.), '{text_hint}')]/ancestor::*[self::div or self::button or self::span][1]"
             )
-            print(f"  Found dropdown by text hint '{text_hint}'")
+            logger.info(f"  Found dropdown by text hint '{text_hint}'")
             return dropdown
         except:
             pass
@@ -163,7 +167,7 @@ def select_consulate_option(driver, location="tel_aviv"):
     consulate_option_text = config["consulate_option_text"]
     consulate_dropdown_id = config["consulate_dropdown_id"]
     
-    print(f"Step 1: Opening dropdown and selecting '{consulate_option_text}'...")
+    logger.info(f"Step 1: Opening dropdown and selecting '{consulate_option_text}'...")
     
     try:
         dropdown = find_dropdown_element(
@@ -179,7 +183,7 @@ def select_consulate_option(driver, location="tel_aviv"):
             time.sleep(0.5)
             
             # Click to open the dropdown
-            print("  Clicking dropdown to open it...")
+            logger.info("  Clicking dropdown to open it...")
             driver.execute_script("arguments[0].click();", dropdown)
             time.sleep(1)  # Wait for dropdown to open
             
@@ -190,25 +194,25 @@ def select_consulate_option(driver, location="tel_aviv"):
                 scroll_to_element(driver, radio_option)
                 time.sleep(0.3)
                 
-                print(f"  Found radio option '{consulate_option_text}', clicking it...")
+                logger.info(f"  Found radio option '{consulate_option_text}', clicking it...")
                 driver.execute_script("arguments[0].click();", radio_option)
                 time.sleep(0.5)
-                print(f"  ✓ Selected '{consulate_option_text}'")
+                logger.info(f"  ✓ Selected '{consulate_option_text}'")
             else:
-                print(f"  ✗ Could not find radio option '{consulate_option_text}'")
-                _list_all_radio_buttons(driver)
+                logger.error(f"  ✗ Could not find radio option '{consulate_option_text}'")
+                if logger.isEnabledFor(logging.DEBUG):
+                    _list_all_radio_buttons(driver)
         else:
-            print("  ✗ Could not find dropdown element")
-            _debug_dropdown_search(driver)
+            logger.error("  ✗ Could not find dropdown element")
+            if logger.isEnabledFor(logging.DEBUG):
+                _debug_dropdown_search(driver)
     except Exception as e:
-        print(f"  ✗ Error selecting dropdown option: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"  ✗ Error selecting dropdown option: {e}", exc_info=True)
 
 
 def _list_all_radio_buttons(driver):
     """List all radio buttons found on the page for debugging."""
-    print("  Listing all radio buttons found:")
+    logger.debug("  Listing all radio buttons found:")
     radios = driver.find_elements(By.XPATH, "//input[@type='radio']")
     for i, radio in enumerate(radios):
         radio_id = radio.get_attribute("id")
@@ -228,17 +232,17 @@ def _list_all_radio_buttons(driver):
                     label_text = parent.text[:50] if parent.text else ""
                 except:
                     pass
-            print(f"    Radio [{i}]: id='{radio_id}', name='{radio_name}', value='{radio_value}', label='{label_text}'")
+            logger.debug(f"    Radio [{i}]: id='{radio_id}', name='{radio_name}', value='{radio_value}', label='{label_text}'")
         except:
-            print(f"    Radio [{i}]: id='{radio_id}', name='{radio_name}', value='{radio_value}'")
+            logger.debug(f"    Radio [{i}]: id='{radio_id}', name='{radio_name}', value='{radio_value}'")
 
 
 def _debug_dropdown_search(driver):
     """Debug helper to search for dropdown elements."""
-    print("  Searching for elements with name containing 'ugyfelszolgalat'...")
+    logger.debug("  Searching for elements with name containing 'ugyfelszolgalat'...")
     elements = driver.find_elements(By.CSS_SELECTOR, "[name*='ugyfelszolgalat'], [id*='ugyfelszolgalat']")
     for elem in elements:
-        print(f"    Found: tag='{elem.tag_name}', name='{elem.get_attribute('name')}', id='{elem.get_attribute('id')}'")
+        logger.debug(f"    Found: tag='{elem.tag_name}', name='{elem.get_attribute('name')}', id='{elem.get_attribute('id')}'")
 
 
 def find_dropdown_trigger_by_label(driver, target_id, label_text_pattern=None):
@@ -249,7 +253,7 @@ def find_dropdown_trigger_by_label(driver, target_id, label_text_pattern=None):
     # Method 1: Find label by 'for' attribute
     try:
         label = driver.find_element(By.XPATH, f"//label[@for='{target_id}']")
-        print(f"  Found label by 'for' attribute")
+        logger.info(f"  Found label by 'for' attribute")
     except:
         pass
     
@@ -257,7 +261,7 @@ def find_dropdown_trigger_by_label(driver, target_id, label_text_pattern=None):
     if not label and label_text_pattern:
         try:
             label = driver.find_element(By.XPATH, f"//label[contains(text(), '{label_text_pattern}')]")
-            print(f"  Found label by text")
+            logger.info(f"  Found label by text")
         except:
             pass
     
@@ -286,7 +290,7 @@ def find_dropdown_trigger_by_label(driver, target_id, label_text_pattern=None):
                 )
                 
                 if is_dropdown:
-                    print(f"  Found dropdown container (class='{ancestor.get_attribute('class')[:50]}', id='{ancestor_id[:50]}')")
+                    logger.info(f"  Found dropdown container (class='{ancestor.get_attribute('class')[:50]}', id='{ancestor_id[:50]}')")
                     
                     # Try to find trigger elements in this container
                     try:
@@ -308,7 +312,7 @@ def find_dropdown_trigger_by_label(driver, target_id, label_text_pattern=None):
                                 continue
                             
                             dropdown_trigger = trigger
-                            print(f"  Found dropdown trigger: id='{trigger_id}', class='{trigger_class[:50]}'")
+                            logger.info(f"  Found dropdown trigger: id='{trigger_id}', class='{trigger_class[:50]}'")
                             break
                         
                         if dropdown_trigger:
@@ -321,17 +325,17 @@ def find_dropdown_trigger_by_label(driver, target_id, label_text_pattern=None):
                         try:
                             if ancestor.tag_name in ["button", "div"] and ancestor.get_attribute("tabindex"):
                                 dropdown_trigger = ancestor
-                                print(f"  Using container itself as trigger")
+                                logger.info(f"  Using container itself as trigger")
                                 break
                         except:
                             pass
         except Exception as e:
-            print(f"  Error finding dropdown container: {e}")
+            logger.error(f"  Error finding dropdown container: {e}")
     
     # Alternative method: find all dropdowns and pick the second one
     if not dropdown_trigger:
         try:
-            print("  Trying alternative method: finding all potential dropdowns...")
+            logger.info("  Trying alternative method: finding all potential dropdowns...")
             potential_triggers = driver.find_elements(
                 By.XPATH,
                 "//button | //input[@type='button'] | //div[contains(@class, 'dropdown') or contains(@role, 'button') or @aria-haspopup='true']"
@@ -359,12 +363,12 @@ def find_dropdown_trigger_by_label(driver, target_id, label_text_pattern=None):
             # Pick the second one (first is the consulate dropdown)
             if len(form_triggers) > 1:
                 dropdown_trigger = form_triggers[1]
-                print(f"  Found second dropdown trigger: id='{dropdown_trigger.get_attribute('id')}', text='{dropdown_trigger.text[:50]}'")
+                logger.info(f"  Found second dropdown trigger: id='{dropdown_trigger.get_attribute('id')}', text='{dropdown_trigger.text[:50]}'")
             elif len(form_triggers) == 1:
                 dropdown_trigger = form_triggers[0]
-                print(f"  Found dropdown trigger: id='{dropdown_trigger.get_attribute('id')}', text='{dropdown_trigger.text[:50]}'")
+                logger.info(f"  Found dropdown trigger: id='{dropdown_trigger.get_attribute('id')}', text='{dropdown_trigger.text[:50]}'")
         except Exception as e:
-            print(f"  Error finding dropdown by alternative method: {e}")
+            logger.error(f"  Error finding dropdown by alternative method: {e}")
     
     return dropdown_trigger, label
 
@@ -377,7 +381,7 @@ def find_input_by_id_or_label(driver, target_id, label=None):
     if target_id:
         try:
             input_element = driver.find_element(By.ID, target_id)
-            print(f"  Found input element by id '{target_id}'")
+            logger.info(f"  Found input element by id '{target_id}'")
             return input_element
         except:
             pass
@@ -388,7 +392,7 @@ def find_input_by_id_or_label(driver, target_id, label=None):
             label_for = label.get_attribute("for")
             if label_for:
                 input_element = driver.find_element(By.ID, label_for)
-                print(f"  Found input element via label's 'for' attribute")
+                logger.info(f"  Found input element via label's 'for' attribute")
                 return input_element
         except:
             pass
@@ -406,7 +410,7 @@ def find_input_by_id_or_label(driver, target_id, label=None):
                     By.XPATH,
                     "./preceding-sibling::input | ./following-sibling::input | ../input"
                 )
-            print(f"  Found input element near label")
+            logger.info(f"  Found input element near label")
             return input_element
         except:
             pass
@@ -418,7 +422,7 @@ def find_input_by_id_or_label(driver, target_id, label=None):
                 By.XPATH,
                 f"//input[@id='{target_id}'] | //input[@type='checkbox'][@id='{target_id}'] | //input[@type='radio'][@id='{target_id}']"
             )
-            print(f"  Found input element by XPATH")
+            logger.info(f"  Found input element by XPATH")
             return input_element
         except:
             pass
@@ -433,7 +437,7 @@ def find_save_button(driver, input_element=None):
     # Method 1: Find button with text "Save"
     try:
         save_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Save') or contains(text(), 'Mentés')]")
-        print(f"  Found Save button by text: '{save_button.text}'")
+        logger.info(f"  Found Save button by text: '{save_button.text}'")
         return save_button
     except:
         pass
@@ -449,7 +453,7 @@ def find_save_button(driver, input_element=None):
                 By.XPATH,
                 ".//button[contains(text(), 'Save') or contains(text(), 'Mentés') or contains(@class, 'save')]"
             )
-            print(f"  Found Save button in dropdown container")
+            logger.info(f"  Found Save button in dropdown container")
             return save_button
         except:
             pass
@@ -464,7 +468,7 @@ def find_save_button(driver, input_element=None):
             for btn in save_buttons:
                 if btn.is_displayed():
                     save_button = btn
-                    print(f"  Found visible Save button: '{btn.text}'")
+                    logger.info(f"  Found visible Save button: '{btn.text}'")
                     return save_button
         except:
             pass
@@ -478,13 +482,13 @@ def select_visa_type_option(driver, location="tel_aviv"):
     visa_type_dropdown_id = config["visa_type_dropdown_id"]
     visa_type_option_text = config["visa_type_option_text"]
     
-    print(f"\nStep 2: Opening second dropdown and selecting '{visa_type_option_text}'...")
+    logger.info(f"\nStep 2: Opening second dropdown and selecting '{visa_type_option_text}'...")
     
     # Warn if visa type dropdown ID is not set
     if not visa_type_dropdown_id:
-        print(f"  ⚠️  Warning: Visa type dropdown ID not configured for location '{location}'")
-        print(f"  The script will try to find the dropdown by label text, but this may fail.")
-        print(f"  Please update the config with the correct visa type dropdown ID.")
+        logger.warning(f"  ⚠️  Warning: Visa type dropdown ID not configured for location '{location}'")
+        logger.info(f"  The script will try to find the dropdown by label text, but this may fail.")
+        logger.info(f"  Please update the config with the correct visa type dropdown ID.")
     
     try:
         # Find the dropdown trigger and label
@@ -497,14 +501,14 @@ def select_visa_type_option(driver, location="tel_aviv"):
         
         # Open the dropdown if we found a trigger
         if dropdown_trigger:
-            print("  Clicking dropdown trigger to open it...")
+            logger.info("  Clicking dropdown trigger to open it...")
             scroll_to_element(driver, dropdown_trigger)
             time.sleep(0.3)
             driver.execute_script("arguments[0].click();", dropdown_trigger)
             time.sleep(1.5)  # Wait for dropdown to open
-            print("  Dropdown opened")
+            logger.info("  Dropdown opened")
         else:
-            print("  Could not find dropdown trigger, will try to find input directly...")
+            logger.info("  Could not find dropdown trigger, will try to find input directly...")
         
         # Find the input element
         input_element = find_input_by_id_or_label(driver, visa_type_dropdown_id if visa_type_dropdown_id else "", label)
@@ -515,70 +519,70 @@ def select_visa_type_option(driver, location="tel_aviv"):
             
             # Check element type and click accordingly
             input_type = input_element.get_attribute("type")
-            print(f"  Input element type: {input_type}")
+            logger.info(f"  Input element type: {input_type}")
             
             if input_type == "checkbox":
                 if not input_element.is_selected():
                     driver.execute_script("arguments[0].click();", input_element)
-                    print(f"  ✓ Checked checkbox: '{visa_type_option_text}'")
+                    logger.info(f"  ✓ Checked checkbox: '{visa_type_option_text}'")
                 else:
-                    print(f"  ✓ Checkbox already selected")
+                    logger.info(f"  ✓ Checkbox already selected")
             elif input_type == "radio":
                 driver.execute_script("arguments[0].click();", input_element)
-                print(f"  ✓ Selected radio: '{visa_type_option_text}'")
+                logger.info(f"  ✓ Selected radio: '{visa_type_option_text}'")
             else:
                 driver.execute_script("arguments[0].click();", input_element)
-                print(f"  ✓ Clicked element: '{visa_type_option_text}'")
+                logger.info(f"  ✓ Clicked element: '{visa_type_option_text}'")
             
             time.sleep(0.5)
             
             # Click the Save button
-            print("  Looking for 'Save' button in dropdown...")
+            logger.info("  Looking for 'Save' button in dropdown...")
             save_button = find_save_button(driver, input_element)
             
             if save_button:
-                print("  Clicking Save button...")
+                logger.info("  Clicking Save button...")
                 scroll_to_element(driver, save_button)
                 time.sleep(0.3)
                 driver.execute_script("arguments[0].click();", save_button)
                 time.sleep(1)  # Wait for dropdown to close
-                print("  ✓ Save button clicked, dropdown should be closed")
+                logger.info("  ✓ Save button clicked, dropdown should be closed")
             else:
-                print("  ✗ Could not find Save button in dropdown")
-                _list_all_buttons(driver)
+                logger.error("  ✗ Could not find Save button in dropdown")
+                if logger.isEnabledFor(logging.DEBUG):
+                    _list_all_buttons(driver)
         else:
-            print(f"  ✗ Could not find input element for '{visa_type_option_text}'")
-            _debug_visa_type_search(driver, visa_type_dropdown_id)
+            logger.error(f"  ✗ Could not find input element for '{visa_type_option_text}'")
+            if logger.isEnabledFor(logging.DEBUG):
+                _debug_visa_type_search(driver, visa_type_dropdown_id)
     except Exception as e:
-        print(f"  ✗ Error selecting second dropdown option: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"  ✗ Error selecting second dropdown option: {e}", exc_info=True)
 
 
 def _list_all_buttons(driver):
     """List all visible buttons for debugging."""
-    print("  Listing all visible buttons...")
+    logger.debug("  Listing all visible buttons...")
     buttons = driver.find_elements(By.XPATH, "//button")
     for btn in buttons:
         if btn.is_displayed():
-            print(f"    Button: text='{btn.text[:50]}', id='{btn.get_attribute('id')}', class='{btn.get_attribute('class')[:50]}'")
+            logger.debug(f"    Button: text='{btn.text[:50]}', id='{btn.get_attribute('id')}', class='{btn.get_attribute('class')[:50]}'")
 
 
 def _debug_visa_type_search(driver, visa_type_dropdown_id):
     """Debug helper for visa type search."""
-    print(f"  Searching for elements with id '{visa_type_dropdown_id}'...")
+    logger.debug(f"  Searching for elements with id '{visa_type_dropdown_id}'...")
     elements = driver.find_elements(
         By.XPATH,
         f"//*[@id='{visa_type_dropdown_id}'] | //*[contains(@id, '{visa_type_dropdown_id}')]"
     )
     for elem in elements:
-        print(f"    Found: tag='{elem.tag_name}', type='{elem.get_attribute('type')}', id='{elem.get_attribute('id')}'")
+        logger.debug(f"    Found: tag='{elem.tag_name}', type='{elem.get_attribute('type')}', id='{elem.get_attribute('id')}'")
     
-    print("  Searching for labels...")
+    logger.debug("  Searching for labels...")
     labels = driver.find_elements(By.XPATH, "//label[contains(text(), 'Visa application')]")
     for lbl in labels:
         lbl_for = lbl.get_attribute("for")
         lbl_text = lbl.text
-        print(f"    Label: text='{lbl_text[:50]}', for='{lbl_for}'")
+        logger.debug(f"    Label: text='{lbl_text[:50]}', for='{lbl_for}'")
 
 
@@ -10,14 +10,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import Select
 
-from ..scrapers.hungary.config import (
-    CHAR_TYPE_DELAY,
-    DEFAULT_TEXTAREA_VALUE,
-    DEFAULT_VALUES,
-    FIELD_MAP,
-)
+from ..scrapers.hungary.config import CHAR_TYPE_DELAY, DEFAULT_TEXTAREA_VALUE, get_run_profile
+from ..telemetry import get_logger
 from .webdriver_utils import scroll_to_element
 
+logger = get_logger(__name__)
+
 
 def fill_select_dropdowns(driver, selects):
     """Fill standard HTML select dropdowns."""
@@ -34,10 +32,10 @@ def fill_select_dropdowns(driver, selects):
                 # Select the second option (skip first if it's placeholder)
                 select_obj.select_by_index(1)
                 selected_option = options[1].text
-                print(f"Filled select {select_id or select_name}: {selected_option}")
+                logger.info(f"Filled select {select_id or select_name}: {selected_option}")
             elif len(options) == 1:
                 select_obj.select_by_index(0)
-                print(f"Filled select {select_id or select_name}: {options[0].text}")
+                logger.info(f"Filled select {select_id or select_name}: {options[0].text}")
             # Random delay between fills
             time.sleep(random.uniform(0.2, 0.5))
         except Exception as e:
@@ -47,6 +45,7 @@ def fill_select_dropdowns(driver, selects):
 def fill_reenter_email_field(driver):
     """Fill the re-enter email field with special handling."""
     filled_count = 0
+    email = get_run_profile().email
     
     try:
         # Find the re-enter email field by its label
@@ -77,7 +76,7 @@ def fill_reenter_email_field(driver):
                 time.sleep(0.2)
                 
                 # Type character by character using send_keys()
-                for char in DEFAULT_VALUES["email"]:
+                for char in email:
                     reenter_email_field.send_keys(char)
                     time.sleep(CHAR_TYPE_DELAY)
                 
@@ -85,23 +84,23 @@ def fill_reenter_email_field(driver):
                 
                 # Verify the value was set
                 actual_value = reenter_email_field.get_attribute("value")
-                if actual_value == DEFAULT_VALUES["email"]:
-                    print("Filled re-enter email field")
+                if actual_value == email:
+                    logger.info("Filled re-enter email field")
                     filled_count += 1
                 else:
                     # Attempt to fix by typing remaining characters
                     
                     # Try to fix by typing remaining characters
-                    if len(actual_value) < len(DEFAULT_VALUES["email"]):
-                        missing_chars = DEFAULT_VALUES["email"][len(actual_value):]
+                    if len(actual_value) < len(email):
+                        missing_chars = email[len(actual_value):]
                         for char in missing_chars:
                             reenter_email_field.send_keys(char)
                             time.sleep(CHAR_TYPE_DELAY)
                         
                         time.sleep(0.3)
                         actual_value = reenter_email_field.get_attribute("value")
-                        if actual_value == DEFAULT_VALUES["email"]:
-                            print("Filled re-enter email field")
+                        if actual_value == email:
+                            logger.info("Filled re-enter email field")
                             filled_count += 1
             
             
@@ -116,6 +115,7 @@ def fill_reenter_email_field(driver):
 def fill_date_of_birth_field(driver):
     """Fill the date of birth field with special date picker handling."""
     filled_count = 0
+    profile = get_run_profile()
     
     try:
         # Find the date picker input
@@ -126,19 +126,19 @@ def fill_date_of_birth_field(driver):
         # Clear and fill the date input
         date_input.clear()
         time.sleep(0.1)
-        date_input.send_keys(DEFAULT_VALUES["date_of_birth"])
+        date_input.send_keys(profile.date_of_birth)
         time.sleep(0.3)
         
         # Also try to set the value via the date picker component
         try:
             date_picker = driver.find_element(By.ID, "birthDateComponent")
-            driver.execute_script("arguments[0].value = arguments[1];", date_picker, DEFAULT_VALUES["date_of_birth_iso"])
+            driver.execute_script("arguments[0].value = arguments[1];", date_picker, profile.date_of_birth_iso)
             # Trigger change event
             driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", date_picker)
         except:
             pass
         
-        print(f"Filled birthDate: {DEFAULT_VALUES['date_of_birth']}")
+        logger.info(f"Filled birthDate: {profile.date_of_birth}")
         filled_count += 1
     except Exception as e:
         pass
@@ -156,7 +156,7 @@ def fill_checkbox_field(driver, field_id):
             scroll_to_element(driver, checkbox)
             time.sleep(0.2)
             checkbox.click()
-            print(f"Filled checkbox {field_id}")
+            logger.info(f"Filled checkbox {field_id}")
             filled_count += 1
     except NoSuchElementException:
         pass
@@ -209,13 +209,13 @@ def fill_text_field(driver, field_id, value):
             # Fill field
             try:
                 input_field.send_keys(value)
-                print(f"Filled {field_id}: {value}")
+                logger.info(f"Filled {field_id}: {value}")
             except:
                 # Fallback: JavaScript
                 driver.execute_script("arguments[0].value = arguments[1];", input_field, value)
                 driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", input_field)
                 driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", input_field)
-                print(f"Filled {field_id}: {value}")
+                logger.info(f"Filled {field_id}: {value}")
             
             # Random delay between field fills to simulate human typing
             time.sleep(random.uniform(0.3, 0.7))
@@ -229,10 +229,10 @@ def fill_text_field(driver, field_id, value):
 
 
 def fill_fields_by_map(driver):
-    """Fill all fields defined in FIELD_MAP."""
+    """Fill all fields of the run's applicant profile (the FIELD_MAP layout)."""
     filled_count = 0
     
-    for field_id, (field_type, value) in FIELD_MAP.items():
+    for field_id, (field_type, value) in get_run_profile().field_map().items():
         try:
             if field_type == "checkbox":
                 filled_count += fill_checkbox_field(driver, field_id)
@@ -249,7 +249,7 @@ def fill_fields_by_map(driver):
 def fill_remaining_fields(driver, inputs):
     """Fill any remaining fields that might have been missed."""
     filled_count = 0
-    filled_ids = set(FIELD_MAP.keys())
+    filled_ids = set(get_run_profile().field_map().keys())
     
     for input_field in inputs:
         input_type = input_field.get_attribute("type") or "text"
@@ -279,7 +279,7 @@ def fill_remaining_fields(driver, inputs):
                     scroll_to_element(driver, input_field)
                     time.sleep(0.2)
                     input_field.click()
-                    print(f"Filled checkbox {input_id or input_name or 'unknown'}")
+                    logger.info(f"Filled checkbox {input_id or input_name or 'unknown'}")
                     filled_count += 1
                 continue
             
@@ -309,7 +309,7 @@ def fill_textareas(driver, textareas, wait):
             time.sleep(0.3)
             textarea.clear()
             textarea.send_keys(DEFAULT_TEXTAREA_VALUE)
-            print(f"Filled textarea {textarea.get_attribute('id') or textarea.get_attribute('name')}")
+            logger.info(f"Filled textarea {textarea.get_attribute('id') or textarea.get_attribute('name')}")
             filled_count += 1
         except Exception as e:
             pass
@@ -0,0 +1,198 @@
+"""
+Form-state diff for the Hungary booking form, so a retry refills only what a reload lost.
+
+After driver.refresh() Chrome often restores most control values, and the
+consulate and visa type selections can survive as well. read_form_state()
+reads every control (value, checked state, visibility, label text) in a
+single script call. diff_form_state() compares that snapshot with the run's
+applicant profile and the location's consulate and visa type, and
+refill_form() fills only the controls that are missing or wrong. When the
+dropdown choices were lost it redoes them first and diffs a fresh snapshot,
+since the fields that depend on them are hidden until then.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..scrapers.hungary.config import DEFAULT_TEXTAREA_VALUE, get_consulate_config, get_run_profile
+from ..telemetry import get_logger
+from .dropdown_handlers import select_consulate_option, select_visa_type_option
+from .form_helpers import (
+    fill_checkbox_field,
+    fill_date_of_birth_field,
+    fill_reenter_email_field,
+    fill_remaining_fields,
+    fill_select_dropdowns,
+    fill_text_field,
+    fill_textareas,
+)
+
+logger = get_logger(__name__)
+
+# One round trip: every fillable control with its current state and label text
+FORM_STATE_SCRIPT = """
+var labels = {};
+document.querySelectorAll("label[for]").forEach(function(label) {
+    labels[label.htmlFor] = (label.textContent || "").trim();
+});
+var controls = [];
+document.querySelectorAll("input, select, textarea").forEach(function(el) {
+    var tag = el.tagName.toLowerCase();
+    var type = tag === "input" ? (el.type || "text").toLowerCase() : tag;
+    if (["hidden", "submit", "button", "image"].indexOf(type) !== -1) {
+        return;
+    }
+    // Own label only: a parent holding several options would match all of them
+    var label = labels[el.id] || "";
+    var wrapper = el.closest("label") || el.parentElement;
+    if (!label && wrapper && wrapper.querySelectorAll("input, select, textarea").length === 1) {
+        label = (wrapper.textContent || "").trim().slice(0, 200);
+    }
+    controls.push({
+        element: el,
+        id: el.id || "",
+        name: el.name || "",
+        type: type,
+        value: el.value || "",
+        checked: !!el.checked,
+        selected_index: tag === "select" ? el.selectedIndex : -1,
+        displayed: !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length),
+        label: label
+    });
+});
+return controls;
+"""
+
+REENTER_LABELS = ("re-enter", "reenter")
+
+
+@dataclass
+class FormDiff:
+    """What a refill has to redo; `kept` counts profile fields that already hold the right value."""
+
+    consulate: bool = True
+    visa_type: bool = True
+    fields: Dict[str, Tuple[str, Optional[str]]] = field(default_factory=dict)
+    reenter_email: bool = False
+    selects: List[Any] = field(default_factory=list)
+    checkboxes: List[Any] = field(default_factory=list)
+    textareas: List[Any] = field(default_factory=list)
+    kept: int = 0
+
+    def summary(self, dropdowns: bool = True) -> str:
+        redo = [("re-enter email", self.reenter_email)]
+        if dropdowns:
+            redo[:0] = [("consulate", self.consulate), ("visa type", self.visa_type)]
+        parts = [name for name, needed in redo if needed]
+        parts.extend(self.fields)
+        for name, items in (("select", self.selects), ("checkbox", self.checkboxes), ("textarea", self.textareas)):
+            if items:
+                parts.append(f"{len(items)} {name}(s)")
+        return ", ".join(parts) or "nothing"
+
+
+def read_form_state(driver) -> List[Dict[str, Any]]:
+    """Current state of every fillable control on the page, in document order."""
+    return driver.execute_script(FORM_STATE_SCRIPT) or []
+
+
+def _label_matches(control: Dict[str, Any], text: Optional[str]) -> bool:
+    return bool(text) and text in control["label"]
+
+
+def diff_form_state(controls: List[Dict[str, Any]], location: str = "tel_aviv") -> FormDiff:
+    """Compare a read_form_state() snapshot with what the run's profile and location need."""
+    config = get_consulate_config(location)
+    profile = get_run_profile()
+    field_map = profile.field_map()
+    by_id = {control["id"]: control for control in controls if control["id"]}
+    diff = FormDiff()
+
+    # Custom dropdowns: the consulate is a checked radio with the option's label,
+    # the visa type a checked input with the configured id (or label)
+    diff.consulate = not any(
+        control["type"] == "radio" and control["checked"]
+        and _label_matches(control, config["consulate_option_text"])
+        for control in controls
+    )
+    visa_type_id = config["visa_type_dropdown_id"]
+    diff.visa_type = not any(
+        control["checked"] and (control["id"] == visa_type_id if visa_type_id
+                                else _label_matches(control, config["visa_type_option_text"]))
+        for control in controls
+    )
+
+    for field_id, (field_type, value) in field_map.items():
+        control = by_id.get(field_id)
+        if control is None or not control["displayed"]:
+            continue
+        if field_type == "checkbox":
+            ok = control["checked"]
+        else:
+            ok = control["value"] == value
+        if ok:
+            diff.kept += 1
+        else:
+            diff.fields[field_id] = (field_type, value)
+
+    for control in controls:
+        if control["id"] in field_map or not control["displayed"]:
+            continue
+        if control["type"] == "select":
+            if control["selected_index"] <= 0:
+                diff.selects.append(control["element"])
+        elif control["type"] == "textarea":
+            if control["value"] != DEFAULT_TEXTAREA_VALUE:
+                diff.textareas.append(control["element"])
+        elif control["type"] == "checkbox":
+            if not control["checked"] and control["id"] != visa_type_id:
+                diff.checkboxes.append(control["element"])
+        elif any(marker in control["label"].lower() for marker in REENTER_LABELS):
+            if control["value"] == profile.email:
+                diff.kept += 1
+            else:
+                diff.reenter_email = True
+
+    return diff
+
+
+def refill_form(driver, wait, location: str = "tel_aviv") -> int:
+    """
+    Fill only the controls a reload lost or changed.
+
+    Returns the number of fields that hold the run's values afterwards (kept
+    plus refilled), the same meaning fill_and_submit_form gives its filled count.
+    """
+    diff = diff_form_state(read_form_state(driver), location)
+    if diff.consulate or diff.visa_type:
+        if diff.consulate:
+            logger.info(f"  → Selecting consulate ({location.capitalize()})...")
+            select_consulate_option(driver, location=location)
+        if diff.visa_type:
+            logger.info("  → Selecting visa type...")
+            select_visa_type_option(driver, location=location)
+        # Controls that depend on these choices were hidden in the first snapshot
+        diff = diff_form_state(read_form_state(driver), location)
+    logger.info(f"  Form state after reload: {diff.kept} field(s) kept, refilling {diff.summary(dropdowns=False)}")
+
+    if diff.selects:
+        fill_select_dropdowns(driver, diff.selects)
+
+    filled_count = diff.kept
+    if diff.reenter_email:
+        filled_count += fill_reenter_email_field(driver)
+    for field_id, (field_type, value) in diff.fields.items():
+        try:
+            if field_type == "checkbox":
+                filled_count += fill_checkbox_field(driver, field_id)
+            elif field_id == "birthDate":
+                filled_count += fill_date_of_birth_field(driver)
+            else:
+                filled_count += fill_text_field(driver, field_id, value)
+        except Exception:
+            pass
+    if diff.checkboxes:
+        filled_count += fill_remaining_fields(driver, diff.checkboxes)
+    if diff.textareas:
+        filled_count += fill_textareas(driver, diff.textareas, wait)
+    return filled_count
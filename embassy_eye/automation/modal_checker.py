@@ -12,12 +12,18 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from .page_load import BOOKING_FORM, probe_page, wait_for_page
+from ..netstate.blocked_ips import get_blocked_ip_registry
+from ..storage.events import get_event_store
+from ..telemetry import get_logger, get_run_id
 from ..notifications.telegram import (
     send_healthcheck_ip_blocked,
     send_healthcheck_slot_busy,
     get_ip_and_country,
 )
 
+logger = get_logger(__name__)
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 LOG_DIR_CANDIDATES = [
     Path("logs"),
@@ -32,6 +38,8 @@ IP_BLOCKED_LOG_PATHS = [log_dir / "blocked_ips.log" for log_dir in LOG_DIR_CANDI
 IP_BLOCKED_REGEX = re.compile(
     r"your ip \((?P<ip>\d{1,3}(?:\.\d{1,3}){3})\) has been blocked", re.IGNORECASE
 )
+# The block page is tiny; its message is in the title or the first few KB of body text
+BLOCK_CHECK_CHARS = 4096
 
 
 def check_appointment_availability(driver, location=None, chrome_ip=None):
@@ -42,10 +50,10 @@ def check_appointment_availability(driver, location=None, chrome_ip=None):
         location: Optional location string (e.g., "subotica", "belgrade") for notifications
         chrome_ip: Optional IP address detected from Chrome browser
     """
-    print("\n=== Waiting for modal to appear (if any) ===")
+    logger.info("\n=== Waiting for modal to appear (if any) ===")
     time.sleep(6)  # Initial wait
     
-    print("=== Checking for appointment availability ===")
+    logger.info("=== Checking for appointment availability ===")
     modal_found = False
     captcha_failure_detected = False
     email_verification_required = False
@@ -71,17 +79,17 @@ def check_appointment_availability(driver, location=None, chrome_ip=None):
         
         if any(phrase in page_text or phrase in body_text for phrase in 
                ["no appointments available", "currently no appointments"]):
-            print("  Found 'no appointments' text in page - setting modal_found=True")
+            logger.info("  Found 'no appointments' text in page - setting modal_found=True")
             modal_found = True  # This is the definitive signal - no appointments available
         if CAPTCHA_FAILURE_TEXT in page_text or CAPTCHA_FAILURE_TEXT in body_text:
             captcha_failure_detected = True
-            print("  ✓ hCaptcha modal detected - slots found but captcha required on site!")
+            logger.info("  ✓ hCaptcha modal detected - slots found but captcha required on site!")
         if EMAIL_VERIFICATION_TEXT in page_text or EMAIL_VERIFICATION_TEXT in body_text:
             email_verification_required = True
-            print("  ✓ Email verification modal detected - slots found!")
+            logger.info("  ✓ Email verification modal detected - slots found!")
         blocked_ip = _extract_blocked_ip(page_text) or _extract_blocked_ip(body_text)
         if blocked_ip:
-            print(f"  ⚠️ Detected blocked IP message for {blocked_ip}")
+            logger.info(f"  ⚠️ Detected blocked IP message for {blocked_ip}")
         
         # Method 2: Wait for and find the specific alert element with role="alert"
         alert_element = None
@@ -95,21 +103,21 @@ def check_appointment_availability(driver, location=None, chrome_ip=None):
                 alert_text_snippet = alert_element.text[:200] if alert_element.text else None
                 diagnostic_info['alert_found'] = True
                 diagnostic_info['alert_text'] = alert_text_snippet
-                print(f"  Found alert element with role='alert', text: '{alert_text[:80]}'")
+                logger.info(f"  Found alert element with role='alert', text: '{alert_text[:80]}'")
                 if "no appointments" in alert_text:
                     modal_found = True
-                    print("  ✓ Modal confirmed with 'no appointments' message")
+                    logger.info("  ✓ Modal confirmed with 'no appointments' message")
                 if CAPTCHA_FAILURE_TEXT in alert_text:
                     captcha_failure_detected = True
-                    print("  ✓ hCaptcha modal detected via alert element - slots found but captcha required on site!")
+                    logger.info("  ✓ hCaptcha modal detected via alert element - slots found but captcha required on site!")
                 if EMAIL_VERIFICATION_TEXT in alert_text:
                     email_verification_required = True
-                    print("  ✓ Email verification modal detected via alert element - slots found!")
+                    logger.info("  ✓ Email verification modal detected via alert element - slots found!")
         except TimeoutException:
-            print("  No alert element with role='alert' found")
+            logger.info("  No alert element with role='alert' found")
             diagnostic_info['alert_found'] = False
         except Exception as e:
-            print(f"  Error finding alert: {e}")
+            logger.warning(f"  Error finding alert: {e}")
             diagnostic_info['alert_found'] = False
             diagnostic_info['alert_error'] = str(e)
         
@@ -127,7 +135,7 @@ def check_appointment_availability(driver, location=None, chrome_ip=None):
         
         # Method 5: Simple text search in all visible text
         if not modal_found and ("no appointments" in body_text or "no appointments available" in body_text):
-            print("  Found 'no appointments' text in page body")
+            logger.info("  Found 'no appointments' text in page body")
             modal_found = _check_modal_divs(driver)
         
         # Collect more diagnostic info
@@ -164,14 +172,14 @@ def check_appointment_availability(driver, location=None, chrome_ip=None):
                 diagnostic_info['select_date_button_found'] = True
                 diagnostic_info['select_date_button_disabled'] = is_disabled
                 diagnostic_info['select_date_button_text'] = button_text
-                print(f"  Found 'Select date' button: disabled={is_disabled}, text='{button_text}'")
+                logger.info(f"  Found 'Select date' button: disabled={is_disabled}, text='{button_text}'")
             else:
                 diagnostic_info['select_date_button_found'] = False
-                print("  'Select date' button not found")
+                logger.info("  'Select date' button not found")
         except Exception as e:
             diagnostic_info['select_date_button_found'] = False
             diagnostic_info['select_date_button_error'] = str(e)
-            print(f"  Error checking 'Select date' button: {e}")
+            logger.warning(f"  Error checking 'Select date' button: {e}")
         
         # Get a snippet of visible text for context
         try:
@@ -181,7 +189,7 @@ def check_appointment_availability(driver, location=None, chrome_ip=None):
             pass
     
     except Exception as e:
-        print(f"  Error checking for modal: {e}")
+        logger.warning(f"  Error checking for modal: {e}")
         import traceback
         traceback.print_exc()
         diagnostic_info['error'] = str(e)
@@ -189,43 +197,43 @@ def check_appointment_availability(driver, location=None, chrome_ip=None):
     if captcha_failure_detected:
         _log_captcha_failure()
     if blocked_ip:
-        _log_blocked_ip(blocked_ip)
+        _log_blocked_ip(blocked_ip, location=location)
     
     # Print result
-    print("\n" + "="*60)
+    logger.info("\n" + "="*60)
     if captcha_failure_detected:
         current_url = driver.current_url
-        print("✅ SLOTS FOUND - CAPTCHA REQUIRED ON SITE!")
-        print(f"   {current_url}")
-        print("="*60)
+        logger.info("✅ SLOTS FOUND - CAPTCHA REQUIRED ON SITE!")
+        logger.info(f"   {current_url}")
+        logger.info("="*60)
         return (True, "captcha_required", diagnostic_info)  # (slots_available, special_case, diagnostic_info)
     elif email_verification_required:
         current_url = driver.current_url
-        print("✅ SLOTS FOUND - EMAIL VERIFICATION REQUIRED!")
-        print(f"   {current_url}")
-        print("="*60)
+        logger.info("✅ SLOTS FOUND - EMAIL VERIFICATION REQUIRED!")
+        logger.info(f"   {current_url}")
+        logger.info("="*60)
         return (True, "email_verification", diagnostic_info)  # (slots_available, special_case, diagnostic_info)
     elif blocked_ip:
-        print("❌ ACCESS BLOCKED BY IP RESTRICTION ❌")
-        print(f"   Blocked IP: {blocked_ip}")
-        print("   Logged to logs/blocked_ips.log")
-        print("="*60)
+        logger.info("❌ ACCESS BLOCKED BY IP RESTRICTION ❌")
+        logger.info(f"   Blocked IP: {blocked_ip}")
+        logger.info("   Logged to logs/blocked_ips.log")
+        logger.info("="*60)
         # Send healthcheck notification for IP blocked
         _, country = get_ip_and_country()
         send_healthcheck_ip_blocked(blocked_ip, country, location=location, chrome_ip=chrome_ip)
         return (False, "ip_blocked", diagnostic_info)
     elif modal_found:
-        print("⚠️  ALL SLOTS ARE BUSY ⚠️")
-        print("="*60)
+        logger.info("⚠️  ALL SLOTS ARE BUSY ⚠️")
+        logger.info("="*60)
         # Send healthcheck notification for slot busy
         _, country = get_ip_and_country()
         send_healthcheck_slot_busy(country, location=location, ip_address=chrome_ip)
         return (False, None, diagnostic_info)  # No appointments available
     else:
         current_url = driver.current_url
-        print("✅ THERE ARE FREE SLOTS!!! GO BY LINK:")
-        print(f"   {current_url}")
-        print("="*60)
+        logger.info("✅ THERE ARE FREE SLOTS!!! GO BY LINK:")
+        logger.info(f"   {current_url}")
+        logger.info("="*60)
         return (True, None, diagnostic_info)  # Appointments available, no special case
 
 
@@ -236,20 +244,20 @@ def _check_red_text_elements(driver):
             By.XPATH,
             "//*[contains(@style, 'color:red') or contains(@style, 'color: red') or contains(@style, 'color:red;')]"
         )
-        print(f"  Found {len(red_elements)} elements with red style")
+        logger.info(f"  Found {len(red_elements)} elements with red style")
         for elem in red_elements:
             try:
                 if elem.is_displayed():
                     elem_text = elem.text.lower()
-                    print(f"    Red element text: '{elem_text[:80]}'")
+                    logger.info(f"    Red element text: '{elem_text[:80]}'")
                     if any(phrase in elem_text for phrase in 
                           ["no appointments", "no appointments available", "currently no appointments"]):
-                        print("  ✓ Found red text element with 'no appointments' message")
+                        logger.info("  ✓ Found red text element with 'no appointments' message")
                         return True
             except:
                 continue
     except Exception as e:
-        print(f"  Error finding red text: {e}")
+        logger.warning(f"  Error finding red text: {e}")
     
     return False
 
@@ -258,23 +266,23 @@ def _check_modal_body_elements(driver):
     """Check modal-body elements for no appointments message."""
     try:
         modal_bodies = driver.find_elements(By.XPATH, "//div[contains(@class, 'modal-body')]")
-        print(f"  Found {len(modal_bodies)} modal-body elements")
+        logger.info(f"  Found {len(modal_bodies)} modal-body elements")
         for modal_body in modal_bodies:
             try:
                 if modal_body.is_displayed():
                     modal_text = modal_body.text.lower()
-                    print(f"    Modal body text: '{modal_text[:80]}'")
+                    logger.info(f"    Modal body text: '{modal_text[:80]}'")
                     if any(phrase in modal_text for phrase in 
                           ["no appointments", "no appointments available", "currently no appointments"]):
-                        print("  ✓ Found modal-body with 'no appointments' message")
+                        logger.info("  ✓ Found modal-body with 'no appointments' message")
                         return True
                     if CAPTCHA_FAILURE_TEXT in modal_text:
-                        print("  ✓ Found modal-body with hCaptcha message - slots found but captcha required!")
+                        logger.info("  ✓ Found modal-body with hCaptcha message - slots found but captcha required!")
                         return True
             except:
                 continue
     except Exception as e:
-        print(f"  Error finding modal-body: {e}")
+        logger.warning(f"  Error finding modal-body: {e}")
     
     return False
 
@@ -290,10 +298,10 @@ def _check_modal_divs(driver):
                     if "modal" in div_classes:
                         div_text = div.text.lower()
                         if "no appointments" in div_text:
-                            print("  ✓ Found modal div with 'no appointments' message")
+                            logger.info("  ✓ Found modal div with 'no appointments' message")
                             return True
                         if CAPTCHA_FAILURE_TEXT in div_text:
-                            print("  ✓ Found modal div with hCaptcha message - slots found but captcha required!")
+                            logger.info("  ✓ Found modal div with hCaptcha message - slots found but captcha required!")
                             return True
             except:
                 continue
@@ -312,37 +320,57 @@ def _check_email_verification_modal(driver):
                 if modal_body.is_displayed():
                     modal_text = modal_body.text.lower()
                     if EMAIL_VERIFICATION_TEXT in modal_text:
-                        print("  ✓ Found email verification modal - slots available!")
+                        logger.info("  ✓ Found email verification modal - slots available!")
                         return True
             except:
                 continue
     except Exception as e:
-        print(f"  Error checking email verification modal: {e}")
+        logger.warning(f"  Error checking email verification modal: {e}")
     
     return False
 
 
-def detect_blocked_ip(driver, chrome_ip=None):
-    """Detect blocked IP message anywhere on the page and log it.
+def blocked_ip_from_probe(probe):
+    """Blocked IP named in a page probe's title or body text, if any."""
+    if not probe:
+        return None
+    return _extract_blocked_ip(probe.get("title")) or _extract_blocked_ip(probe.get("text"))
+
+
+def wait_for_form_or_block(driver, timeout, readiness=BOOKING_FORM):
+    """Poll from DOMContentLoaded until the page is ready or the block page shows.
+
+    Returns the blocked IP if the block page appeared, else None (page ready or timed out).
+    """
+    _, blocked_ip = wait_for_page(driver, readiness, timeout, stop=blocked_ip_from_probe)
+    return blocked_ip
+
+
+def detect_blocked_ip(driver, chrome_ip=None, location=None):
+    """Detect blocked IP message on the page and log it.
+    
+    Checks the title and the first BLOCK_CHECK_CHARS of body text in one script
+    call; the full page source is only scanned if that script cannot run.
     
     Args:
         driver: Selenium WebDriver instance
         chrome_ip: Optional IP address detected from Chrome browser
+        location: Optional location the block was seen for (stored as its scope)
     """
-    try:
-        page_text = driver.page_source.lower()
-    except Exception:
-        page_text = ""
-    try:
-        body_text = driver.find_element(By.TAG_NAME, "body").text.lower()
-    except Exception:
-        body_text = ""
+    probe = probe_page(driver, max_chars=BLOCK_CHECK_CHARS)
+    if probe is not None:
+        blocked_ip = blocked_ip_from_probe(probe)
+    else:
+        try:
+            page_text = driver.page_source.lower()
+        except Exception:
+            page_text = ""
+        blocked_ip = _extract_blocked_ip(page_text)
 
-    blocked_ip = _extract_blocked_ip(body_text) or _extract_blocked_ip(page_text)
     if blocked_ip:
-        print("❌ ACCESS BLOCKED BY IP RESTRICTION ❌")
-        print(f"   Detected blocked IP: {blocked_ip}")
-        _log_blocked_ip(blocked_ip)
+        logger.info("❌ ACCESS BLOCKED BY IP RESTRICTION ❌")
+        logger.info(f"   Detected blocked IP: {blocked_ip}")
+        _log_blocked_ip(blocked_ip, location=location)
         # Send healthcheck notification for IP blocked
         _, country = get_ip_and_country()
         send_healthcheck_ip_blocked(blocked_ip, country, chrome_ip=chrome_ip)
@@ -359,14 +387,14 @@ def _log_to_paths(paths, message, log_name):
             path.parent.mkdir(parents=True, exist_ok=True)
             with path.open("a", encoding="utf-8") as log_file:
                 log_file.write(message)
-            print(f"  Logged {log_name} entry to {path}")
+            logger.info(f"  Logged {log_name} entry to {path}")
             return
         except Exception as log_error:
             last_error = log_error
-            print(f"  Warning: Failed to write {log_name} log at {path}: {log_error}")
+            logger.warning(f"  Warning: Failed to write {log_name} log at {path}: {log_error}")
             continue
     if last_error:
-        print(f"  Warning: Unable to write {log_name} log to any configured path.")
+        logger.warning(f"  Warning: Unable to write {log_name} log to any configured path.")
 
 
 def _log_captcha_failure():
@@ -385,8 +413,13 @@ def _extract_blocked_ip(text):
     return None
 
 
-def _log_blocked_ip(ip_address):
-    """Append a timestamped log entry for blocked IP notices."""
+def _log_blocked_ip(ip_address, location=None):
+    """Record a blocked IP in the blocked-IP registry and event history, and append it to the text log."""
+    try:
+        get_blocked_ip_registry().add(ip_address, location=location, reason="site block message")
+        get_event_store().record_ip_event(ip_address, "blocked", location=location, run_id=get_run_id())
+    except Exception as store_error:
+        logger.warning(f"  Warning: Failed to record blocked IP in event store: {store_error}")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     _log_to_paths(IP_BLOCKED_LOG_PATHS, f"{timestamp} - {ip_address}\n", "blocked IP")
 
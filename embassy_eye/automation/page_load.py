@@ -0,0 +1,109 @@
+"""
+Page-load strategy and per-page readiness conditions for the Selenium driver.
+
+With the `eager` or `none` page-load strategy, driver.get and driver.refresh
+return before images, fonts and third-party scripts have loaded. Navigation
+then waits only for what the scraper needs: a PageReadiness lists the CSS
+selectors that must all be present, and wait_for_page polls for them with a
+single script call per poll.
+
+Under `none` the previous document can still be showing when driver.get
+returns, so call mark_document_stale() before navigating; probes of the old
+document are then ignored.
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Tuple
+
+from ..config.settings import get_settings
+
+PROBE_TEXT_CHARS = 4096
+POLL_INTERVAL = 0.1
+
+# One round trip: staleness marker, title, start of the body text, and readiness selectors
+PAGE_PROBE_SCRIPT = """
+var selectors = arguments[1] || [];
+var body = document.body;
+return {
+    stale: window.__embassyEyeStale === true,
+    state: document.readyState,
+    title: document.title || "",
+    text: body ? (body.innerText || "").slice(0, arguments[0]) : "",
+    ready: selectors.every(function(selector) { return !!document.querySelector(selector); })
+};
+"""
+MARK_STALE_SCRIPT = "window.__embassyEyeStale = true;"
+
+
+@dataclass(frozen=True)
+class PageReadiness:
+    """What must be on a page before the scraper can work with it."""
+
+    name: str
+    selectors: Tuple[str, ...]
+    # Human-like pause once the page is ready (seconds, uniform range)
+    settle_delay: Tuple[float, float] = (0.5, 1.5)
+
+    def settle(self) -> None:
+        time.sleep(random.uniform(*self.settle_delay))
+
+
+# Hungary booking page: the form is present and the consulate dropdown component has rendered
+BOOKING_FORM = PageReadiness(
+    name="booking_form",
+    selectors=("form", "[name*='ugyfelszolgalat']"),
+)
+
+
+def page_load_strategy() -> str:
+    """Configured Selenium page-load strategy (PAGE_LOAD_STRATEGY, default eager)."""
+    return get_settings().page_load_strategy
+
+
+def mark_document_stale(driver) -> None:
+    """Flag the current document so probes can tell it apart from the one being loaded."""
+    try:
+        driver.execute_script(MARK_STALE_SCRIPT)
+    except Exception:
+        pass
+
+
+def probe_page(driver, selectors: Sequence[str] = (), max_chars: int = PROBE_TEXT_CHARS) -> Optional[dict]:
+    """
+    Return {'stale', 'state', 'title', 'text', 'ready'} for the current document, or None.
+
+    None means the script could not run, e.g. while the document is being replaced.
+    """
+    try:
+        return driver.execute_script(PAGE_PROBE_SCRIPT, max_chars, list(selectors))
+    except Exception:
+        return None
+
+
+def wait_for_page(
+    driver,
+    readiness: PageReadiness,
+    timeout: float,
+    stop: Optional[Callable[[dict], object]] = None,
+) -> Tuple[Optional[dict], object]:
+    """
+    Poll until the page is ready, stop(probe) returns something truthy, or timeout.
+
+    Returns (last probe of the new document or None, stop's result or None).
+    """
+    deadline = time.monotonic() + timeout
+    probe = None
+    while True:
+        current = probe_page(driver, readiness.selectors)
+        if current and not current.get("stale"):
+            probe = current
+            stopped = stop(probe) if stop else None
+            if stopped:
+                return probe, stopped
+            if probe.get("ready"):
+                return probe, None
+        if time.monotonic() >= deadline:
+            return probe, None
+        time.sleep(POLL_INTERVAL)
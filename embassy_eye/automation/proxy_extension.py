@@ -0,0 +1,181 @@
+"""
+Cached Chrome extension for authenticated proxies.
+
+Chrome cannot take proxy credentials on the command line, so create_driver
+loads a small Manifest V3 extension that sets the proxy and answers the auth
+challenge. The extension lives in a content-addressed cache: its directory is
+named after a hash of (scheme, host, port, username), it is written once and
+reused by every later driver for the same upstream, and directories that have
+not been used for EMBASSY_EYE_PROXY_EXT_TTL_DAYS are garbage-collected. A
+changed password rewrites the files in place.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from ..config.settings import get_settings
+from ..storage.cache import get_cache_dir, get_cache_root
+from ..telemetry import get_logger
+
+logger = get_logger(__name__)
+
+EXTENSION_SUBDIR = "proxy-extensions"
+# Per-run directories left in /tmp by older versions
+LEGACY_PREFIX = "proxy_auth_ext_"
+LEGACY_MAX_AGE_S = 3600
+
+MANIFEST = {
+    "manifest_version": 3,
+    "name": "Proxy Auth",
+    "version": "1.0",
+    "permissions": ["proxy", "webRequest", "webRequestAuthProvider"],
+    "host_permissions": ["<all_urls>"],
+    "background": {"service_worker": "background.js"},
+}
+
+BACKGROUND_TEMPLATE = """\
+// Configure proxy settings
+chrome.proxy.settings.set({{
+    value: {{
+        mode: "fixed_servers",
+        rules: {{
+            singleProxy: {{
+                host: {host},
+                port: {port},
+                scheme: {scheme}
+            }},
+            bypassList: ["localhost", "127.0.0.1"]
+        }}
+    }},
+    scope: "regular"
+}}, function() {{}});
+
+// Supply proxy auth credentials when prompted
+chrome.webRequest.onAuthRequired.addListener(
+    function(details) {{
+        return {{
+            authCredentials: {{
+                username: {username},
+                password: {password}
+            }}
+        }};
+    }},
+    {{urls: ["<all_urls>"]}},
+    ["blocking"]
+);
+"""
+
+_gc_lock = threading.Lock()
+_gc_done = False
+
+
+def split_proxy_server(server: str) -> Tuple[str, str, int]:
+    """Return (scheme, host, port) for a proxy server URL or bare host:port."""
+    parsed = urlparse(server if "://" in server else f"http://{server}")
+    scheme = parsed.scheme or "http"
+    return scheme, parsed.hostname or "", parsed.port or (443 if scheme == "https" else 80)
+
+
+def extension_key(scheme: str, host: str, port: int, username: str) -> str:
+    """Cache key of an extension: hash of the upstream and the user it authenticates as."""
+    material = "\0".join((scheme.lower(), host.lower(), str(port), username))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:20]
+
+
+def _render(scheme: str, host: str, port: int, username: str, password: str) -> dict:
+    # json.dumps quotes and escapes, so credentials with quotes or backslashes stay valid JavaScript
+    background = BACKGROUND_TEMPLATE.format(
+        host=json.dumps(host), port=port, scheme=json.dumps(scheme),
+        username=json.dumps(username), password=json.dumps(password),
+    )
+    return {"manifest.json": json.dumps(MANIFEST, indent=4), "background.js": background}
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def get_proxy_auth_extension(server: str, username: str, password: str) -> Path:
+    """
+    Return the directory of the proxy-auth extension for an upstream, creating it on first use.
+
+    Args:
+        server: Proxy URL or host:port (scheme defaults to http).
+        username: Proxy user; may be URL-quoted.
+        password: Proxy password; may be URL-quoted.
+    """
+    gc_proxy_extensions()
+    scheme, host, port = split_proxy_server(server)
+    username, password = unquote(username), unquote(password)
+    ext_dir = get_cache_dir(EXTENSION_SUBDIR) / extension_key(scheme, host, port, username)
+    files = _render(scheme, host, port, username, password)
+
+    ext_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+    rewritten = False
+    for name, content in files.items():
+        path = ext_dir / name
+        try:
+            current = path.read_text(encoding="utf-8")
+        except OSError:
+            current = None
+        if current != content:
+            _write_atomic(path, content)
+            rewritten = True
+    # The directory mtime marks last use for garbage collection
+    os.utime(ext_dir)
+    if rewritten:
+        logger.info(f"  Wrote proxy authentication extension to {ext_dir}")
+    return ext_dir
+
+
+def gc_proxy_extensions(max_age_days: Optional[float] = None, force: bool = False) -> int:
+    """
+    Delete cached extensions unused for max_age_days and stale per-run /tmp directories.
+
+    Runs once per process unless force is set; returns the number of directories removed.
+    """
+    global _gc_done
+    with _gc_lock:
+        if _gc_done and not force:
+            return 0
+        _gc_done = True
+
+    ttl_days = get_settings().proxy_extension_ttl_days if max_age_days is None else max_age_days
+    extension_dir = get_cache_root() / EXTENSION_SUBDIR
+    now = time.time()
+    candidates = []
+    if ttl_days > 0 and extension_dir.is_dir():
+        candidates += [(path, ttl_days * 86400) for path in extension_dir.iterdir() if path.is_dir()]
+    tmp_root = Path(tempfile.gettempdir())
+    candidates += [(path, LEGACY_MAX_AGE_S) for path in tmp_root.glob(f"{LEGACY_PREFIX}*") if path.is_dir()]
+
+    removed = 0
+    for path, max_age in candidates:
+        try:
+            if now - path.stat().st_mtime < max_age:
+                continue
+            shutil.rmtree(path)
+            removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info(f"  Removed {removed} unused proxy authentication extension(s)")
+    return removed
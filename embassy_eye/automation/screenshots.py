@@ -0,0 +1,122 @@
+"""
+Notification screenshots: clipped to the relevant region and encoded small.
+
+Chrome does the work in one CDP Page.captureScreenshot call: `clip` limits
+the capture to the first visible element matching the clip selectors (the
+alert or calendar container), `scale` caps the width, and the image is
+encoded as JPEG or WebP at the configured quality instead of a full-page
+PNG. The upload to Telegram sits between "slot found" and "human
+notified", so fewer bytes mean a faster alert.
+
+SCREENSHOT_FORMAT (jpeg, webp or png), SCREENSHOT_QUALITY and
+SCREENSHOT_MAX_WIDTH configure the output.
+"""
+
+import base64
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from ..config.settings import get_settings
+from ..telemetry import get_logger
+from ..telemetry.metrics import SCREENSHOT_BYTES
+
+logger = get_logger(__name__)
+
+# Regions worth showing in a slot notification, most specific first
+CLIP_SELECTORS = (
+    "[role='dialog']",
+    ".modal-content",
+    "[role='alert']",
+    "[class*='calendar']",
+    "form",
+)
+CLIP_PADDING = 16
+
+# First visible match of the selectors, as a page-coordinate rectangle
+CLIP_RECT_SCRIPT = """
+var selectors = arguments[0], pad = arguments[1];
+for (var i = 0; i < selectors.length; i++) {
+    var element = document.querySelector(selectors[i]);
+    if (!element) continue;
+    var rect = element.getBoundingClientRect();
+    if (rect.width < 1 || rect.height < 1) continue;
+    var x = Math.max(0, rect.left + window.scrollX - pad);
+    var y = Math.max(0, rect.top + window.scrollY - pad);
+    return {selector: selectors[i], x: x, y: y, width: rect.width + 2 * pad, height: rect.height + 2 * pad};
+}
+return null;
+"""
+
+
+@dataclass
+class Screenshot:
+    """An encoded screenshot and what it cost."""
+
+    data: bytes
+    image_format: str
+    width: int
+    height: int
+    encode_ms: float
+    region: str
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+def _full_page_rect(driver) -> dict:
+    metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+    content = metrics.get("cssContentSize") or metrics["contentSize"]
+    return {"selector": "page", "x": 0, "y": 0, "width": content["width"], "height": content["height"]}
+
+
+def capture_screenshot(
+    driver,
+    selectors: Sequence[str] = CLIP_SELECTORS,
+    image_format: Optional[str] = None,
+    quality: Optional[int] = None,
+    max_width: Optional[int] = None,
+) -> Optional[Screenshot]:
+    """
+    Capture the first visible region matching selectors (else the full page), scaled and encoded.
+
+    Returns None if Chrome could not take the screenshot.
+    """
+    settings = get_settings()
+    image_format = image_format or settings.screenshot_format
+    quality = quality or settings.screenshot_quality
+    max_width = max_width or settings.screenshot_max_width
+
+    try:
+        rect = driver.execute_script(CLIP_RECT_SCRIPT, list(selectors), CLIP_PADDING) if selectors else None
+        rect = rect or _full_page_rect(driver)
+        scale = min(1.0, max_width / rect["width"]) if max_width else 1.0
+        params = {
+            "format": image_format,
+            "clip": {"x": rect["x"], "y": rect["y"], "width": rect["width"], "height": rect["height"], "scale": scale},
+            "captureBeyondViewport": True,
+        }
+        if image_format != "png":
+            params["quality"] = quality
+        started = time.perf_counter()
+        result = driver.execute_cdp_cmd("Page.captureScreenshot", params)
+        encode_ms = (time.perf_counter() - started) * 1000
+    except Exception as e:
+        logger.warning(f"  Warning: Screenshot failed ({e})")
+        return None
+
+    shot = Screenshot(
+        data=base64.b64decode(result["data"]),
+        image_format=image_format,
+        width=round(rect["width"] * scale),
+        height=round(rect["height"] * scale),
+        encode_ms=encode_ms,
+        region=rect["selector"],
+    )
+    SCREENSHOT_BYTES.observe(shot.size, format=image_format)
+    logger.info(
+        f"  Screenshot: {image_format} {shot.width}x{shot.height} of {shot.region}, "
+        f"{shot.size // 1024} KB in {encode_ms:.0f}ms"
+    )
+    return shot
@@ -4,11 +4,13 @@ WebDriver setup and utility functions.
 
 import sys
 import os
+import logging
 import random
 import json
 import time
 import threading
 import base64
+from urllib.parse import urlparse
 
 # Disable PyCharm debugger tracing to avoid warnings
 if 'pydevd' in sys.modules:
@@ -18,8 +20,7 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.proxy import Proxy, ProxyType
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import WebDriverException
 
 try:
     import undetected_chromedriver as uc
@@ -27,8 +28,26 @@ try:
 except ImportError:
     UC_AVAILABLE = False
 
+from ..netstate.proxy_pool import get_proxy_pool, is_connection_error
+from ..netstate.resource_policy import (
+    PERFORMANCE_LOG_CAPABILITY,
+    apply_to_driver,
+    collect_driver_stats,
+    get_resource_policy,
+    get_run_stats,
+)
+from ..runner.reaper import get_spawn_registry
+from ..runner.startup import StartupGraph
+from ..runner.teardown import schedule_teardown
+from ..runner.watchdog import ChromeWatchdog, chrome_processes, driver_pids, kill_new_processes
+from .chrome_cache import uc_chrome_kwargs
+from .modal_checker import blocked_ip_from_probe
+from .page_load import BOOKING_FORM, mark_document_stale, page_load_strategy, wait_for_page
+from .proxy_extension import get_proxy_auth_extension, split_proxy_server
 from ..scrapers.hungary.config import BOOKING_URL, PAGE_LOAD_WAIT
-import os
+from ..telemetry import get_logger
+
+logger = get_logger(__name__)
 
 
 # Large pool of realistic, up-to-date user agents (2024-2025)
@@ -148,63 +167,128 @@ def get_random_device_profile():
 
 def test_network_connectivity():
     """Test DNS resolution to diagnose VPN/Docker issues."""
-    print("\n  === DNS Test ===")
-    sys.stdout.flush()
+    logger.info("\n  === DNS Test ===")
     
     import socket
     
     tests_passed = 0
     tests_failed = 0
     
-    # Test DNS resolution
-    print("  Testing DNS resolution...")
-    sys.stdout.flush()
-    try:
-        socket.gethostbyname('google.com')
-        print("    ✓ DNS resolution: OK")
-        tests_passed += 1
-    except Exception as e:
-        print(f"    ✗ DNS resolution: FAILED ({e})")
-        tests_failed += 1
-    sys.stdout.flush()
+    # Test DNS resolution; resolving the booking host also warms the resolver cache for navigation
+    logger.info("  Testing DNS resolution...")
+    for host in (urlparse(BOOKING_URL).hostname, 'google.com'):
+        try:
+            socket.gethostbyname(host)
+            logger.info(f"    ✓ DNS resolution ({host}): OK")
+            tests_passed += 1
+        except Exception as e:
+            logger.error(f"    ✗ DNS resolution ({host}): FAILED ({e})")
+            tests_failed += 1
     
-    print(f"\n  === Test Summary: {tests_passed} passed, {tests_failed} failed ===")
-    sys.stdout.flush()
+    logger.info(f"\n  === Test Summary: {tests_passed} passed, {tests_failed} failed ===")
     
     if tests_failed > 0:
-        print("  ⚠ WARNING: DNS test failed. This might cause Chrome to hang.")
-        sys.stdout.flush()
+        logger.warning("  ⚠ WARNING: DNS test failed. This might cause Chrome to hang.")
     
     return tests_failed == 0
 
 
-def create_driver(headless=False):
+class ProxyConnectionError(WebDriverException):
+    """Navigation kept failing with connection errors (dead exit or proxy upstream)."""
+
+
+def _proxy_settings(proxy=None):
+    """Return (server, username, password) for Chrome; empty strings when no proxy is configured.
+    
+    Uses the given pool upstream, else the first upstream of the cached proxy pool
+    (HTTP_PROXY/HTTPS_PROXY set by the Docker proxy service, then PROXY_SERVER).
+    """
+    if proxy is None:
+        pool = get_proxy_pool()
+        if not pool:
+            return "", "", ""
+        proxy = pool.upstreams[0]
+    return proxy.server, proxy.username, proxy.password
+
+
+def _prepare_proxy(proxy=None):
+    """Return (server, username, password, extension dir or None), writing the auth extension if needed."""
+    proxy_server, proxy_username, proxy_password = _proxy_settings(proxy)
+    ext_dir = None
+    if proxy_server and proxy_username and proxy_password:
+        ext_dir = get_proxy_auth_extension(proxy_server, proxy_username, proxy_password)
+    return proxy_server, proxy_username, proxy_password, ext_dir
+
+
+def _configure_proxy(options, proxy_setup):
+    """Point Chrome at the proxy; authenticated proxies go through the cached auth extension."""
+    proxy_server, proxy_username, proxy_password, ext_dir = proxy_setup
+    if not proxy_server:
+        return
+    if ext_dir:
+        # Don't set --proxy-server when using the chrome.proxy API; the extension configures the proxy
+        options.add_argument(f'--load-extension={ext_dir}')
+        scheme, host, port = split_proxy_server(proxy_server)
+        logger.info(f"  Using proxy: {scheme}://{proxy_username}:***@{host}:{port}")
+    else:
+        options.add_argument(f'--proxy-server={proxy_server}')
+        logger.info(f"  Using proxy: {proxy_server}")
+
+
+def create_driver(headless=False, proxy=None):
     """Create and configure a Chrome WebDriver instance with anti-detection measures.
     
     Each run uses a randomly generated device profile to avoid fingerprinting.
+    Startup runs as a dependency graph (runner.startup): the DNS check and
+    pre-resolution of the booking host, the device profile, the Chrome
+    version/patched driver lookup and the proxy extension are prepared
+    concurrently, and Chrome is spawned as soon as the last of its inputs is
+    ready. The DNS check holds up neither the spawn nor the return: nothing
+    depends on it, so it finishes in the background.
+    
+    Args:
+        headless: Run Chrome headless
+        proxy: ProxyUpstream assigned from the proxy pool (default: env-configured proxy)
     """
-    # Test network connectivity first (especially important with VPN)
-    print("  Testing network connectivity...")
-    sys.stdout.flush()
+    graph = StartupGraph("hungary")
+    graph.add("dns", _check_network, optional=True)
+    graph.add("profile", _generate_profile)
+    graph.add("chrome_version", uc_chrome_kwargs if UC_AVAILABLE else dict, optional=True)
+    graph.add("proxy_extension", lambda: _prepare_proxy(proxy))
+    graph.add(
+        "driver",
+        lambda profile, chrome_version, proxy_extension: _spawn_driver(
+            headless, profile, chrome_version, proxy_extension
+        ),
+        deps=("profile", "chrome_version", "proxy_extension"),
+    )
+    return graph.run()["driver"]
+
+
+def _check_network():
+    """DNS check (especially important with VPN); also warms the resolver cache for the booking host."""
+    logger.info("  Testing network connectivity...")
     network_ok = test_network_connectivity()
-    
     if not network_ok:
-        print("  ⚠ Network connectivity issues detected. Chrome might hang during initialization.")
-        print("  Continuing anyway, but expect potential delays...")
-        sys.stdout.flush()
-    
-    print("  Generating random device profile...")
-    sys.stdout.flush()
+        logger.warning("  ⚠ Network connectivity issues detected. Chrome might hang during initialization.")
+        logger.info("  Continuing anyway, but expect potential delays...")
+    return network_ok
+
+
+def _generate_profile():
+    logger.info("  Generating random device profile...")
     # Generate a random device profile for this session
     profile = get_random_device_profile()
-    print(f"  Using user agent: {profile['user_agent'][:50]}...")
-    sys.stdout.flush()
-    
+    logger.info(f"  Using user agent: {profile['user_agent'][:50]}...")
+    return profile
+
+
+def _spawn_driver(headless, profile, uc_kwargs, proxy_setup):
+    """Start Chrome with the prepared profile, Chrome driver arguments and proxy setup."""
     if UC_AVAILABLE:
         # Try undetected-chromedriver first, fall back to regular selenium on error
         try:
-            print("  Attempting to use undetected-chromedriver...")
-            sys.stdout.flush()
+            logger.info("  Attempting to use undetected-chromedriver...")
             # Use undetected-chromedriver for better anti-detection
             options = uc.ChromeOptions()
             if headless:
@@ -254,128 +338,34 @@ def create_driver(headless=False):
             # Use random window size from profile
             options.add_argument(f'--window-size={profile["width"]},{profile["height"]}')
             
-            # Configure proxy if available
-            # Use HTTP_PROXY/HTTPS_PROXY environment variables (set by Docker proxy service)
-            http_proxy = os.getenv("HTTP_PROXY", "").strip()
-            https_proxy = os.getenv("HTTPS_PROXY", "").strip()
-            proxy_server = http_proxy or https_proxy
+            # Return from driver.get before subresources load (PAGE_LOAD_STRATEGY); callers wait for what they need
+            options.page_load_strategy = page_load_strategy()
+            _configure_resource_logging(options)
             
-            # Fallback to PROXY_SERVER if HTTP_PROXY is not set (for backward compatibility)
-            if not proxy_server:
-                proxy_server = os.getenv("PROXY_SERVER", "").strip()
+            # Configure proxy if available (assigned pool upstream, else HTTP_PROXY/PROXY_SERVER)
+            _configure_proxy(options, proxy_setup)
             
-            proxy_username = os.getenv("PROXY_USERNAME", "").strip()
-            proxy_password = os.getenv("PROXY_PASSWORD", "").strip()
-            
-            if proxy_server:
-                # Load proxy authentication extension if credentials are provided
-                if proxy_username and proxy_password:
-                    # Create dynamic extension with credentials baked in
-                    # Based on: https://stackoverflow.com/questions/17082425/running-selenium-webdriver-with-a-proxy-in-python
-                    import tempfile
-                    from urllib.parse import urlparse
-                    
-                    parsed = urlparse(proxy_server)
-                    proxy_host = parsed.hostname
-                    proxy_port = parsed.port or (443 if parsed.scheme == 'https' else 80)
-                    
-                    # Extension manifest (Manifest V3)
-                    manifest_json = '''{
-    "manifest_version": 3,
-    "name": "Proxy Auth",
-    "version": "1.0",
-    "permissions": ["proxy", "webRequest", "webRequestAuthProvider"],
-    "host_permissions": ["<all_urls>"],
-    "background": {"service_worker": "background.js"}
-}'''
-                    
-                    # Background script with credentials hardcoded
-                    background_js = f'''
-// Configure proxy settings
-chrome.proxy.settings.set({{
-    value: {{
-        mode: "fixed_servers",
-        rules: {{
-            singleProxy: {{
-                host: "{proxy_host}",
-                port: {proxy_port},
-                scheme: "{parsed.scheme or 'http'}"
-            }},
-            bypassList: ["localhost", "127.0.0.1"]
-        }}
-    }},
-    scope: "regular"
-}}, function() {{}});
-
-// Supply proxy auth credentials when prompted
-chrome.webRequest.onAuthRequired.addListener(
-    function(details) {{
-        return {{
-            authCredentials: {{
-                username: "{proxy_username}",
-                password: "{proxy_password}"
-            }}
-        }};
-    }},
-    {{urls: ["<all_urls>"]}},
-    ["blocking"]
-);
-'''
-                    
-                    # Create temporary extension directory
-                    ext_dir = tempfile.mkdtemp(prefix="proxy_auth_ext_")
-                    
-                    with open(os.path.join(ext_dir, "manifest.json"), 'w') as f:
-                        f.write(manifest_json)
-                    
-                    with open(os.path.join(ext_dir, "background.js"), 'w') as f:
-                        f.write(background_js)
-                    
-                    options.add_argument(f'--load-extension={ext_dir}')
-                    print(f"  Created dynamic proxy authentication extension")
-                    print(f"  Using proxy: {parsed.scheme}://{proxy_username}:***@{proxy_host}:{proxy_port}")
-                    
-                    # Note: Don't set --proxy-server when using chrome.proxy API
-                    # The extension handles proxy configuration
-                else:
-                    options.add_argument(f'--proxy-server={proxy_server}')
-                    print(f"  Using proxy: {proxy_server}")
-                sys.stdout.flush()
-            
-            print("  Creating Chrome driver instance...")
-            sys.stdout.flush()
+            logger.info("  Creating Chrome driver instance...")
             
             # Create driver with timeout protection (for VPN-related hangs)
             driver = None
             driver_error = None
+            abandoned = threading.Event()
+            # Chrome processes that existed before this start, so a timed-out start's leftovers can be told apart
+            chrome_before = chrome_processes()
             
             def create_driver_thread():
                 nonlocal driver, driver_error
                 try:
-                    # Try to get Chrome version to avoid auto-detection delays
-                    import subprocess
-                    try:
-                        chrome_version_output = subprocess.check_output(
-                            ['google-chrome', '--version'], 
-                            stderr=subprocess.STDOUT, 
-                            timeout=5
-                        ).decode('utf-8')
-                        # Extract version number (e.g., "Google Chrome 131.0.6778.85" -> 131)
-                        import re
-                        version_match = re.search(r'(\d+)\.', chrome_version_output)
-                        if version_match:
-                            version_main = int(version_match.group(1))
-                            print(f"  Detected Chrome version: {version_main}")
-                            sys.stdout.flush()
-                            # Use specific version to avoid auto-detection
-                            driver = uc.Chrome(options=options, use_subprocess=True, version_main=version_main)
-                        else:
-                            driver = uc.Chrome(options=options, use_subprocess=True)
-                    except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError, ValueError):
-                        # Fallback to auto-detection if version detection fails
-                        print("  Could not detect Chrome version, using auto-detection...")
-                        sys.stdout.flush()
-                        driver = uc.Chrome(options=options, use_subprocess=True)
+                    # Cached Chrome version and pre-patched driver (detected once per Chrome upgrade)
+                    if not uc_kwargs:
+                        logger.info("  Could not detect Chrome version, using auto-detection...")
+                    created = uc.Chrome(options=options, use_subprocess=True, **(uc_kwargs or {}))
+                    if abandoned.is_set():
+                        # create_driver gave up on this start; nobody else will quit the browser
+                        created.quit()
+                        return
+                    driver = created
                 except Exception as e:
                     driver_error = e
             
@@ -385,10 +375,11 @@ chrome.webRequest.onAuthRequired.addListener(
             driver_thread.join(timeout=60)  # 60 second timeout
             
             if driver_thread.is_alive():
-                print("  ERROR: Chrome driver initialization timed out after 60 seconds")
-                print("  This is likely caused by VPN blocking Chrome's network connections")
-                print("  Trying fallback to regular Selenium...")
-                sys.stdout.flush()
+                abandoned.set()
+                kill_new_processes(chrome_before)
+                logger.info("  ERROR: Chrome driver initialization timed out after 60 seconds")
+                logger.info("  This is likely caused by VPN blocking Chrome's network connections")
+                logger.info("  Trying fallback to regular Selenium...")
                 raise TimeoutError("Chrome driver initialization timed out")
             
             if driver_error:
@@ -397,26 +388,23 @@ chrome.webRequest.onAuthRequired.addListener(
             if driver is None:
                 raise RuntimeError("Failed to create Chrome driver (unknown error)")
             
-            print("  Applying fingerprinting protection...")
-            sys.stdout.flush()
+            logger.info("  Applying fingerprinting protection...")
             # Apply comprehensive fingerprinting protection via CDP
             _apply_fingerprint_protection(driver, profile)
+            _apply_resource_policy(driver)
             
             # Proxy authentication is handled by the extension with hardcoded credentials
-            if proxy_server and proxy_username and proxy_password:
-                print("  ✓ Proxy authentication handled by extension")
-                sys.stdout.flush()
+            if proxy_setup[3]:
+                logger.info("  ✓ Proxy authentication handled by extension")
 
-            
+            _track_driver(driver, headless)
             return driver
         except Exception as e:
-            print(f"  Warning: undetected-chromedriver failed ({e}), falling back to regular selenium with stealth")
-            sys.stdout.flush()
+            logger.warning(f"  Warning: undetected-chromedriver failed ({e}), falling back to regular selenium with stealth")
             # Fall through to regular selenium implementation
     
     # Fallback to regular selenium with manual anti-detection (used if UC not available or fails)
-    print("  Using regular Selenium WebDriver...")
-    sys.stdout.flush()
+    logger.info("  Using regular Selenium WebDriver...")
     options = webdriver.ChromeOptions()
     
     # Network-disabling flags to prevent hangs (especially with VPN)
@@ -466,95 +454,78 @@ chrome.webRequest.onAuthRequired.addListener(
     # Use random window size from profile
     options.add_argument(f'--window-size={profile["width"]},{profile["height"]}')
     
-    # Configure proxy if available
-    # Use HTTP_PROXY/HTTPS_PROXY environment variables (set by Docker proxy service)
-    http_proxy = os.getenv("HTTP_PROXY", "").strip()
-    https_proxy = os.getenv("HTTPS_PROXY", "").strip()
-    proxy_server = http_proxy or https_proxy
+    # Return from driver.get before subresources load (PAGE_LOAD_STRATEGY); callers wait for what they need
+    options.page_load_strategy = page_load_strategy()
+    _configure_resource_logging(options)
     
-    # Fallback to PROXY_SERVER if HTTP_PROXY is not set (for backward compatibility)
-    if not proxy_server:
-        proxy_server = os.getenv("PROXY_SERVER", "").strip()
-    
-    proxy_username = os.getenv("PROXY_USERNAME", "").strip()
-    proxy_password = os.getenv("PROXY_PASSWORD", "").strip()
+    # Configure proxy if available (assigned pool upstream, else HTTP_PROXY/PROXY_SERVER)
+    _configure_proxy(options, proxy_setup)
     
-    if proxy_server:
-        if proxy_username and proxy_password:
-            # Create dynamic extension with credentials baked in (same as UC path)
-            import tempfile
-            from urllib.parse import urlparse
-            
-            parsed = urlparse(proxy_server)
-            proxy_host = parsed.hostname
-            proxy_port = parsed.port or (443 if parsed.scheme == 'https' else 80)
-            
-            manifest_json = '''{
-    "manifest_version": 3,
-    "name": "Proxy Auth",
-    "version": "1.0",
-    "permissions": ["proxy", "webRequest", "webRequestAuthProvider"],
-    "host_permissions": ["<all_urls>"],
-    "background": {"service_worker": "background.js"}
-}'''
-            
-            background_js = f'''
-chrome.proxy.settings.set({{
-    value: {{
-        mode: "fixed_servers",
-        rules: {{
-            singleProxy: {{
-                host: "{proxy_host}",
-                port: {proxy_port},
-                scheme: "{parsed.scheme or 'http'}"
-            }},
-            bypassList: ["localhost", "127.0.0.1"]
-        }}
-    }},
-    scope: "regular"
-}}, function() {{}});
-
-chrome.webRequest.onAuthRequired.addListener(
-    function(details) {{
-        return {{
-            authCredentials: {{
-                username: "{proxy_username}",
-                password: "{proxy_password}"
-            }}
-        }};
-    }},
-    {{urls: ["<all_urls>"]}},
-    ["blocking"]
-);
-'''
-            
-            ext_dir = tempfile.mkdtemp(prefix="proxy_auth_ext_")
-            with open(os.path.join(ext_dir, "manifest.json"), 'w') as f:
-                f.write(manifest_json)
-            with open(os.path.join(ext_dir, "background.js"), 'w') as f:
-                f.write(background_js)
-            
-            options.add_argument(f'--load-extension={ext_dir}')
-            print(f"  Created dynamic proxy authentication extension")
-            print(f"  Using proxy: {parsed.scheme}://{proxy_username}:***@{proxy_host}:{proxy_port}")
-        else:
-            options.add_argument(f'--proxy-server={proxy_server}')
-            print(f"  Using proxy: {proxy_server}")
-        sys.stdout.flush()
-
-    
-    print("  Creating Chrome driver instance...")
-    sys.stdout.flush()
+    logger.info("  Creating Chrome driver instance...")
     driver = webdriver.Chrome(options=options)
     
-    print("  Applying fingerprinting protection...")
-    sys.stdout.flush()
+    logger.info("  Applying fingerprinting protection...")
     # Apply comprehensive fingerprinting protection via CDP
     _apply_fingerprint_protection(driver, profile)
+    _apply_resource_policy(driver)
+    _track_driver(driver, headless)
     
     return driver
 
 
+def _configure_resource_logging(options):
+    """Keep CDP Network events in the performance log for bandwidth accounting."""
+    options.set_capability(*PERFORMANCE_LOG_CAPABILITY)
+
+
+def _apply_resource_policy(driver):
+    """Block images, fonts and analytics the booking flow does not need."""
+    policy = get_resource_policy("hungary")
+    if not policy:
+        return
+    try:
+        apply_to_driver(driver, policy)
+        logger.info("  ✓ Resource policy applied (images, fonts, analytics blocked)")
+    except Exception as e:
+        logger.warning(f"  Warning: Could not apply resource policy: {e}")
+
+
+def _track_driver(driver, headless):
+    """
+    Register the driver's processes and profile with the reaper, and its process
+    tree with the Chrome watchdog (limits enforced only when headless).
+    """
+    pids = driver_pids(driver)
+    registry = get_spawn_registry()
+    driver.spawn_entries = [registry.register_process("hungary_chrome", pid) for pid in pids]
+    driver.spawn_entries.append(registry.register_dir("hungary_profile", getattr(driver, "user_data_dir", None)))
+    driver.chrome_watch = ChromeWatchdog.instance().watch("hungary", *pids, enforce=headless)
+
+
+def quit_driver(driver):
+    """
+    Count the driver's traffic for the run report, then quit it in a background teardown.
+
+    The caller does not wait for Chrome to exit (see runner.teardown). None
+    and drivers already handed to a teardown are skipped, so cleanup code
+    that still holds a driver replaced by a failed failover or recycle does
+    not quit it twice.
+    """
+    if driver is None or getattr(driver, "teardown_scheduled", False):
+        return
+    driver.teardown_scheduled = True
+    collect_driver_stats(driver, get_run_stats("hungary"))
+    ChromeWatchdog.instance().unwatch(getattr(driver, "chrome_watch", None))
+    schedule_teardown("hungary_driver", _quit_and_release, driver)
+
+
+def _quit_and_release(driver):
+    try:
+        driver.quit()
+    finally:
+        get_spawn_registry().release(*getattr(driver, "spawn_entries", ()))
+
+
 def _apply_fingerprint_protection(driver, profile):
     """Apply comprehensive fingerprinting protection via Chrome DevTools Protocol."""
     # Format languages array for JavaScript
@@ -732,9 +703,11 @@ def navigate_to_booking_page(driver, max_retries=3):
         WebDriverWait instance
         
     Raises:
-        WebDriverException: If navigation fails after all retries
+        ProxyConnectionError: If every attempt failed with a connection error
+            (the caller can move the session to another proxy upstream)
+        WebDriverException: If navigation fails for any other reason
     """
-    print("Opening https://konzinfobooking.mfa.gov.hu/...")
+    logger.info("Opening https://konzinfobooking.mfa.gov.hu/...")
     
     # Add random delay before navigation to simulate human behavior
     time.sleep(random.uniform(1, 3))
@@ -742,33 +715,19 @@ def navigate_to_booking_page(driver, max_retries=3):
     # Retry logic for connection errors
     for attempt in range(1, max_retries + 1):
         try:
+            mark_document_stale(driver)
             driver.get(BOOKING_URL)
             # If we get here, navigation succeeded
             break
         except WebDriverException as e:
-            error_msg = str(e).lower()
-            
             # Check if it's a connection-related error
-            is_connection_error = any(
-                err in error_msg 
-                for err in [
-                    'err_connection_closed',
-                    'err_connection_reset',
-                    'err_connection_refused',
-                    'err_connection_timed_out',
-                    'err_network_changed',
-                    'net::err_connection',
-                    'connection closed',
-                    'connection reset',
-                ]
-            )
+            connection_error = is_connection_error(str(e))
             
-            if is_connection_error and attempt < max_retries:
+            if connection_error and attempt < max_retries:
                 # Exponential backoff: 2^attempt seconds, with some randomness
                 wait_time = (2 ** attempt) + random.uniform(0.5, 1.5)
-                print(f"  Connection error on attempt {attempt}/{max_retries}: {e}")
-                print(f"  Retrying in {wait_time:.1f} seconds...")
-                sys.stdout.flush()
+                logger.warning(f"  Connection error on attempt {attempt}/{max_retries}: {e}")
+                logger.info(f"  Retrying in {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
                 
                 # Check if driver is still valid before retrying
@@ -776,14 +735,14 @@ def navigate_to_booking_page(driver, max_retries=3):
                     # Try to get current URL to verify driver is still responsive
                     _ = driver.current_url
                 except Exception:
-                    print("  Driver appears to be in a bad state, cannot retry")
+                    logger.info("  Driver appears to be in a bad state, cannot retry")
                     raise
             else:
                 # Not a connection error, or we've exhausted retries
                 if attempt >= max_retries:
                     # Last attempt failed, raise with context
-                    if is_connection_error:
-                        raise WebDriverException(
+                    if connection_error:
+                        raise ProxyConnectionError(
                             f"Failed to navigate after {max_retries} attempts: {e}"
                         ) from e
                     else:
@@ -794,37 +753,39 @@ def navigate_to_booking_page(driver, max_retries=3):
                     raise
     
     wait = WebDriverWait(driver, PAGE_LOAD_WAIT)
-    print("Waiting for page to load...")
-    
-    try:
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "form")))
-        print("Form detected")
-    except TimeoutException:
-        print("Warning: Form not found, but continuing...")
-    
-    # Give page extra time to render with random delay
-    time.sleep(random.uniform(2, 4))
+    logger.info("Waiting for page to load...")
+    
+    # Ready once the form and the consulate dropdown are rendered; a block page is caught as soon as it shows
+    probe, blocked_ip = wait_for_page(driver, BOOKING_FORM, PAGE_LOAD_WAIT, stop=blocked_ip_from_probe)
+    if blocked_ip:
+        logger.info(f"Block page detected for {blocked_ip}, skipping render delay")
+    elif probe and probe.get("ready"):
+        logger.info("Form detected")
+        BOOKING_FORM.settle()
+    else:
+        logger.warning("Warning: Form not found, but continuing...")
     return wait
 
 
 def inspect_form_fields(driver):
-    """Inspect and print all form fields."""
-    print("\n=== Inspecting Form Fields ===")
+    """Inspect and log all form fields."""
+    logger.info("\n=== Inspecting Form Fields ===")
     
     inputs = driver.find_elements(By.TAG_NAME, "input")
     selects = driver.find_elements(By.TAG_NAME, "select")
     textareas = driver.find_elements(By.TAG_NAME, "textarea")
     
-    print(f"Found {len(inputs)} input fields, {len(selects)} select fields, {len(textareas)} textarea fields\n")
+    logger.info(f"Found {len(inputs)} input fields, {len(selects)} select fields, {len(textareas)} textarea fields\n")
     
-    # Debug: Print all input fields
-    print("All input fields:")
-    for i, inp in enumerate(inputs):
-        input_type = inp.get_attribute("type") or "text"
-        input_id = inp.get_attribute("id")
-        input_name = inp.get_attribute("name")
-        input_placeholder = inp.get_attribute("placeholder")
-        print(f"  [{i}] type='{input_type}', id='{input_id}', name='{input_name}', placeholder='{input_placeholder}'")
+    # Debug: Print all input fields (four WebDriver round trips per field, so only when asked)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("All input fields:")
+        for i, inp in enumerate(inputs):
+            input_type = inp.get_attribute("type") or "text"
+            input_id = inp.get_attribute("id")
+            input_name = inp.get_attribute("name")
+            input_placeholder = inp.get_attribute("placeholder")
+            logger.debug(f"  [{i}] type='{input_type}', id='{input_id}', name='{input_name}', placeholder='{input_placeholder}'")
     
     return inputs, selects, textareas
 
@@ -839,41 +800,18 @@ def scroll_to_element(driver, element):
 def get_full_page_screenshot(driver):
     """Capture a full page screenshot using Chrome DevTools Protocol.
     
-    Returns PNG bytes of the entire page, not just the viewport.
+    Returns PNG bytes of the entire page, not just the viewport. Notifications
+    use screenshots.capture_screenshot, which clips and compresses instead.
     """
     try:
-        # Get page dimensions using JavaScript
-        page_dimensions = driver.execute_script("""
-            return {
-                width: Math.max(
-                    document.body.scrollWidth,
-                    document.body.offsetWidth,
-                    document.documentElement.clientWidth,
-                    document.documentElement.scrollWidth,
-                    document.documentElement.offsetWidth
-                ),
-                height: Math.max(
-                    document.body.scrollHeight,
-                    document.body.offsetHeight,
-                    document.documentElement.clientHeight,
-                    document.documentElement.scrollHeight,
-                    document.documentElement.offsetHeight
-                )
-            };
-        """)
-        
-        # Use Chrome DevTools Protocol to capture full page screenshot
         screenshot_result = driver.execute_cdp_cmd('Page.captureScreenshot', {
             'format': 'png',
             'captureBeyondViewport': True
         })
-        
-        # Decode base64 screenshot
-        screenshot_bytes = base64.b64decode(screenshot_result['data'])
-        return screenshot_bytes
+        return base64.b64decode(screenshot_result['data'])
         
     except Exception as e:
-        print(f"  Warning: Full page screenshot failed ({e}), falling back to viewport screenshot")
+        logger.warning(f"  Warning: Full page screenshot failed ({e}), falling back to viewport screenshot")
         # Fallback to regular viewport screenshot
         return driver.get_screenshot_as_png()
 
@@ -917,14 +855,12 @@ def get_ip_from_chrome(driver):
         # Switch back to the original window
         driver.switch_to.window(original_window)
         
-        print(f"  ✓ IP detected from Chrome: {ip_address}")
-        sys.stdout.flush()
+        logger.info(f"  ✓ IP detected from Chrome: {ip_address}")
         
         return ip_address
         
     except Exception as e:
-        print(f"  Warning: Failed to get IP from Chrome: {e}")
-        sys.stdout.flush()
+        logger.warning(f"  Warning: Failed to get IP from Chrome: {e}")
         
         # Make sure we switch back to the original window even if there's an error
         try:
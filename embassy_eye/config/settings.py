@@ -0,0 +1,339 @@
+"""
+Typed runtime settings, parsed once from the environment and .env.
+
+get_settings() returns a frozen Settings object that is built on first use
+and cached, so hot paths (create_driver, notifications) read attributes
+instead of re-parsing os.environ. reload_settings() re-reads the environment
+and the .env file for long-running processes. Callbacks registered with
+on_reload() are run afterwards, so caches built from settings (such as the
+proxy pools) can drop stale state.
+
+Like the netstate CLI, this module only needs the standard library.
+python-dotenv is optional.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional
+
+try:
+    from dotenv import dotenv_values, find_dotenv
+    DOTENV_AVAILABLE = True
+except ImportError:
+    DOTENV_AVAILABLE = False
+
+TRUE_VALUES = ("true", "1", "yes")
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+SCREENSHOT_FORMATS = ("jpeg", "webp", "png")
+LOG_FORMATS = ("text", "json")
+FALSE_VALUES = ("false", "0", "no")
+
+
+class SettingsError(ValueError):
+    """An environment variable has a value that cannot be used."""
+
+
+def _text(env: Mapping[str, str], name: str, default: str = "") -> str:
+    return (env.get(name) or default).strip()
+
+
+def _int(env: Mapping[str, str], name: str, default: int, minimum: int = 0, maximum: Optional[int] = None) -> int:
+    raw = _text(env, name)
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise SettingsError(f"{name} must be an integer, got '{raw}'") from None
+    if value < minimum:
+        raise SettingsError(f"{name} must be at least {minimum}, got {value}")
+    if maximum is not None and value > maximum:
+        raise SettingsError(f"{name} must be at most {maximum}, got {value}")
+    return value
+
+
+def _float(env: Mapping[str, str], name: str, default: float, minimum: float, maximum: float) -> float:
+    raw = _text(env, name)
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise SettingsError(f"{name} must be a number, got '{raw}'") from None
+    if not minimum <= value <= maximum:
+        raise SettingsError(f"{name} must be between {minimum:g} and {maximum:g}, got {value:g}")
+    return value
+
+
+def _flag(env: Mapping[str, str], name: str, values) -> bool:
+    return _text(env, name).lower() in values
+
+
+def _choice(env: Mapping[str, str], name: str, default: str, choices) -> str:
+    value = _text(env, name, default).lower()
+    if value not in choices:
+        raise SettingsError(f"{name} must be one of {', '.join(choices)}, got '{value}'")
+    return value
+
+
+def _cache_dir(env: Mapping[str, str]) -> str:
+    xdg_cache = _text(env, "XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return str(Path(_text(env, "EMBASSY_EYE_CACHE_DIR") or Path(xdg_cache) / "embassy-eye").expanduser())
+
+
+def _url(env: Mapping[str, str], name: str, default: str) -> str:
+    value = _text(env, name, default)
+    if not value.startswith(("http://", "https://")):
+        raise SettingsError(f"{name} must be an http(s) URL, got '{value}'")
+    return value
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment-derived configuration shared by the scrapers."""
+
+    # Logging and metrics export
+    log_level: str = "INFO"
+    log_format: str = "text"
+    # Prometheus endpoint port (0 = off) and textfile path for node_exporter
+    metrics_port: int = 0
+    metrics_addr: str = "127.0.0.1"
+    metrics_textfile: str = ""
+
+    # Local state: the SQLite event store (default embassy_eye.db) and the file cache
+    event_db: str = ""
+    cache_dir: str = ""
+    # HTML snapshot store (see storage.artifacts): location, size cap and retention
+    artifact_dir: str = "screenshots/artifacts"
+    artifact_max_mb: float = 200.0
+    artifact_max_age_days: float = 30.0
+
+    # Telegram
+    telegram_bot_token: str = field(default="", repr=False)
+    telegram_user_id: str = ""
+    healthcheck_bot_token: str = field(default="", repr=False)
+
+    # Proxies (HTTP_PROXY/HTTPS_PROXY come from the Docker proxy service)
+    http_proxy: str = ""
+    https_proxy: str = ""
+    proxy_server: str = ""
+    proxy_username: str = ""
+    proxy_password: str = field(default="", repr=False)
+    proxy_pool: str = ""
+    proxy_pool_file: str = ""
+    # Consecutive failures that take an upstream out of rotation, and the first cooldown
+    proxy_pool_failure_threshold: int = 2
+    proxy_pool_cooldown_seconds: float = 60.0
+    # Cached proxy auth extensions unused for this long are deleted
+    proxy_extension_ttl_days: float = 7.0
+    # Block images, fonts and analytics (see netstate.resource_policy)
+    resource_blocking: bool = True
+    # Daily proxy traffic budget in MB (0 = unlimited) and the share at which runs are throttled
+    bandwidth_daily_budget_mb: int = 0
+    bandwidth_throttle_at: float = 0.8
+
+    # Pre-flight probes (see netstate.preflight): on/off and per-phase timeouts in seconds
+    preflight: bool = True
+    preflight_dns_timeout: float = 2.0
+    preflight_connect_timeout: float = 3.0
+    preflight_tls_timeout: float = 3.0
+    preflight_ttfb_timeout: float = 5.0
+
+    # Blocked IPs and VPN exit scoring (see netstate.blocked_ips, netstate.vpn_exits)
+    blocked_ip_ttl_hours: float = 168.0
+    vpn_half_life_hours: float = 72.0
+    vpn_block_penalty_hours: float = 12.0
+    vpn_exploration: float = 0.1
+
+    # Chrome binary and chromedriver overrides (default: found on PATH)
+    chrome_bin: str = ""
+    chromedriver_path: str = ""
+
+    # Hungary
+    hungary_headless: bool = True
+    # Selenium page-load strategy: when driver.get returns (load, DOMContentLoaded, or at once)
+    page_load_strategy: str = "eager"
+
+    # Notification screenshots
+    screenshot_format: str = "jpeg"
+    screenshot_quality: int = 70
+    screenshot_max_width: int = 1280
+
+    # Italy
+    italy_login_url: str = "https://prenotami.esteri.it/"
+    login_email: str = ""
+    login_password: str = field(default="", repr=False)
+    italy_email: str = ""
+    italy_password: str = field(default="", repr=False)
+    italy_users: str = ""
+    italy_users_file: str = ""
+    italy_blocked_users_file: str = "italy_blocked_accounts.json"
+    italy_rotation_state_file: str = "italy_user_rotation.json"
+    italy_headless: bool = False
+    italy_async_sessions: int = 3
+
+    # Virtual displays
+    xvfb_max_clients_per_display: int = 4
+
+    # Chrome watchdog (see runner.watchdog); interval 0 turns it off
+    chrome_watchdog_interval: int = 10
+    chrome_max_rss_mb: int = 1536
+    chrome_max_age_minutes: int = 30
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "Settings":
+        """Parse and validate settings from a mapping (os.environ by default)."""
+        env = os.environ if env is None else env
+        return cls(
+            log_level=_text(env, "EMBASSY_EYE_LOG_LEVEL", cls.log_level).upper(),
+            log_format=_choice(env, "EMBASSY_EYE_LOG_FORMAT", cls.log_format, LOG_FORMATS),
+            metrics_port=_int(env, "EMBASSY_EYE_METRICS_PORT", cls.metrics_port, maximum=65535),
+            metrics_addr=_text(env, "EMBASSY_EYE_METRICS_ADDR", cls.metrics_addr),
+            metrics_textfile=_text(env, "EMBASSY_EYE_METRICS_TEXTFILE"),
+            event_db=_text(env, "EMBASSY_EYE_DB"),
+            cache_dir=_cache_dir(env),
+            artifact_dir=str(Path(_text(env, "EMBASSY_EYE_ARTIFACT_DIR", cls.artifact_dir)).expanduser()),
+            artifact_max_mb=_float(env, "EMBASSY_EYE_ARTIFACT_MAX_MB", cls.artifact_max_mb, minimum=0.0, maximum=1e6),
+            artifact_max_age_days=_float(
+                env, "EMBASSY_EYE_ARTIFACT_MAX_AGE_DAYS", cls.artifact_max_age_days, minimum=0.0, maximum=3650.0
+            ),
+            telegram_bot_token=_text(env, "TELEGRAM_BOT_TOKEN"),
+            telegram_user_id=_text(env, "TELEGRAM_USER_ID"),
+            healthcheck_bot_token=_text(env, "HEALTHCHECK_BOT_TOKEN"),
+            http_proxy=_text(env, "HTTP_PROXY"),
+            https_proxy=_text(env, "HTTPS_PROXY"),
+            proxy_server=_text(env, "PROXY_SERVER"),
+            proxy_username=_text(env, "PROXY_USERNAME"),
+            proxy_password=_text(env, "PROXY_PASSWORD"),
+            proxy_pool=env.get("PROXY_POOL") or "",
+            proxy_pool_file=_text(env, "PROXY_POOL_FILE"),
+            proxy_pool_failure_threshold=_int(
+                env, "PROXY_POOL_FAILURE_THRESHOLD", cls.proxy_pool_failure_threshold, minimum=1
+            ),
+            proxy_pool_cooldown_seconds=_float(
+                env, "PROXY_POOL_COOLDOWN_SECONDS", cls.proxy_pool_cooldown_seconds, minimum=0.0, maximum=86400.0
+            ),
+            proxy_extension_ttl_days=_float(
+                env, "EMBASSY_EYE_PROXY_EXT_TTL_DAYS", cls.proxy_extension_ttl_days, minimum=0.0, maximum=3650.0
+            ),
+            resource_blocking=not _flag(env, "RESOURCE_BLOCKING", FALSE_VALUES),
+            bandwidth_daily_budget_mb=_int(env, "BANDWIDTH_DAILY_BUDGET_MB", cls.bandwidth_daily_budget_mb),
+            bandwidth_throttle_at=_float(
+                env, "BANDWIDTH_THROTTLE_AT", cls.bandwidth_throttle_at, minimum=0.0, maximum=1.0
+            ),
+            preflight=not _flag(env, "EMBASSY_EYE_PREFLIGHT", FALSE_VALUES),
+            preflight_dns_timeout=_float(
+                env, "EMBASSY_EYE_PREFLIGHT_DNS_TIMEOUT", cls.preflight_dns_timeout, minimum=0.1, maximum=60.0
+            ),
+            preflight_connect_timeout=_float(
+                env, "EMBASSY_EYE_PREFLIGHT_CONNECT_TIMEOUT", cls.preflight_connect_timeout, minimum=0.1, maximum=60.0
+            ),
+            preflight_tls_timeout=_float(
+                env, "EMBASSY_EYE_PREFLIGHT_TLS_TIMEOUT", cls.preflight_tls_timeout, minimum=0.1, maximum=60.0
+            ),
+            preflight_ttfb_timeout=_float(
+                env, "EMBASSY_EYE_PREFLIGHT_TTFB_TIMEOUT", cls.preflight_ttfb_timeout, minimum=0.1, maximum=60.0
+            ),
+            blocked_ip_ttl_hours=_float(
+                env, "EMBASSY_EYE_BLOCKED_IP_TTL_HOURS", cls.blocked_ip_ttl_hours, minimum=0.0, maximum=87600.0
+            ),
+            vpn_half_life_hours=_float(
+                env, "EMBASSY_EYE_VPN_HALF_LIFE_HOURS", cls.vpn_half_life_hours, minimum=0.1, maximum=87600.0
+            ),
+            vpn_block_penalty_hours=_float(
+                env, "EMBASSY_EYE_VPN_BLOCK_PENALTY_HOURS", cls.vpn_block_penalty_hours, minimum=0.0, maximum=87600.0
+            ),
+            vpn_exploration=_float(env, "EMBASSY_EYE_VPN_EXPLORATION", cls.vpn_exploration, minimum=0.0, maximum=1.0),
+            chrome_bin=_text(env, "CHROME_BIN"),
+            chromedriver_path=_text(env, "CHROMEDRIVER_PATH"),
+            # Headless unless explicitly disabled or interactive mode is requested
+            hungary_headless=not _flag(env, "HUNGARY_HEADLESS", FALSE_VALUES)
+            and not _flag(env, "HUNGARY_INTERACTIVE", TRUE_VALUES),
+            page_load_strategy=_choice(
+                env, "PAGE_LOAD_STRATEGY", cls.page_load_strategy, PAGE_LOAD_STRATEGIES
+            ),
+            screenshot_format=_choice(env, "SCREENSHOT_FORMAT", cls.screenshot_format, SCREENSHOT_FORMATS),
+            screenshot_quality=_int(env, "SCREENSHOT_QUALITY", cls.screenshot_quality, minimum=1, maximum=100),
+            screenshot_max_width=_int(env, "SCREENSHOT_MAX_WIDTH", cls.screenshot_max_width),
+            italy_login_url=_url(env, "ITALY_LOGIN_URL", cls.italy_login_url),
+            login_email=_text(env, "LOGIN_EMAIL"),
+            login_password=_text(env, "LOGIN_PASSWORD"),
+            italy_email=_text(env, "ITALY_EMAIL"),
+            italy_password=_text(env, "ITALY_PASSWORD"),
+            italy_users=_text(env, "ITALY_USERS"),
+            italy_users_file=_text(env, "ITALY_USERS_FILE"),
+            italy_blocked_users_file=_text(env, "ITALY_BLOCKED_USERS_FILE", cls.italy_blocked_users_file),
+            italy_rotation_state_file=_text(env, "ITALY_ROTATION_STATE_FILE", cls.italy_rotation_state_file),
+            # Italy runs with a visible browser unless headless is requested
+            italy_headless=_flag(env, "ITALY_HEADLESS", TRUE_VALUES)
+            or _flag(env, "ITALY_INTERACTIVE", FALSE_VALUES),
+            italy_async_sessions=_int(env, "ITALY_ASYNC_SESSIONS", cls.italy_async_sessions, minimum=1),
+            xvfb_max_clients_per_display=_int(
+                env, "XVFB_MAX_CLIENTS_PER_DISPLAY", cls.xvfb_max_clients_per_display, minimum=1
+            ),
+            chrome_watchdog_interval=_int(env, "CHROME_WATCHDOG_INTERVAL", cls.chrome_watchdog_interval),
+            chrome_max_rss_mb=_int(env, "CHROME_MAX_RSS_MB", cls.chrome_max_rss_mb),
+            chrome_max_age_minutes=_int(env, "CHROME_MAX_AGE_MINUTES", cls.chrome_max_age_minutes),
+        )
+
+    def env_value(self, name: str) -> str:
+        """Value of a setting by its environment variable name (e.g. 'PROXY_SERVER')."""
+        return getattr(self, name.lower(), "") if name.lower() in _FIELD_NAMES else ""
+
+
+_FIELD_NAMES = {settings_field.name for settings_field in fields(Settings)}
+
+_lock = threading.Lock()
+_settings: Optional[Settings] = None
+_dotenv_keys: Dict[str, str] = {}
+_reload_callbacks: List[Callable[[], None]] = []
+
+
+def _apply_dotenv() -> None:
+    """
+    Copy .env values into os.environ without overriding real environment variables.
+
+    Keys this module set earlier are updated on reload, so edits to .env take effect.
+    """
+    if not DOTENV_AVAILABLE:
+        return
+    path = find_dotenv(usecwd=True) or find_dotenv()
+    values = {key: value for key, value in dotenv_values(path).items() if value is not None} if path else {}
+    for key, value in values.items():
+        if key not in os.environ or _dotenv_keys.get(key) == os.environ[key]:
+            os.environ[key] = value
+            _dotenv_keys[key] = value
+    for key in set(_dotenv_keys) - set(values):
+        if os.environ.get(key) == _dotenv_keys.pop(key):
+            del os.environ[key]
+
+
+def get_settings() -> Settings:
+    """Return the cached settings, loading .env and parsing the environment on first use."""
+    global _settings
+    if _settings is None:
+        with _lock:
+            if _settings is None:
+                _apply_dotenv()
+                _settings = Settings.from_env()
+    return _settings
+
+
+def reload_settings() -> Settings:
+    """Re-read .env and the environment, then notify on_reload() callbacks."""
+    global _settings
+    with _lock:
+        _apply_dotenv()
+        _settings = Settings.from_env()
+        callbacks = list(_reload_callbacks)
+    for callback in callbacks:
+        callback()
+    return _settings
+
+
+def on_reload(callback: Callable[[], None]) -> Callable[[], None]:
+    """Register a callback to run after reload_settings(); usable as a decorator."""
+    _reload_callbacks.append(callback)
+    return callback
@@ -0,0 +1,21 @@
+"""
+Network state shared by the scrapers and run_script.sh: blocked IPs, VPN exit
+and proxy health, pre-flight probes.
+
+Kept free of browser dependencies so the shell wrapper can call
+`python3 -m embassy_eye.netstate ...` on the host.
+"""
+
+from .blocked_ips import BlockedIPRegistry, get_blocked_ip_registry
+from .proxy_pool import ProxyPool, ProxyUpstream, get_proxy_pool
+from .vpn_exits import VPNExitScheduler, get_vpn_exit_scheduler
+
+__all__ = [
+    "BlockedIPRegistry",
+    "get_blocked_ip_registry",
+    "ProxyPool",
+    "ProxyUpstream",
+    "get_proxy_pool",
+    "VPNExitScheduler",
+    "get_vpn_exit_scheduler",
+]
@@ -0,0 +1,245 @@
+"""
+Command-line interface for embassy_eye.netstate (used by run_script.sh).
+
+    python3 -m embassy_eye.netstate check 1.2.3.4 [--location belgrade]
+        exit 0 if blocked, 1 if not (any other code means the check failed)
+    python3 -m embassy_eye.netstate add 1.2.3.0/24 [--location L] [--ttl-hours H] [--reason R]
+    python3 -m embassy_eye.netstate remove 1.2.3.4 [--location L]
+    python3 -m embassy_eye.netstate import-log [logs/blocked_ips.log]
+    python3 -m embassy_eye.netstate prune
+    python3 -m embassy_eye.netstate list [--all]
+    python3 -m embassy_eye.netstate vpn-pick [--exclude X ...] al-tia bg-sof ...
+        print the best-scored exit (with exploration) among the candidates
+    python3 -m embassy_eye.netstate vpn-record al-tia connected --ms 1840 [--ip 1.2.3.4]
+    python3 -m embassy_eye.netstate vpn-stats al-tia bg-sof ...
+    python3 -m embassy_eye.netstate preflight [URL ...] [--proxy URL] [--exit al-tia] [--json]
+        exit 0 if every target answered, 1 if any failed
+    python3 -m embassy_eye.netstate proxy-status
+    python3 -m embassy_eye.netstate bandwidth [--days 7]
+        traffic per scraper and location, and today's usage against the budget
+"""
+
+import argparse
+import ipaddress
+import json
+import sys
+import time
+
+from ..config.settings import get_settings
+from .bandwidth import MB, get_bandwidth_ledger
+from .blocked_ips import get_blocked_ip_registry
+from .preflight import proxy_from_env, record_preflight, run_preflight
+from .proxy_pool import get_proxy_pool
+from .vpn_exits import EVENTS, get_vpn_exit_scheduler
+
+EXIT_BLOCKED = 0
+EXIT_NOT_BLOCKED = 1
+EXIT_ERROR = 3
+
+
+def _format_time(value):
+    if value is None:
+        return "never"
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+
+
+def _cmd_check(args) -> int:
+    ipaddress.ip_address(args.ip)
+    entry = get_blocked_ip_registry().lookup(args.ip, args.location)
+    if entry:
+        if not args.quiet:
+            scope = entry["location"] or "all locations"
+            print(f"{args.ip} blocked by {entry['network']} ({scope}, expires {_format_time(entry['expires_at'])})")
+        return EXIT_BLOCKED
+    if not args.quiet:
+        print(f"{args.ip} not blocked")
+    return EXIT_NOT_BLOCKED
+
+
+def _cmd_add(args) -> int:
+    network = get_blocked_ip_registry().add(
+        args.network, location=args.location, ttl_hours=args.ttl_hours, reason=args.reason, source="cli",
+    )
+    print(f"Blocked {network}" + (f" for {args.location}" if args.location else ""))
+    return 0
+
+
+def _cmd_remove(args) -> int:
+    removed = get_blocked_ip_registry().remove(args.network, location=args.location)
+    print(f"Removed {removed} entr{'y' if removed == 1 else 'ies'}")
+    return 0
+
+
+def _cmd_import_log(args) -> int:
+    imported = get_blocked_ip_registry().import_log(args.path, ttl_hours=args.ttl_hours)
+    print(f"Imported {imported} entr{'y' if imported == 1 else 'ies'} from {args.path}")
+    return 0
+
+
+def _cmd_prune(args) -> int:
+    removed = get_blocked_ip_registry().prune()
+    print(f"Pruned {removed} expired entr{'y' if removed == 1 else 'ies'}")
+    return 0
+
+
+def _cmd_list(args) -> int:
+    for entry in get_blocked_ip_registry().entries(include_expired=args.all):
+        scope = entry["location"] or "*"
+        print(f"{entry['network']:<20} {scope:<10} added {_format_time(entry['created_at'])} "
+              f"expires {_format_time(entry['expires_at'])} {entry['reason'] or ''}".rstrip())
+    return 0
+
+
+def _cmd_vpn_pick(args) -> int:
+    choice = get_vpn_exit_scheduler().pick(args.candidates, exclude=args.exclude or ())
+    if not choice:
+        print("Error: no candidate exits left", file=sys.stderr)
+        return EXIT_ERROR
+    print(choice)
+    return 0
+
+
+def _cmd_vpn_record(args) -> int:
+    get_vpn_exit_scheduler().record(args.exit, args.event, ip=args.ip, value_ms=args.ms)
+    return 0
+
+
+def _cmd_vpn_stats(args) -> int:
+    scheduler = get_vpn_exit_scheduler()
+    for name in args.exits:
+        stats = scheduler.stats(name)
+        connect = f"{stats['connect_ms']:.0f}ms" if stats["connect_ms"] is not None else "-"
+        ttfb = f"{stats['ttfb_ms']:.0f}ms" if stats["ttfb_ms"] is not None else "-"
+        blocked = _format_time(stats["last_block"]) if stats["last_block"] else "-"
+        print(f"{name:<8} score {scheduler.expected_score(stats):.2f} ok {stats['successes']:.1f} "
+              f"fail {stats['failures']:.1f} connect {connect} ttfb {ttfb} last block {blocked}")
+    return 0
+
+
+def _cmd_preflight(args) -> int:
+    proxy = args.proxy if args.proxy is not None else proxy_from_env()
+    results = run_preflight(args.urls or None, proxy=proxy or None)
+    try:
+        record_preflight(results)
+    except Exception as exc:
+        print(f"Warning: could not record pre-flight results: {exc}", file=sys.stderr)
+    if args.exit:
+        # Feed the booking host's time to first byte into the VPN exit scheduler
+        first = results[0]
+        if first.ok:
+            get_vpn_exit_scheduler().record(args.exit, "reachable", value_ms=first.total_ms)
+        else:
+            get_vpn_exit_scheduler().record(args.exit, "unreachable")
+    if args.json:
+        print(json.dumps([result.as_dict() for result in results]))
+    else:
+        for result in results:
+            print(result.summary())
+    return 0 if all(result.ok for result in results) else 1
+
+
+def _cmd_proxy_status(args) -> int:
+    pool = get_proxy_pool()
+    if not pool:
+        print("No proxies configured (PROXY_POOL, PROXY_POOL_FILE, HTTP_PROXY or PROXY_SERVER)")
+        return 0
+    for row in pool.status():
+        state = "up" if row["healthy"] else f"down until {_format_time(row['down_until'])}"
+        print(f"{row['server']:<28} weight {row['weight']:<4g} {state:<30} active {row['active']} "
+              f"ok {row['successes']} failed {row['failures']} {row['last_error'] or ''}".rstrip())
+    return 0
+
+
+def _cmd_bandwidth(args) -> int:
+    ledger = get_bandwidth_ledger()
+    since = time.time() - args.days * 86400
+    rows = ledger.summary(since)
+    if not rows:
+        print(f"No runs recorded in the last {args.days:g} day(s)")
+    for row in rows:
+        location = row["location"] or "-"
+        print(f"{row['scraper']:<12} {location:<10} runs {row['runs']:<5} {row['bytes'] / MB:8.1f} MB "
+              f"(avg {row['bytes'] / row['runs'] / MB:.2f} MB)  blocked {row['blocked']} ~{row['saved'] / MB:.1f} MB saved")
+    budget_mb = get_settings().bandwidth_daily_budget_mb
+    used_mb = ledger.used_today() / MB
+    print(f"Today: {used_mb:.1f} MB" + (f" of {budget_mb} MB budget ({used_mb / budget_mb:.0%})" if budget_mb else " (no budget set)"))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m embassy_eye.netstate", description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    check = sub.add_parser("check", help="Exit 0 if the IP is blocked, 1 otherwise")
+    check.add_argument("ip")
+    check.add_argument("--location")
+    check.add_argument("-q", "--quiet", action="store_true")
+    check.set_defaults(func=_cmd_check)
+
+    add = sub.add_parser("add", help="Block an IP or CIDR range")
+    add.add_argument("network")
+    add.add_argument("--location")
+    add.add_argument("--ttl-hours", type=float)
+    add.add_argument("--reason")
+    add.set_defaults(func=_cmd_add)
+
+    remove = sub.add_parser("remove", help="Unblock an IP or CIDR range")
+    remove.add_argument("network")
+    remove.add_argument("--location")
+    remove.set_defaults(func=_cmd_remove)
+
+    import_log = sub.add_parser("import-log", help="Import a legacy blocked_ips.log")
+    import_log.add_argument("path", nargs="?", default="logs/blocked_ips.log")
+    import_log.add_argument("--ttl-hours", type=float)
+    import_log.set_defaults(func=_cmd_import_log)
+
+    prune = sub.add_parser("prune", help="Delete expired entries")
+    prune.set_defaults(func=_cmd_prune)
+
+    list_cmd = sub.add_parser("list", help="Show blocked networks")
+    list_cmd.add_argument("--all", action="store_true", help="Include expired entries")
+    list_cmd.set_defaults(func=_cmd_list)
+
+    vpn_pick = sub.add_parser("vpn-pick", help="Print the next VPN exit to try")
+    vpn_pick.add_argument("candidates", nargs="+")
+    vpn_pick.add_argument("--exclude", action="append", help="Exit already tried this run (repeatable)")
+    vpn_pick.set_defaults(func=_cmd_vpn_pick)
+
+    vpn_record = sub.add_parser("vpn-record", help="Record a VPN exit event")
+    vpn_record.add_argument("exit")
+    vpn_record.add_argument("event", choices=sorted(EVENTS))
+    vpn_record.add_argument("--ms", type=float, help="Connect latency or time to first byte")
+    vpn_record.add_argument("--ip")
+    vpn_record.set_defaults(func=_cmd_vpn_record)
+
+    vpn_stats = sub.add_parser("vpn-stats", help="Show VPN exit health scores")
+    vpn_stats.add_argument("exits", nargs="+")
+    vpn_stats.set_defaults(func=_cmd_vpn_stats)
+
+    preflight = sub.add_parser("preflight", help="Probe DNS/connect/TLS/TTFB to the booking and login hosts")
+    preflight.add_argument("urls", nargs="*", help="Targets (default: Hungary booking and Italy login pages)")
+    preflight.add_argument("--proxy", help="HTTP proxy URL (default: HTTP_PROXY/PROXY_SERVER; '' for none)")
+    preflight.add_argument("--exit", help="Record the first target's result for this VPN exit")
+    preflight.add_argument("--json", action="store_true")
+    preflight.set_defaults(func=_cmd_preflight)
+
+    proxy_status = sub.add_parser("proxy-status", help="Show proxy pool health and active sessions")
+    proxy_status.set_defaults(func=_cmd_proxy_status)
+
+    bandwidth = sub.add_parser("bandwidth", help="Show traffic per scraper/location and today's budget usage")
+    bandwidth.add_argument("--days", type=float, default=1, help="Summarize this many days (default: 1)")
+    bandwidth.set_defaults(func=_cmd_bandwidth)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Per-run bandwidth accounting and a daily byte budget.
+
+Every run records the bytes it transferred (CDP Network.loadingFinished
+encodedDataLength on both the Selenium and the Playwright side) in the
+event store's database (table run_bandwidth), by scraper and location.
+
+BANDWIDTH_DAILY_BUDGET_MB caps the bytes per calendar day (local time).
+Once the day's usage passes BANDWIDTH_THROTTLE_AT of the budget, scheduled
+runs are skipped so that only every 2nd, then 3rd, ... run goes ahead, up
+to every MAX_RUN_INTERVAL-th as usage approaches the budget. After the
+budget is spent, every run is skipped until the next day. Like the captcha
+cooldown, the skip counter lives in the state table, so cron-driven
+processes share it.
+"""
+
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.settings import get_settings
+from ..storage.events import EventStore, get_event_store
+from ..telemetry.metrics import BANDWIDTH_BYTES, BANDWIDTH_TODAY_BYTES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_bandwidth (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id            TEXT,
+    scraper           TEXT NOT NULL,
+    location          TEXT NOT NULL DEFAULT '',
+    bytes             INTEGER NOT NULL,
+    blocked_requests  INTEGER NOT NULL DEFAULT 0,
+    saved_bytes       INTEGER NOT NULL DEFAULT 0,
+    created_at        REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_run_bandwidth_time ON run_bandwidth (created_at);
+"""
+
+THROTTLE_STATE_KEY = "bandwidth_throttle"
+# At most every MAX_RUN_INTERVAL-th scheduled run goes ahead just below the budget
+MAX_RUN_INTERVAL = 6
+
+MB = 1024 * 1024
+
+
+def _day_start(now: Optional[float] = None) -> Tuple[str, float]:
+    """(YYYY-MM-DD, timestamp of local midnight) for the day containing now."""
+    moment = datetime.fromtimestamp(now if now is not None else time.time())
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.strftime("%Y-%m-%d"), midnight.timestamp()
+
+
+class BandwidthLedger:
+    """Bytes transferred per run, on top of the shared event store."""
+
+    def __init__(self, store: Optional[EventStore] = None):
+        self.store = store or get_event_store()
+        self.store.executescript(SCHEMA)
+
+    def record(self, scraper: str, location: Optional[str], transferred: int, blocked_requests: int = 0,
+               saved_bytes: int = 0, run_id: Optional[str] = None) -> None:
+        self.store.execute(
+            "INSERT INTO run_bandwidth (run_id, scraper, location, bytes, blocked_requests, saved_bytes, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, scraper, location or "", int(transferred), blocked_requests, int(saved_bytes), time.time()),
+        )
+        BANDWIDTH_BYTES.inc(transferred, scraper=scraper, location=location or "")
+        BANDWIDTH_TODAY_BYTES.set(self.used_today())
+
+    def used_since(self, since: float) -> int:
+        rows = self.store.query("SELECT COALESCE(SUM(bytes), 0) AS total FROM run_bandwidth WHERE created_at >= ?", (since,))
+        return int(rows[0]["total"])
+
+    def used_today(self) -> int:
+        return self.used_since(_day_start()[1])
+
+    def summary(self, since: float) -> List[Dict[str, Any]]:
+        """Totals per scraper and location since a timestamp, largest first."""
+        rows = self.store.query(
+            "SELECT scraper, location, COUNT(*) AS runs, SUM(bytes) AS bytes, SUM(blocked_requests) AS blocked, "
+            "SUM(saved_bytes) AS saved FROM run_bandwidth WHERE created_at >= ? "
+            "GROUP BY scraper, location ORDER BY bytes DESC",
+            (since,),
+        )
+        return [dict(row) for row in rows]
+
+    def check_budget(self, now: Optional[float] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Decide whether a scheduled run should go ahead under the daily budget.
+
+        Returns:
+            tuple: (should_skip: bool, message: str or None)
+        """
+        settings = get_settings()
+        budget = settings.bandwidth_daily_budget_mb * MB
+        if budget <= 0:
+            return (False, None)
+
+        day, midnight = _day_start(now)
+        used = self.used_since(midnight)
+        BANDWIDTH_TODAY_BYTES.set(used)
+        fraction = used / budget
+        usage = f"{used / MB:.1f} of {budget / MB:.0f} MB used today"
+        if fraction >= 1:
+            return (True, f"Skipping run: daily bandwidth budget spent ({usage})")
+
+        threshold = settings.bandwidth_throttle_at
+        if fraction < threshold:
+            return (False, None)
+
+        # Run every 2nd scheduled run at the threshold, up to every MAX_RUN_INTERVAL-th near the budget
+        progress = (fraction - threshold) / max(1e-9, 1 - threshold)
+        interval = max(2, math.ceil(1 + progress * (MAX_RUN_INTERVAL - 1)))
+        state = self.store.get_state(THROTTLE_STATE_KEY) or {}
+        skipped = state.get("skipped", 0) if state.get("day") == day else 0
+        if skipped + 1 < interval:
+            self.store.set_state(THROTTLE_STATE_KEY, {"day": day, "skipped": skipped + 1})
+            return (True, f"Skipping run to stay within the bandwidth budget ({usage}; running 1 in {interval})")
+        self.store.set_state(THROTTLE_STATE_KEY, {"day": day, "skipped": 0})
+        return (False, f"Bandwidth budget nearly spent ({usage}); running 1 in {interval} scheduled runs")
+
+
+_ledger: Optional[BandwidthLedger] = None
+
+
+def get_bandwidth_ledger() -> BandwidthLedger:
+    """Return the process-wide ledger."""
+    global _ledger
+    if _ledger is None:
+        _ledger = BandwidthLedger()
+    return _ledger
+
+
+def check_bandwidth_budget() -> Tuple[bool, Optional[str]]:
+    """check_budget() on the shared ledger; never blocks a run because accounting failed."""
+    try:
+        return get_bandwidth_ledger().check_budget()
+    except Exception as e:
+        return (False, f"Could not check the bandwidth budget: {e}")
@@ -0,0 +1,175 @@
+"""
+Blocked IP registry with exact/CIDR matching, TTL expiry and location scope.
+
+Entries live in the event store's database (table blocked_networks). Every
+entry is stored as an address range: a single IP is a /32 (or /128) network.
+Range bounds are fixed-width hex strings, so IPv4 and IPv6 compare correctly
+as text and a lookup is an indexed range query instead of a log-file grep.
+
+Scope: an entry with no location applies everywhere. A location-scoped entry
+only matches lookups for that location, or lookups that give no location.
+"""
+
+import ipaddress
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from ..config.settings import get_settings
+from ..storage.events import EventStore, get_event_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocked_networks (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    network     TEXT NOT NULL,
+    version     INTEGER NOT NULL,
+    range_start TEXT NOT NULL,
+    range_end   TEXT NOT NULL,
+    location    TEXT NOT NULL DEFAULT '',
+    reason      TEXT,
+    source      TEXT,
+    created_at  REAL NOT NULL,
+    expires_at  REAL,
+    UNIQUE (network, location)
+);
+CREATE INDEX IF NOT EXISTS idx_blocked_networks_range ON blocked_networks (version, range_start, range_end);
+CREATE INDEX IF NOT EXISTS idx_blocked_networks_expiry ON blocked_networks (expires_at);
+"""
+
+# Legacy append-only log, imported into the table the first time it is used
+LEGACY_LOG_PATH = Path("logs") / "blocked_ips.log"
+
+# "2025-01-01 12:00:00 - 1.2.3.4" as written by modal_checker._log_blocked_ip
+LOG_LINE_REGEX = re.compile(r"^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (?P<ip>\S+)\s*$")
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _to_hex(address: Union[ipaddress.IPv4Address, ipaddress.IPv6Address]) -> str:
+    return format(int(address), "032x")
+
+
+def parse_network(value: str) -> Network:
+    """Parse '1.2.3.4', '1.2.3.0/24' or an IPv6 form into a network (raises ValueError)."""
+    return ipaddress.ip_network(value.strip(), strict=False)
+
+
+class BlockedIPRegistry:
+    """Indexed blocked-IP lookups on top of the shared event store."""
+
+    def __init__(self, store: Optional[EventStore] = None):
+        self.store = store or get_event_store()
+        self.store.executescript(SCHEMA)
+
+    def add(self, value: str, location: Optional[str] = None, ttl_hours: Optional[float] = None,
+            reason: Optional[str] = None, source: str = "scraper", created_at: Optional[float] = None) -> Network:
+        """
+        Block an IP or CIDR range. Re-adding an entry refreshes its expiry.
+
+        Args:
+            value: IP address or CIDR network.
+            location: Optional scope (e.g. 'belgrade'); None blocks everywhere.
+            ttl_hours: Lifetime in hours; None uses EMBASSY_EYE_BLOCKED_IP_TTL_HOURS, 0 never expires.
+        """
+        network = parse_network(value)
+        now = created_at or time.time()
+        ttl = get_settings().blocked_ip_ttl_hours if ttl_hours is None else ttl_hours
+        expires_at = now + ttl * 3600 if ttl and ttl > 0 else None
+        self.store.execute(
+            "INSERT INTO blocked_networks "
+            "(network, version, range_start, range_end, location, reason, source, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(network, location) DO UPDATE SET "
+            "reason = COALESCE(excluded.reason, reason), source = excluded.source, "
+            "created_at = excluded.created_at, expires_at = excluded.expires_at",
+            (
+                str(network), network.version,
+                _to_hex(network.network_address), _to_hex(network.broadcast_address),
+                (location or "").lower(), reason, source, now, expires_at,
+            ),
+        )
+        return network
+
+    def remove(self, value: str, location: Optional[str] = None) -> int:
+        network = parse_network(value)
+        cursor = self.store.execute(
+            "DELETE FROM blocked_networks WHERE network = ? AND location = ?",
+            (str(network), (location or "").lower()),
+        )
+        return cursor.rowcount
+
+    def lookup(self, ip: str, location: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the matching, unexpired entry for an IP, or None."""
+        try:
+            address = ipaddress.ip_address(ip.strip())
+        except ValueError:
+            return None
+        key = _to_hex(address)
+        sql = (
+            "SELECT network, location, reason, source, created_at, expires_at FROM blocked_networks "
+            "WHERE version = ? AND range_start <= ? AND range_end >= ? "
+            "AND (expires_at IS NULL OR expires_at > ?)"
+        )
+        params: List[Any] = [address.version, key, key, time.time()]
+        if location:
+            sql += " AND location IN ('', ?)"
+            params.append(location.lower())
+        rows = self.store.query(sql + " LIMIT 1", tuple(params))
+        return dict(rows[0]) if rows else None
+
+    def is_blocked(self, ip: str, location: Optional[str] = None) -> bool:
+        return self.lookup(ip, location) is not None
+
+    def prune(self) -> int:
+        """Delete expired entries; returns the number removed."""
+        cursor = self.store.execute(
+            "DELETE FROM blocked_networks WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+        return cursor.rowcount
+
+    def entries(self, include_expired: bool = False) -> List[Dict[str, Any]]:
+        sql = "SELECT network, location, reason, source, created_at, expires_at FROM blocked_networks"
+        params: tuple = ()
+        if not include_expired:
+            sql += " WHERE expires_at IS NULL OR expires_at > ?"
+            params = (time.time(),)
+        return [dict(row) for row in self.store.query(sql + " ORDER BY created_at DESC", params)]
+
+    def import_log(self, path: Path, ttl_hours: Optional[float] = None) -> int:
+        """
+        Import a legacy 'timestamp - ip' blocked_ips.log.
+
+        Entry age counts from the logged timestamp, so old lines expire on schedule.
+        """
+        imported = 0
+        try:
+            lines = Path(path).read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return 0
+        for line in lines:
+            match = LOG_LINE_REGEX.match(line.strip())
+            if not match:
+                continue
+            try:
+                created_at = time.mktime(time.strptime(match.group("ts"), "%Y-%m-%d %H:%M:%S"))
+                self.add(match.group("ip"), ttl_hours=ttl_hours, source="log_import", created_at=created_at)
+                imported += 1
+            except ValueError:
+                continue
+        return imported
+
+
+_registry: Optional[BlockedIPRegistry] = None
+
+
+def get_blocked_ip_registry() -> BlockedIPRegistry:
+    """Return the process-wide registry on the default event store."""
+    global _registry
+    if _registry is None:
+        registry = BlockedIPRegistry()
+        if not registry.store.query("SELECT 1 FROM blocked_networks LIMIT 1"):
+            registry.import_log(LEGACY_LOG_PATH)
+        _registry = registry
+    return _registry
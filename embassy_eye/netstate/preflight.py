@@ -0,0 +1,296 @@
+"""
+Pre-flight connectivity probes for the booking and login hosts.
+
+Each target is probed phase by phase: DNS lookup, TCP connect (through an
+HTTP CONNECT proxy when one is configured), TLS handshake, and time to the
+first response byte of a HEAD request. Every phase has its own short timeout,
+so a dead exit fails in seconds rather than after a 10s curl timeout times
+five retries. Targets are probed concurrently. The per-phase breakdown goes
+to the metrics registry and to the preflight_probes table next to the run
+history.
+"""
+
+import base64
+import ipaddress
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote, unquote, urlparse
+from urllib.request import ProxyHandler, Request, build_opener
+
+from ..config.settings import get_settings
+from ..scrapers.hungary.config import BOOKING_URL
+from ..storage.events import EventStore, get_event_store
+from ..telemetry.metrics import PREFLIGHT_PHASE_DURATION, PREFLIGHT_RESULTS
+
+PHASES = ("dns", "connect", "tls", "ttfb")
+
+# Plain-text echo of the caller's public IP (the same service get_ip_from_chrome opens)
+EGRESS_IP_URL = "https://api.ipify.org"
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS preflight_probes (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id        TEXT,
+    url           TEXT NOT NULL,
+    ok            INTEGER NOT NULL,
+    failed_phase  TEXT,
+    error         TEXT,
+    status        INTEGER,
+    via_proxy     TEXT,
+    dns_ms        REAL,
+    connect_ms    REAL,
+    tls_ms        REAL,
+    ttfb_ms       REAL,
+    total_ms      REAL,
+    created_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_preflight_probes_url_time ON preflight_probes (url, created_at DESC);
+"""
+
+
+def default_timeouts() -> Dict[str, float]:
+    """Per-phase timeouts in seconds; the connect phase includes the proxy CONNECT exchange."""
+    settings = get_settings()
+    return {
+        "dns": settings.preflight_dns_timeout,
+        "connect": settings.preflight_connect_timeout,
+        "tls": settings.preflight_tls_timeout,
+        "ttfb": settings.preflight_ttfb_timeout,
+    }
+
+
+def default_targets() -> List[str]:
+    """The Hungary booking page and the Italy login page."""
+    return [BOOKING_URL, get_settings().italy_login_url]
+
+
+def build_proxy_url(server: str, username: str = "", password: str = "") -> str:
+    """Normalize a proxy server to scheme://[user:pass@]host:port, quoting the credentials."""
+    parsed = urlparse(server if "://" in server else f"http://{server}")
+    if username and password and not parsed.username:
+        credentials = f"{quote(username, safe='')}:{quote(password, safe='')}"
+        parsed = parsed._replace(netloc=f"{credentials}@{parsed.netloc}")
+    return parsed.geturl()
+
+
+def proxy_from_env() -> Optional[str]:
+    """The proxy the browsers would use (same precedence as create_driver), with credentials folded in."""
+    settings = get_settings()
+    server = settings.http_proxy or settings.https_proxy or settings.proxy_server
+    if not server:
+        return None
+    return build_proxy_url(server, settings.proxy_username, settings.proxy_password)
+
+
+@dataclass
+class ProbeResult:
+    """Latency breakdown for one target; phases that did not run stay None."""
+
+    url: str
+    ok: bool = False
+    failed_phase: Optional[str] = None
+    error: Optional[str] = None
+    status: Optional[int] = None
+    via_proxy: Optional[str] = None
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.timings_ms.values())
+
+    def summary(self) -> str:
+        phases = " ".join(f"{phase}={self.timings_ms[phase]:.0f}ms" for phase in PHASES if phase in self.timings_ms)
+        if self.ok:
+            return f"{self.url} OK (HTTP {self.status}) {phases}"
+        return f"{self.url} FAILED at {self.failed_phase}: {self.error} {phases}".rstrip()
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["total_ms"] = self.total_ms
+        return data
+
+
+class _PhaseError(Exception):
+    def __init__(self, phase: str, message: str):
+        super().__init__(message)
+        self.phase = phase
+
+
+def _resolve(host: str, port: int, timeout: float):
+    """getaddrinfo has no timeout of its own; run it on a daemon thread and stop waiting after timeout."""
+    result: Dict[str, Any] = {}
+
+    def target():
+        try:
+            result["addrs"] = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError as exc:
+            result["error"] = exc
+
+    thread = threading.Thread(target=target, name=f"preflight-dns-{host}", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise _PhaseError("dns", f"lookup of {host} timed out after {timeout:.1f}s")
+    if "error" in result:
+        raise _PhaseError("dns", f"lookup of {host} failed: {result['error']}")
+    return result["addrs"]
+
+
+def _connect(addrs, timeout: float) -> socket.socket:
+    deadline = time.monotonic() + timeout
+    last_error: Optional[Exception] = None
+    for family, socktype, proto, _, sockaddr in addrs:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        sock = socket.socket(family, socktype, proto)
+        sock.settimeout(remaining)
+        try:
+            sock.connect(sockaddr)
+            return sock
+        except OSError as exc:
+            last_error = exc
+            sock.close()
+    raise _PhaseError("connect", f"connect failed: {last_error or 'timed out'}")
+
+
+def _read_head(sock: socket.socket, limit: int = 16384) -> bytes:
+    data = b""
+    while b"\r\n\r\n" not in data and len(data) < limit:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _status_code(head: bytes) -> Optional[int]:
+    parts = head.split(b"\r\n", 1)[0].split()
+    if len(parts) >= 2 and parts[1].isdigit():
+        return int(parts[1])
+    return None
+
+
+def _tunnel(sock: socket.socket, proxy, host: str, port: int) -> None:
+    request = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+    if proxy.username:
+        token = base64.b64encode(f"{unquote(proxy.username)}:{unquote(proxy.password or '')}".encode()).decode()
+        request += f"Proxy-Authorization: Basic {token}\r\n"
+    sock.sendall((request + "\r\n").encode("ascii"))
+    status = _status_code(_read_head(sock))
+    if status != 200:
+        raise _PhaseError("connect", f"proxy CONNECT returned {status or 'no response'}")
+
+
+def probe(url: str, proxy: Optional[str] = None, timeouts: Optional[Dict[str, float]] = None) -> ProbeResult:
+    """Probe one URL phase by phase; never raises."""
+    limits = {**default_timeouts(), **(timeouts or {})}
+    target = urlparse(url)
+    host = target.hostname or ""
+    port = target.port or (443 if target.scheme == "https" else 80)
+    proxy_url = urlparse(proxy if "://" in proxy else f"http://{proxy}") if proxy else None
+    result = ProbeResult(url=url, via_proxy=f"{proxy_url.hostname}:{proxy_url.port or 80}" if proxy_url else None)
+    sock = None
+    phase = "dns"
+    try:
+        started = time.perf_counter()
+        if proxy_url:
+            addrs = _resolve(proxy_url.hostname or "", proxy_url.port or 80, limits["dns"])
+        else:
+            addrs = _resolve(host, port, limits["dns"])
+        result.timings_ms["dns"] = (time.perf_counter() - started) * 1000
+
+        phase = "connect"
+        started = time.perf_counter()
+        sock = _connect(addrs, limits["connect"])
+        if proxy_url:
+            sock.settimeout(limits["connect"])
+            _tunnel(sock, proxy_url, host, port)
+        result.timings_ms["connect"] = (time.perf_counter() - started) * 1000
+
+        if target.scheme == "https":
+            phase = "tls"
+            started = time.perf_counter()
+            sock.settimeout(limits["tls"])
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+            result.timings_ms["tls"] = (time.perf_counter() - started) * 1000
+
+        phase = "ttfb"
+        started = time.perf_counter()
+        sock.settimeout(limits["ttfb"])
+        path = target.path or "/"
+        if target.query:
+            path += f"?{target.query}"
+        sock.sendall(
+            f"HEAD {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {USER_AGENT}\r\n"
+            f"Accept: text/html\r\nConnection: close\r\n\r\n".encode("ascii")
+        )
+        first = sock.recv(1)
+        if not first:
+            raise _PhaseError("ttfb", "connection closed before any response")
+        result.timings_ms["ttfb"] = (time.perf_counter() - started) * 1000
+        result.status = _status_code(first + _read_head(sock))
+        result.ok = True
+    except _PhaseError as exc:
+        result.failed_phase, result.error = exc.phase, str(exc)
+    except socket.timeout:
+        result.failed_phase, result.error = phase, f"{phase} timed out after {limits[phase]:.1f}s"
+    except (OSError, ssl.SSLError) as exc:
+        result.failed_phase, result.error = phase, str(exc) or exc.__class__.__name__
+    finally:
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+    return result
+
+
+def lookup_egress_ip(proxy: Optional[str] = None, timeout: float = 10.0) -> Optional[str]:
+    """Public IP seen through proxy (the environment's browser proxy when None), or None if the lookup fails."""
+    proxy = proxy or proxy_from_env()
+    opener = build_opener(ProxyHandler({"http": proxy, "https": proxy} if proxy else {}))
+    try:
+        with opener.open(Request(EGRESS_IP_URL, headers={"User-Agent": USER_AGENT}), timeout=timeout) as response:
+            text = response.read(64).decode("ascii", "replace").strip()
+        return str(ipaddress.ip_address(text))
+    except Exception:
+        return None
+
+
+def run_preflight(urls: Optional[Sequence[str]] = None, proxy: Optional[str] = None,
+                  timeouts: Optional[Dict[str, float]] = None) -> List[ProbeResult]:
+    """Probe all targets concurrently; results come back in the order given."""
+    targets = list(urls or default_targets())
+    with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="preflight") as pool:
+        return list(pool.map(lambda url: probe(url, proxy=proxy, timeouts=timeouts), targets))
+
+
+def record_preflight(results: Sequence[ProbeResult], run_id: Optional[str] = None,
+                     store: Optional[EventStore] = None) -> None:
+    """Observe phase latencies in the metrics registry and store the breakdown for the run."""
+    for result in results:
+        host = urlparse(result.url).hostname or result.url
+        for phase, value in result.timings_ms.items():
+            PREFLIGHT_PHASE_DURATION.observe(value / 1000, target=host, phase=phase)
+        PREFLIGHT_RESULTS.inc(target=host, result="ok" if result.ok else f"{result.failed_phase}_failed")
+
+    store = store or get_event_store()
+    store.executescript(SCHEMA)
+    now = time.time()
+    for result in results:
+        store.execute(
+            "INSERT INTO preflight_probes (run_id, url, ok, failed_phase, error, status, via_proxy, "
+            "dns_ms, connect_ms, tls_ms, ttfb_ms, total_ms, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id, result.url, int(result.ok), result.failed_phase, result.error, result.status,
+                result.via_proxy, *(result.timings_ms.get(phase) for phase in PHASES), result.total_ms, now,
+            ),
+        )
@@ -0,0 +1,304 @@
+"""
+Per-site resource blocking, to keep images, fonts and analytics off paid proxies.
+
+A ResourcePolicy lists the resource types and URL patterns a site's flow does
+not need, plus allow patterns (captcha providers) that are never blocked.
+It is applied in two ways:
+
+    Selenium: CDP Network.setBlockedURLs. That command only takes URL
+        patterns and has no allow list, so blocked resource types become
+        file-extension patterns scoped to the site's own hosts (first_party
+        hosts), and block patterns that touch a captcha host (reCAPTCHA on
+        google.com, gstatic.com) are left out. Images and fonts of the
+        captcha widget therefore always load. Blocked requests are counted
+        from the driver's performance log.
+    Playwright: a context (or page) route that aborts matching requests and
+        lets everything else through, including allowlisted ones.
+
+ResourceStats counts the blocked requests and transferred bytes of a run
+(CDP Network.loadingFinished on both sides) and estimates the bytes that
+were not downloaded. report_run_stats() logs them, adds them to the metrics
+and records the run in the bandwidth ledger (netstate.bandwidth).
+
+Set RESOURCE_BLOCKING=false to turn the policies off.
+
+Like the rest of netstate this module has no browser dependencies: it works
+with the driver, page or context passed to it.
+"""
+
+import json
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from ..config.settings import Settings, get_settings
+from ..scrapers.hungary.config import BOOKING_URL
+from .bandwidth import get_bandwidth_ledger
+from ..telemetry import get_logger, get_run_id
+from ..telemetry.metrics import BANDWIDTH_SAVED, BLOCKED_REQUESTS
+
+logger = get_logger(__name__)
+
+# File extensions used to block a resource type where only URL patterns are supported
+TYPE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "mp3", "wav", "m4a"),
+}
+# Rough transfer size of one blocked request, used for the bytes-saved estimate
+ESTIMATED_BYTES = {
+    "image": 30_000,
+    "font": 40_000,
+    "media": 250_000,
+    "script": 60_000,
+    "stylesheet": 20_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+ANALYTICS_PATTERNS = (
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*doubleclick.net/*",
+    "*connect.facebook.net/*",
+    "*hotjar.com/*",
+    "*clarity.ms/*",
+    "*fonts.googleapis.com/*",
+    "*fonts.gstatic.com/*",
+)
+# Captcha scripts and challenges the login and booking flows depend on
+CAPTCHA_ALLOW_PATTERNS = (
+    "*google.com/recaptcha/*",
+    "*recaptcha.net/*",
+    "*gstatic.com/recaptcha/*",
+    "*hcaptcha.com/*",
+)
+# Hosts serving captcha scripts and assets; CDP block patterns never mention them
+CAPTCHA_HOSTS = ("google.com", "recaptcha.net", "gstatic.com", "hcaptcha.com")
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """What one site's flow can do without."""
+
+    site: str
+    block_types: FrozenSet[str]
+    block_patterns: Tuple[str, ...] = ()
+    allow_patterns: Tuple[str, ...] = CAPTCHA_ALLOW_PATTERNS
+    # Hosts whose images/fonts/media the CDP patterns drop (Selenium has no allow list)
+    first_party: Tuple[str, ...] = ()
+
+    def is_allowed(self, url: str) -> bool:
+        return any(fnmatchcase(url, pattern) for pattern in self.allow_patterns)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """True if a request should be aborted (resource_type uses Playwright's names)."""
+        if self.is_allowed(url):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return any(fnmatchcase(url, pattern) for pattern in self.block_patterns)
+
+    def url_patterns(self) -> List[str]:
+        """
+        Patterns for CDP Network.setBlockedURLs.
+
+        Blocked types become file-extension patterns on the first-party hosts
+        only, and patterns that could match a captcha host are dropped.
+        """
+        patterns = [pattern for pattern in self.block_patterns
+                    if not any(host in pattern for host in CAPTCHA_HOSTS)]
+        for resource_type in sorted(self.block_types):
+            for extension in TYPE_EXTENSIONS.get(resource_type, ()):
+                for host in self.first_party:
+                    patterns += [f"*://{host}/*.{extension}", f"*://{host}/*.{extension}?*"]
+        return patterns
+
+
+POLICIES: Dict[str, ResourcePolicy] = {
+    "hungary": ResourcePolicy(
+        site="hungary",
+        block_types=frozenset({"image", "font", "media"}),
+        block_patterns=ANALYTICS_PATTERNS,
+        first_party=(urlparse(BOOKING_URL).hostname,),
+    ),
+    "italy": ResourcePolicy(
+        site="italy",
+        block_types=frozenset({"image", "font", "media"}),
+        block_patterns=ANALYTICS_PATTERNS,
+        first_party=(urlparse(Settings.italy_login_url).hostname,),
+    ),
+}
+
+
+def get_resource_policy(site: str) -> Optional[ResourcePolicy]:
+    """Policy for a site, or None when there is none or RESOURCE_BLOCKING is off."""
+    if not get_settings().resource_blocking:
+        return None
+    return POLICIES.get(site)
+
+
+class ResourceStats:
+    """Network traffic of one run: requests a policy blocked and bytes transferred."""
+
+    def __init__(self, scraper: str):
+        self.scraper = scraper
+        self.blocked: Counter = Counter()
+        self.transferred_bytes = 0
+        self._lock = threading.Lock()
+
+    def record(self, resource_type: str, count: int = 1) -> None:
+        with self._lock:
+            self.blocked[(resource_type or "other").lower()] += count
+
+    def add_transferred(self, size: int) -> None:
+        with self._lock:
+            self.transferred_bytes += size
+
+    def estimated_bytes_saved(self) -> int:
+        return sum(ESTIMATED_BYTES.get(kind, DEFAULT_ESTIMATED_BYTES) * count for kind, count in self.blocked.items())
+
+    def report(self) -> None:
+        """Log the totals and add the blocked requests to the metrics."""
+        with self._lock:
+            blocked = dict(self.blocked)
+            transferred = self.transferred_bytes
+        saved = self.estimated_bytes_saved()
+        for kind, count in blocked.items():
+            BLOCKED_REQUESTS.inc(count, scraper=self.scraper, resource_type=kind)
+        if saved:
+            BANDWIDTH_SAVED.inc(saved, scraper=self.scraper)
+        message = f"  Network: {transferred // 1024} KB transferred"
+        if blocked:
+            detail = ", ".join(f"{kind} {count}" for kind, count in sorted(blocked.items()))
+            message += f"; blocked {sum(blocked.values())} request(s) ({detail}), ~{saved // 1024} KB saved"
+        logger.info(message)
+
+
+_stats_lock = threading.Lock()
+_run_stats: Dict[Tuple[str, Optional[str]], ResourceStats] = {}
+
+
+def get_run_stats(scraper: str) -> ResourceStats:
+    """Stats of the current run (drivers replaced by a proxy failover share them)."""
+    key = (scraper, get_run_id())
+    with _stats_lock:
+        if key not in _run_stats:
+            _run_stats[key] = ResourceStats(scraper)
+        return _run_stats[key]
+
+
+def report_run_stats(scraper: str, location: Optional[str] = None) -> None:
+    """Report the current run's traffic, record it in the bandwidth ledger and forget it."""
+    run_id = get_run_id()
+    with _stats_lock:
+        stats = _run_stats.pop((scraper, run_id), None)
+    if not stats:
+        return
+    stats.report()
+    try:
+        get_bandwidth_ledger().record(
+            scraper, location, stats.transferred_bytes, blocked_requests=sum(stats.blocked.values()),
+            saved_bytes=stats.estimated_bytes_saved(), run_id=run_id,
+        )
+    except Exception as e:
+        logger.warning(f"  Warning: Could not record run bandwidth: {e}")
+
+
+# --- Selenium ---------------------------------------------------------------
+
+# Capability that makes chromedriver keep the CDP Network events used for the stats and accounting
+PERFORMANCE_LOG_CAPABILITY = ("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def apply_to_driver(driver, policy: ResourcePolicy) -> None:
+    """Block the policy's URL patterns in a Selenium Chrome driver via CDP."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": policy.url_patterns()})
+
+
+def collect_driver_stats(driver, stats: ResourceStats) -> None:
+    """
+    Count blocked and transferred requests from the driver's performance log.
+
+    Needs PERFORMANCE_LOG_CAPABILITY. Reading the log drains it, so every event
+    is counted once; call this before quitting the driver.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        params = message.get("params", {})
+        if message.get("method") == "Network.loadingFailed" and params.get("blockedReason") == "inspector":
+            stats.record(params.get("type", "other"))
+        elif message.get("method") == "Network.loadingFinished":
+            stats.add_transferred(int(params.get("encodedDataLength", 0)))
+
+
+# --- Playwright -------------------------------------------------------------
+
+def route_with_policy(target, policy: ResourcePolicy, stats: ResourceStats) -> None:
+    """Abort requests the policy blocks on a Playwright page or context (sync API)."""
+    def handle(route):
+        request = route.request
+        if policy.should_block(request.url, request.resource_type):
+            stats.record(request.resource_type)
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    target.route("**/*", handle)
+
+
+async def route_with_policy_async(target, policy: ResourcePolicy, stats: ResourceStats) -> None:
+    """Abort requests the policy blocks on a Playwright page or context (async API)."""
+    async def handle(route):
+        request = route.request
+        if policy.should_block(request.url, request.resource_type):
+            stats.record(request.resource_type)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    await target.route("**/*", handle)
+
+
+def _count_loading_finished(stats: ResourceStats):
+    def handle(params):
+        stats.add_transferred(int(params.get("encodedDataLength", 0)))
+    return handle
+
+
+def track_transfer(context, page, stats: ResourceStats) -> None:
+    """Count the bytes a Playwright page, and every page the context opens later, transfers (sync API)."""
+    def attach(target):
+        try:
+            session = context.new_cdp_session(target)
+            session.on("Network.loadingFinished", _count_loading_finished(stats))
+            session.send("Network.enable")
+        except Exception as e:
+            logger.warning(f"  Warning: Could not track page traffic: {e}")
+
+    attach(page)
+    context.on("page", attach)
+
+
+async def track_transfer_async(context, page, stats: ResourceStats) -> None:
+    """Count the bytes a Playwright page, and every page the context opens later, transfers (async API)."""
+    async def attach(target):
+        try:
+            session = await context.new_cdp_session(target)
+            session.on("Network.loadingFinished", _count_loading_finished(stats))
+            await session.send("Network.enable")
+        except Exception as e:
+            logger.warning(f"  Warning: Could not track page traffic: {e}")
+
+    await attach(page)
+    context.on("page", attach)
@@ -0,0 +1,249 @@
+"""
+Health-scored VPN exit selection for run_script.sh.
+
+Each WireGuard exit accumulates events in the event store (table
+vpn_exit_events): connect attempts with latency, the IP it handed out,
+reachability of the booking host with time-to-first-byte, and blocks. Scraper
+outcomes recorded with the same IP count as well, so an exit whose IPs keep
+ending in 'ip_blocked' loses weight even if it connects quickly.
+
+An exit's score is a Thompson sample from Beta(successes + 1, failures + 1),
+with older events decayed by a half-life. The sample is then scaled down by
+latency and by any recent block. Sampling instead of taking the mean means
+rarely used exits still get picked now and then, so the history stays current.
+
+Tuning (Settings): EMBASSY_EYE_VPN_HALF_LIFE_HOURS (72), the decay half-life;
+EMBASSY_EYE_VPN_BLOCK_PENALTY_HOURS (12), how long a block suppresses an exit;
+EMBASSY_EYE_VPN_EXPLORATION (0.1), the chance of picking uniformly instead.
+"""
+
+import math
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from ..config.settings import get_settings
+from ..storage.events import EventStore, get_event_store
+from .blocked_ips import get_blocked_ip_registry
+
+# Events older than this are ignored when scoring
+HISTORY_DAYS = 14
+# Connect + TTFB time (ms) at which the latency factor drops to 0.5
+LATENCY_REFERENCE_MS = 4000.0
+
+# Events written by run_script.sh (via the CLI) and how they count
+SUCCESS_EVENTS = {"reachable"}
+FAILURE_EVENTS = {"connect_failed", "unreachable"}
+BLOCK_EVENTS = {"ip_blocked"}
+EVENTS = {"connected", "assigned"} | SUCCESS_EVENTS | FAILURE_EVENTS | BLOCK_EVENTS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vpn_exit_events (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    exit_name   TEXT NOT NULL,
+    event       TEXT NOT NULL,
+    ip          TEXT,
+    value_ms    REAL,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_vpn_exit_events_exit_time ON vpn_exit_events (exit_name, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_vpn_exit_events_ip ON vpn_exit_events (ip);
+"""
+
+LEGACY_USAGE_LOG_PATH = Path("logs") / "vpn_usage.log"
+
+# "2025-01-01 12:00:00 - Serbia (Belgrade) - 1.2.3.4" as written by run_script.sh
+USAGE_LINE_REGEX = re.compile(r"^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (?P<country>.+) - (?P<ip>\S+)\s*$")
+
+# Mirrors get_vpn_country in run_script.sh; only needed to read vpn_usage.log
+EXIT_COUNTRIES = {
+    "al-tia": "Albania (Tirana)",
+    "ba-sjj": "Bosnia and Herzegovina (Sarajevo)",
+    "bg-sof": "Bulgaria (Sofia)",
+    "cy-nic": "Cyprus (Nicosia)",
+    "ge-tbs": "Georgia (Tbilisi)",
+    "gr-ath": "Greece (Athens)",
+    "hr-zag": "Croatia (Zagreb)",
+    "hu-bud": "Hungary (Budapest)",
+    "md-chi": "Moldova (Chișinău)",
+    "me-tgd": "Montenegro (Podgorica)",
+    "mk-skp": "North Macedonia (Skopje)",
+    "pl-gdn": "Poland (Gdańsk)",
+    "pl-waw": "Poland (Warsaw)",
+    "ro-buc": "Romania (Bucharest)",
+    "rs-beg": "Serbia (Belgrade)",
+    "si-lju": "Slovenia (Ljubljana)",
+    "sk-bts": "Slovakia (Bratislava)",
+    "tr-ist": "Turkey (Istanbul)",
+}
+
+
+def _decay(age_s: float) -> float:
+    return 0.5 ** (max(age_s, 0.0) / (get_settings().vpn_half_life_hours * 3600))
+
+
+def _median(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class VPNExitScheduler:
+    """Scores VPN exits from their history and picks the next one to try."""
+
+    def __init__(self, store: Optional[EventStore] = None, rng: Optional[random.Random] = None):
+        self.store = store or get_event_store()
+        self.store.executescript(SCHEMA)
+        self.rng = rng or random.Random()
+
+    def record(self, exit_name: str, event: str, ip: Optional[str] = None,
+               value_ms: Optional[float] = None, created_at: Optional[float] = None) -> None:
+        if event not in EVENTS:
+            raise ValueError(f"unknown VPN exit event '{event}' (expected one of {', '.join(sorted(EVENTS))})")
+        self.store.execute(
+            "INSERT INTO vpn_exit_events (exit_name, event, ip, value_ms, created_at) VALUES (?, ?, ?, ?, ?)",
+            (exit_name, event, ip or None, value_ms, created_at or time.time()),
+        )
+
+    def stats(self, exit_name: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Decayed success/failure weights, median latencies and last block time for one exit."""
+        now = now or time.time()
+        since = now - HISTORY_DAYS * 86400
+        rows = self.store.query(
+            "SELECT event, ip, value_ms, created_at FROM vpn_exit_events "
+            "WHERE exit_name = ? AND created_at >= ? ORDER BY created_at DESC",
+            (exit_name, since),
+        )
+        successes = failures = 0.0
+        connect_ms: List[float] = []
+        ttfb_ms: List[float] = []
+        last_block: Optional[float] = None
+        ips = set()
+        for row in rows:
+            weight = _decay(now - row["created_at"])
+            event = row["event"]
+            if row["ip"]:
+                ips.add(row["ip"])
+            if event in SUCCESS_EVENTS:
+                successes += weight
+                if row["value_ms"] is not None and len(ttfb_ms) < 20:
+                    ttfb_ms.append(row["value_ms"])
+            elif event in FAILURE_EVENTS:
+                failures += weight
+            elif event in BLOCK_EVENTS:
+                failures += weight
+                last_block = max(last_block or 0.0, row["created_at"])
+            elif event == "connected" and row["value_ms"] is not None and len(connect_ms) < 20:
+                connect_ms.append(row["value_ms"])
+
+        # Scraper verdicts for IPs this exit handed out
+        if ips:
+            placeholders = ",".join("?" * len(ips))
+            outcome_rows = self.store.query(
+                f"SELECT outcome, created_at FROM outcomes WHERE ip IN ({placeholders}) AND created_at >= ?",
+                (*ips, since),
+            )
+            for row in outcome_rows:
+                weight = _decay(now - row["created_at"])
+                if row["outcome"] == "ip_blocked":
+                    failures += weight
+                    last_block = max(last_block or 0.0, row["created_at"])
+                elif row["outcome"] == "unreachable":
+                    failures += weight
+                elif row["outcome"] != "error":
+                    successes += weight
+
+        # An IP from this exit that is still in the blocked registry counts as a fresh block
+        registry = get_blocked_ip_registry()
+        for ip in ips:
+            entry = registry.lookup(ip)
+            if entry:
+                last_block = max(last_block or 0.0, entry["created_at"])
+
+        return {
+            "exit": exit_name,
+            "successes": successes,
+            "failures": failures,
+            "connect_ms": _median(connect_ms),
+            "ttfb_ms": _median(ttfb_ms),
+            "last_block": last_block,
+            "events": len(rows),
+        }
+
+    def expected_score(self, stats: Dict[str, Any], now: Optional[float] = None) -> float:
+        """Mean score (no sampling), used for display."""
+        mean = (stats["successes"] + 1) / (stats["successes"] + stats["failures"] + 2)
+        return mean * self._latency_factor(stats) * self._block_factor(stats, now or time.time())
+
+    def pick(self, candidates: Sequence[str], exclude: Iterable[str] = ()) -> Optional[str]:
+        """Choose the next exit from candidates, skipping excluded ones."""
+        excluded = set(exclude)
+        pool = [name for name in dict.fromkeys(candidates) if name and name not in excluded]
+        if not pool:
+            return None
+        if self.rng.random() < get_settings().vpn_exploration:
+            return self.rng.choice(pool)
+        now = time.time()
+        best_name, best_score = None, -1.0
+        for name in pool:
+            stats = self.stats(name, now)
+            sample = self.rng.betavariate(stats["successes"] + 1, stats["failures"] + 1)
+            score = sample * self._latency_factor(stats) * self._block_factor(stats, now)
+            if score > best_score:
+                best_name, best_score = name, score
+        return best_name
+
+    def import_usage_log(self, path: Path) -> int:
+        """Import 'timestamp - country - ip' lines from a legacy vpn_usage.log as 'assigned' events."""
+        codes = {country: code for code, country in EXIT_COUNTRIES.items()}
+        try:
+            lines = Path(path).read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return 0
+        imported = 0
+        for line in lines:
+            match = USAGE_LINE_REGEX.match(line.strip())
+            if not match or match.group("country") not in codes:
+                continue
+            try:
+                created_at = datetime.strptime(match.group("ts"), "%Y-%m-%d %H:%M:%S").timestamp()
+            except ValueError:
+                continue
+            self.record(codes[match.group("country")], "assigned", ip=match.group("ip"), created_at=created_at)
+            imported += 1
+        return imported
+
+    @staticmethod
+    def _latency_factor(stats: Dict[str, Any]) -> float:
+        total = (stats["connect_ms"] or 0.0) + (stats["ttfb_ms"] or 0.0)
+        return 1.0 / (1.0 + total / LATENCY_REFERENCE_MS)
+
+    @staticmethod
+    def _block_factor(stats: Dict[str, Any], now: float) -> float:
+        penalty_hours = get_settings().vpn_block_penalty_hours
+        if not stats["last_block"] or penalty_hours <= 0:
+            return 1.0
+        age_h = (now - stats["last_block"]) / 3600
+        if age_h >= penalty_hours:
+            return 1.0
+        # Near zero right after a block, back to full weight after the penalty window
+        return max(0.02, math.sqrt(age_h / penalty_hours))
+
+
+_scheduler: Optional[VPNExitScheduler] = None
+
+
+def get_vpn_exit_scheduler() -> VPNExitScheduler:
+    """Return the process-wide scheduler, importing vpn_usage.log on first use."""
+    global _scheduler
+    if _scheduler is None:
+        scheduler = VPNExitScheduler()
+        if not scheduler.store.query("SELECT 1 FROM vpn_exit_events LIMIT 1"):
+            scheduler.import_usage_log(LEGACY_USAGE_LOG_PATH)
+        _scheduler = scheduler
+    return _scheduler
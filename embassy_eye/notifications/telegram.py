@@ -2,36 +2,30 @@
 Telegram notification module for sending results and screenshots.
 """
 
-import os
 import requests
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_USER_ID = os.getenv("TELEGRAM_USER_ID")
-HEALTHCHECK_BOT_TOKEN = os.getenv("HEALTHCHECK_BOT_TOKEN")
+from ..config.settings import get_settings
 
 
 def _ensure_telegram_config() -> bool:
     """Verify that the Telegram bot credentials are configured."""
-    if not TELEGRAM_BOT_TOKEN:
+    if not get_settings().telegram_bot_token:
         print("Warning: TELEGRAM_BOT_TOKEN not set in .env file")
         return False
-    if not TELEGRAM_USER_ID:
+    if not get_settings().telegram_user_id:
         print("Warning: TELEGRAM_USER_ID not set in .env file")
         return False
     return True
 
 
-def send_telegram_message(message: str, screenshot_bytes: bytes = None):
+def send_telegram_message(message: str, screenshot_bytes: bytes = None, image_format: str = "png"):
     """
     Send a message to the user via Telegram bot.
     
     Args:
         message: Text message to send
         screenshot_bytes: Optional screenshot bytes to attach
+        image_format: Encoding of screenshot_bytes ('png', 'jpeg' or 'webp')
     
     Returns:
         bool: True if message was sent successfully, False otherwise
@@ -42,19 +36,19 @@ def send_telegram_message(message: str, screenshot_bytes: bytes = None):
     try:
         if screenshot_bytes:
             # Send message with photo from memory
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendPhoto"
+            url = f"https://api.telegram.org/bot{get_settings().telegram_bot_token}/sendPhoto"
             
-            files = {'photo': ('screenshot.png', screenshot_bytes, 'image/png')}
+            files = {'photo': (f"screenshot.{image_format}", screenshot_bytes, f"image/{image_format}")}
             data = {
-                'chat_id': TELEGRAM_USER_ID,
+                'chat_id': get_settings().telegram_user_id,
                 'caption': message
             }
             response = requests.post(url, files=files, data=data)
         else:
             # Send text message only
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+            url = f"https://api.telegram.org/bot{get_settings().telegram_bot_token}/sendMessage"
             data = {
-                'chat_id': TELEGRAM_USER_ID,
+                'chat_id': get_settings().telegram_user_id,
                 'text': message
             }
             response = requests.post(url, json=data)
@@ -87,10 +81,10 @@ def send_telegram_document(filename: str, caption: str, file_bytes: bytes) -> bo
         return False
     
     try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendDocument"
+        url = f"https://api.telegram.org/bot{get_settings().telegram_bot_token}/sendDocument"
         files = {'document': (filename, file_bytes, 'text/html')}
         data = {
-            'chat_id': TELEGRAM_USER_ID,
+            'chat_id': get_settings().telegram_user_id,
             'caption': caption[:1024] if caption else ""
         }
         response = requests.post(url, files=files, data=data)
@@ -105,7 +99,7 @@ def send_telegram_document(filename: str, caption: str, file_bytes: bytes) -> bo
         return False
 
 
-def send_result_notification(slots_available: bool, screenshot_bytes: bytes = None, special_case: str = None, booking_url: str = None, location: str = None, chrome_ip: str = None):
+def send_result_notification(slots_available: bool, screenshot_bytes: bytes = None, special_case: str = None, booking_url: str = None, location: str = None, chrome_ip: str = None, image_format: str = "png"):
     """
     Send appointment availability result notification.
     Only sends notification when slots are found.
@@ -117,6 +111,7 @@ def send_result_notification(slots_available: bool, screenshot_bytes: bytes = No
         booking_url: Optional booking URL to include in the message
         location: Optional location string (e.g., "subotica", "belgrade") to include in the message
         chrome_ip: Optional IP address detected from Chrome browser
+        image_format: Encoding of screenshot_bytes ('png', 'jpeg' or 'webp')
     """
     if not slots_available:
         # Don't send notification if no slots found
@@ -145,22 +140,23 @@ def send_result_notification(slots_available: bool, screenshot_bytes: bytes = No
         send_telegram_message(message, None)
     else:
         message = base_message
-        send_telegram_message(message, screenshot_bytes)
+        send_telegram_message(message, screenshot_bytes, image_format=image_format)
 
 
 def _get_proxy_config():
     """
-    Build proxy configuration from environment variables.
+    Build proxy configuration from the PROXY_SERVER settings.
     
     Returns:
         dict: Proxy configuration for requests, or None if not configured
     """
-    proxy_server = os.getenv("PROXY_SERVER")
+    settings = get_settings()
+    proxy_server = settings.proxy_server
     if not proxy_server:
         return None
     
-    proxy_username = os.getenv("PROXY_USERNAME")
-    proxy_password = os.getenv("PROXY_PASSWORD")
+    proxy_username = settings.proxy_username
+    proxy_password = settings.proxy_password
     
     if proxy_username and proxy_password:
         # Parse the proxy URL and inject credentials
@@ -241,18 +237,18 @@ def send_healthcheck_message(message: str) -> bool:
     Returns:
         bool: True if message was sent successfully, False otherwise
     """
-    if not HEALTHCHECK_BOT_TOKEN:
+    if not get_settings().healthcheck_bot_token:
         # Silently fail if healthcheck bot is not configured
         return False
     
-    if not TELEGRAM_USER_ID:
+    if not get_settings().telegram_user_id:
         print("Warning: TELEGRAM_USER_ID not set in .env file")
         return False
     
     try:
-        url = f"https://api.telegram.org/bot{HEALTHCHECK_BOT_TOKEN}/sendMessage"
+        url = f"https://api.telegram.org/bot{get_settings().healthcheck_bot_token}/sendMessage"
         data = {
-            'chat_id': TELEGRAM_USER_ID,
+            'chat_id': get_settings().telegram_user_id,
             'text': message
         }
         response = requests.post(url, json=data)
@@ -1,45 +1,63 @@
 """
 Cooldown management for captcha cases.
 When captcha is detected, the script will skip the next 2 runs.
+
+The cooldown lives in the event store (state key 'captcha_cooldown'); a
+legacy captcha_cooldown.json is imported on first read.
 """
 
-import json
 from datetime import datetime
 from pathlib import Path
 
+from ..storage.events import get_event_store, import_legacy_json
+from ..telemetry.metrics import COOLDOWN_ACTIVE, COOLDOWN_SKIPPED_RUNS
+
 COOLDOWN_FILE = Path("captcha_cooldown.json")
+COOLDOWN_STATE_KEY = "captcha_cooldown"
 SKIP_RUNS_REQUIRED = 2
 
 
+def _load_cooldown(store):
+    data = store.get_state(COOLDOWN_STATE_KEY)
+    if data is None and COOLDOWN_FILE.exists():
+        data = import_legacy_json(COOLDOWN_FILE)
+        if data is not None:
+            store.set_state(COOLDOWN_STATE_KEY, data)
+    return data
+
+
 def check_and_handle_cooldown():
     """
     Check if we're in cooldown period and handle skip logic.
-    
+
     Returns:
         tuple: (should_skip: bool, message: str)
     """
-    if not COOLDOWN_FILE.exists():
-        return (False, None)
-    
     try:
-        with COOLDOWN_FILE.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        
+        store = get_event_store()
+        data = _load_cooldown(store)
+        if not data:
+            COOLDOWN_ACTIVE.set(0)
+            return (False, None)
+
         detected_at = data.get("detected_at")
         skipped_runs = data.get("skipped_runs", 0)
-        
+
         if skipped_runs >= SKIP_RUNS_REQUIRED:
-            # Cooldown period is over, clear the file
-            COOLDOWN_FILE.unlink()
+            # Cooldown period is over, clear the state
+            store.delete_state(COOLDOWN_STATE_KEY)
+            COOLDOWN_ACTIVE.set(0)
+            COOLDOWN_SKIPPED_RUNS.set(0)
             return (False, f"Cooldown period completed ({skipped_runs} runs skipped), resuming normal operation")
-        
+
         # Increment skip count
         skipped_runs += 1
         data["skipped_runs"] = skipped_runs
-        
-        with COOLDOWN_FILE.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        
+        store.set_state(COOLDOWN_STATE_KEY, data)
+
+        COOLDOWN_ACTIVE.set(1)
+        COOLDOWN_SKIPPED_RUNS.set(skipped_runs)
+
         remaining = SKIP_RUNS_REQUIRED - skipped_runs
         message = (
             f"Skipping run due to captcha cooldown (detected at {detected_at}). "
@@ -47,17 +65,19 @@ def check_and_handle_cooldown():
             f"{remaining} run(s) remaining."
         )
         return (True, message)
-        
+
     except Exception as e:
-        # If there's an error reading the file, clear it and continue
-        if COOLDOWN_FILE.exists():
-            COOLDOWN_FILE.unlink()
-        return (False, f"Error reading cooldown file, cleared and continuing: {e}")
+        # If the state can't be read, clear it and continue
+        try:
+            get_event_store().delete_state(COOLDOWN_STATE_KEY)
+        except Exception:
+            pass
+        return (False, f"Error reading cooldown state, cleared and continuing: {e}")
 
 
 def save_captcha_cooldown():
     """
-    Save captcha detection to cooldown file.
+    Save captcha detection to the event store.
     This will trigger skipping the next 2 runs.
     """
     try:
@@ -65,14 +85,14 @@ def save_captcha_cooldown():
             "detected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "skipped_runs": 0
         }
-        
-        COOLDOWN_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with COOLDOWN_FILE.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"  Captcha cooldown saved to {COOLDOWN_FILE}")
+
+        store = get_event_store()
+        store.set_state(COOLDOWN_STATE_KEY, data)
+
+        COOLDOWN_ACTIVE.set(1)
+        COOLDOWN_SKIPPED_RUNS.set(0)
+        print(f"  Captcha cooldown saved to {store.path}")
         print(f"  Next {SKIP_RUNS_REQUIRED} runs will be skipped")
-        
+
     except Exception as e:
         print(f"  Warning: Failed to save captcha cooldown: {e}")
-
@@ -0,0 +1,196 @@
+"""
+Shared Xvfb virtual display management.
+
+Xvfb is started once per process and handed out to browser instances with
+reference counting. Readiness is detected through Xvfb's -displayfd pipe
+(Xvfb writes the display number once it accepts connections), so there is no
+fixed startup sleep. Displays that die are restarted on the same number the
+next time they are acquired.
+"""
+
+import atexit
+import os
+import select
+import subprocess
+import threading
+import time
+from typing import Dict, Optional
+
+from ..config.settings import get_settings
+from ..telemetry import get_logger
+from .reaper import get_spawn_registry
+
+logger = get_logger(__name__)
+
+XVFB_SCREEN = "1920x1080x24"
+XVFB_READY_TIMEOUT = 5.0
+
+
+class VirtualDisplay:
+    """A single running Xvfb server and the number of browsers using it."""
+
+    def __init__(self, number: int, process: subprocess.Popen):
+        self.number = number
+        self.process = process
+        self.refcount = 0
+        # Reaper entry, so the server is stopped even if this process dies without shutdown()
+        self.spawn_entry = get_spawn_registry().register_process("xvfb", process.pid)
+
+    @property
+    def name(self) -> str:
+        return f":{self.number}"
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self) -> None:
+        if self.is_alive():
+            try:
+                self.process.terminate()
+                self.process.wait(timeout=2)
+            except Exception:
+                try:
+                    self.process.kill()
+                except Exception:
+                    pass
+        get_spawn_registry().release(self.spawn_entry)
+        self.spawn_entry = None
+
+
+class VirtualDisplayManager:
+    """Process-wide pool of Xvfb displays. Use VirtualDisplayManager.instance()."""
+
+    _instance: Optional["VirtualDisplayManager"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, screen: str = XVFB_SCREEN, max_clients: Optional[int] = None):
+        self.screen = screen
+        # Several Chrome windows can share one X server; start another only past this
+        if max_clients is None:
+            max_clients = get_settings().xvfb_max_clients_per_display
+        self.max_clients = max(1, max_clients)
+        self._displays: Dict[str, VirtualDisplay] = {}
+        self._lock = threading.Lock()
+        self._available = True
+
+    @classmethod
+    def instance(cls) -> "VirtualDisplayManager":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.shutdown)
+            return cls._instance
+
+    def _spawn(self, number: Optional[int] = None) -> VirtualDisplay:
+        """
+        Start Xvfb and block until it reports readiness on -displayfd.
+
+        Args:
+            number: Display number to reuse (restart); None lets Xvfb pick a free one.
+
+        Raises:
+            FileNotFoundError: Xvfb is not installed.
+            RuntimeError: Xvfb exited or did not become ready in time.
+        """
+        read_fd, write_fd = os.pipe()
+        args = ["Xvfb"]
+        if number is not None:
+            args.append(f":{number}")
+        args += ["-displayfd", str(write_fd), "-screen", "0", self.screen, "-ac", "+extension", "RANDR", "-nolisten", "tcp"]
+        try:
+            process = subprocess.Popen(
+                args,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(write_fd,),
+            )
+        finally:
+            os.close(write_fd)
+
+        started = time.monotonic()
+        buffer = b""
+        try:
+            while not buffer.endswith(b"\n"):
+                remaining = XVFB_READY_TIMEOUT - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                ready, _, _ = select.select([read_fd], [], [], remaining)
+                if not ready:
+                    break
+                chunk = os.read(read_fd, 32)
+                if not chunk:
+                    break
+                buffer += chunk
+        finally:
+            os.close(read_fd)
+
+        if not buffer.strip().isdigit():
+            try:
+                process.kill()
+            except Exception:
+                pass
+            raise RuntimeError(f"Xvfb did not become ready within {XVFB_READY_TIMEOUT}s")
+
+        display = VirtualDisplay(int(buffer.strip()), process)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        logger.info(f"  ✓ Xvfb virtual display {display.name} ready in {elapsed_ms:.0f}ms")
+        return display
+
+    def acquire(self) -> Optional[str]:
+        """
+        Get a display for a browser, starting or restarting Xvfb as needed.
+
+        Returns:
+            Display name like ':3', or None when Xvfb is unavailable on this host
+            (callers should fall back to --headless).
+        """
+        with self._lock:
+            if not self._available:
+                return None
+
+            for name, display in list(self._displays.items()):
+                if not display.is_alive():
+                    logger.warning(f"  ⚠ Xvfb display {name} died, restarting it")
+                    display.stop()
+                    try:
+                        restarted = self._spawn(display.number)
+                    except Exception as e:
+                        logger.warning(f"  ⚠ Could not restart Xvfb display {name}: {e}")
+                        del self._displays[name]
+                        continue
+                    restarted.refcount = display.refcount
+                    self._displays[name] = restarted
+
+            candidates = [d for d in self._displays.values() if d.refcount < self.max_clients]
+            if candidates:
+                display = min(candidates, key=lambda d: d.refcount)
+            else:
+                try:
+                    display = self._spawn()
+                except FileNotFoundError:
+                    logger.warning("  ⚠ Xvfb not found (install with: apt-get install xvfb)")
+                    self._available = False
+                    return None
+                except Exception as e:
+                    logger.warning(f"  ⚠ Failed to start Xvfb: {e}")
+                    return None
+                self._displays[display.name] = display
+
+            display.refcount += 1
+            return display.name
+
+    def release(self, name: Optional[str]) -> None:
+        """Return a display. Xvfb keeps running for the next caller until shutdown()."""
+        if not name:
+            return
+        with self._lock:
+            display = self._displays.get(name)
+            if display and display.refcount > 0:
+                display.refcount -= 1
+
+    def shutdown(self) -> None:
+        """Stop every Xvfb server started by this manager."""
+        with self._lock:
+            for display in self._displays.values():
+                display.stop()
+            self._displays.clear()
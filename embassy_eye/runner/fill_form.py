@@ -6,9 +6,14 @@ Main runner that delegates to country-specific scrapers.
 import sys
 import os
 
-# Import country-specific scrapers
-from ..scrapers.hungary.runner import fill_booking_form as fill_hungary_form, fill_booking_form_both_locations
-from ..scrapers.italy.runner import fill_italy_login_form
+# Country-specific scrapers are imported on dispatch, so each run only loads its own browser stack
+from ..netstate.bandwidth import check_bandwidth_budget
+from ..scrapers import available_scrapers, load_scraper
+from ..storage.events import get_event_store
+from .reaper import reap_leftovers, start_periodic_reaper
+from ..telemetry import bind_run, get_logger
+
+logger = get_logger(__name__)
 
 
 def fill_booking_form(scraper="hungary", location="tel_aviv"):
@@ -16,23 +21,41 @@ def fill_booking_form(scraper="hungary", location="tel_aviv"):
     Fill the booking form using the specified scraper.
     
     Args:
-        scraper: The scraper to use ('hungary' or 'italy'). Defaults to 'hungary'.
+        scraper: The scraper to use ('hungary', 'italy' or 'italy-async'). Defaults to 'hungary'.
         location: For Hungary scraper, either 'subotica', 'belgrade', 'tel_aviv', or 'both'. Defaults to 'tel_aviv'.
     """
     scraper = scraper.lower()
     location = location.lower()
     
-    if scraper == "hungary":
-        if location == "both":
-            fill_booking_form_both_locations()
-        else:
-            fill_hungary_form(location=location)
-    elif scraper == "italy":
-        fill_italy_login_form()
-    else:
-        print(f"✗ Error: Unknown scraper '{scraper}'. Available scrapers: 'hungary', 'italy'")
-        sys.stdout.flush()
+    # Every log line of this run carries the same correlation id
+    with bind_run() as run_id:
+        logger.info(f"Run {run_id}: scraper={scraper}, location={location}")
+        # Start on a clean host: browsers, Xvfb servers and profiles of dead runs go first
+        reap_leftovers()
+        start_periodic_reaper()
+        # Throttle scheduled runs as the daily proxy traffic budget runs out
+        should_skip, budget_message = check_bandwidth_budget()
+        if budget_message:
+            logger.info(budget_message)
+        if should_skip:
+            return
+        store = get_event_store()
+        store.start_run(run_id, scraper, location)
+        try:
+            _dispatch(scraper, location)
+        finally:
+            store.finish_run(run_id)
+
+
+def _dispatch(scraper, location):
+    """Invoke the selected scraper."""
+    try:
+        entry_point = load_scraper(scraper)
+    except KeyError:
+        available = ", ".join(f"'{name}'" for name in available_scrapers())
+        logger.error(f"✗ Error: Unknown scraper '{scraper}'. Available scrapers: {available}")
         return
+    entry_point(location)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+"""
+Reaper for browsers, Xvfb servers and temp profile directories left behind by dead runs.
+
+Everything embassy-eye spawns that can outlive a crash is recorded in the
+event store's database (table spawned_resources), tagged with the run id and
+the pid of the owning process: chromedriver and Chrome processes, Xvfb
+servers, and temporary Chrome profile directories. Owners release the
+entries when they clean up normally.
+
+reap() deals with the rest. When an entry's owner is gone, its process tree
+is terminated and its directory deleted. Unregistered chrome_user_data_* and
+proxy_auth_ext_* directories in the temp directory that are older than
+STALE_DIR_AGE go too (older versions, or a kill before registration).
+Processes are matched by pid and start time, so a reused pid is never killed.
+Without /proc there is no start time to match, so process entries of dead
+owners are dropped without killing anything and only their directories are
+deleted.
+
+The reaper runs at the start of every run (runner.fill_form), every
+REAP_INTERVAL seconds while the process lives, and at interpreter exit for
+this process's own unreleased entries (sys.exit paths that skip cleanup).
+By hand: python -m embassy_eye.runner.reaper
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from ..storage.events import EventStore, get_event_store
+from ..telemetry import get_logger, get_run_id
+from ..telemetry.metrics import REAPED_RESOURCES
+from .watchdog import PROC_AVAILABLE, kill_tree, process_start_time
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spawned_resources (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id       TEXT,
+    owner_pid    INTEGER NOT NULL,
+    owner_start  INTEGER,
+    kind         TEXT NOT NULL,
+    label        TEXT NOT NULL,
+    pid          INTEGER,
+    pid_start    INTEGER,
+    path         TEXT,
+    created_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_spawned_resources_owner ON spawned_resources (owner_pid);
+"""
+
+# Temp directories embassy-eye creates (Italy profiles, per-run proxy extensions of older versions)
+TEMP_DIR_PREFIXES = ("chrome_user_data_", "proxy_auth_ext_")
+# Unregistered temp directories older than this (seconds) are deleted
+STALE_DIR_AGE = 3600
+# Seconds between reaps in a long-lived process
+REAP_INTERVAL = 600
+
+
+def _is_running(pid: Optional[int], start_time: Optional[int]) -> bool:
+    """
+    True if pid is alive and still the process that was registered, not a later one reusing the pid.
+
+    Without /proc only liveness can be checked, so a reused pid counts as
+    running. That is only safe for owners (it delays their reaping), never for
+    deciding what to kill.
+    """
+    if not pid:
+        return False
+    if PROC_AVAILABLE:
+        return start_time is not None and process_start_time(pid) == start_time
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SpawnRegistry:
+    """Processes and directories spawned by this and earlier runs, on top of the shared event store."""
+
+    def __init__(self, store: Optional[EventStore] = None):
+        self.store = store or get_event_store()
+        self.store.executescript(SCHEMA)
+        self.pid = os.getpid()
+        self.start_time = process_start_time(self.pid)
+
+    def _insert(self, kind: str, label: str, pid: Optional[int] = None, path: Optional[str] = None) -> Optional[int]:
+        try:
+            cursor = self.store.execute(
+                "INSERT INTO spawned_resources (run_id, owner_pid, owner_start, kind, label, pid, pid_start, path, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (get_run_id(), self.pid, self.start_time, kind, label, pid,
+                 process_start_time(pid) if pid else None, path, time.time()),
+            )
+            return cursor.lastrowid
+        except Exception as e:
+            logger.warning(f"  Warning: Could not register {label}: {e}")
+            return None
+
+    def register_process(self, label: str, pid: Optional[int]) -> Optional[int]:
+        """Record a spawned process (its whole tree is reaped); returns the entry id for release()."""
+        return self._insert("process", label, pid=pid) if pid else None
+
+    def register_dir(self, label: str, path: Union[str, Path, None]) -> Optional[int]:
+        """Record a temp directory to delete if its owner dies; returns the entry id for release()."""
+        return self._insert("dir", label, path=str(path)) if path else None
+
+    def release(self, *entry_ids: Optional[int]) -> None:
+        """Forget entries whose owner cleaned them up."""
+        for entry_id in entry_ids:
+            if entry_id is None:
+                continue
+            try:
+                self.store.execute("DELETE FROM spawned_resources WHERE id = ?", (entry_id,))
+            except Exception:
+                pass
+
+    def _reap_entry(self, row, counts: Dict[str, int]) -> None:
+        if row["kind"] == "process":
+            # Without start times a live pid may belong to an unrelated process
+            if PROC_AVAILABLE and _is_running(row["pid"], row["pid_start"]):
+                counts["process"] += kill_tree([row["pid"]])
+        elif row["path"] and os.path.isdir(row["path"]):
+            shutil.rmtree(row["path"], ignore_errors=True)
+            counts["dir"] += 1
+        self.store.execute("DELETE FROM spawned_resources WHERE id = ?", (row["id"],))
+
+    def _sweep_temp_dirs(self, live_paths, counts: Dict[str, int]) -> None:
+        now = time.time()
+        tmp_root = Path(tempfile.gettempdir())
+        for prefix in TEMP_DIR_PREFIXES:
+            for path in tmp_root.glob(f"{prefix}*"):
+                try:
+                    if str(path) in live_paths or not path.is_dir() or now - path.stat().st_mtime < STALE_DIR_AGE:
+                        continue
+                except OSError:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                counts["dir"] += 1
+
+    def reap(self, own: bool = False) -> Dict[str, int]:
+        """
+        Clean up entries of dead owners and stale unregistered temp directories.
+
+        With own=True only this process's unreleased entries are reaped (at exit).
+        Returns the number of processes and directories removed by kind.
+        """
+        counts = {"process": 0, "dir": 0}
+        live_paths = set()
+        for row in self.store.query("SELECT * FROM spawned_resources"):
+            is_own = row["owner_pid"] == self.pid and row["owner_start"] == self.start_time
+            if own:
+                if is_own:
+                    self._reap_entry(row, counts)
+            elif not is_own and not _is_running(row["owner_pid"], row["owner_start"]):
+                self._reap_entry(row, counts)
+            elif row["path"]:
+                live_paths.add(row["path"])
+        if not own:
+            self._sweep_temp_dirs(live_paths, counts)
+        for kind, count in counts.items():
+            if count:
+                REAPED_RESOURCES.inc(count, kind=kind)
+        if any(counts.values()):
+            logger.info(f"  Reaper: removed {counts['process']} leftover process(es), {counts['dir']} temp dir(s)")
+        return counts
+
+
+_registry: Optional[SpawnRegistry] = None
+_registry_lock = threading.Lock()
+_reaper_thread: Optional[threading.Thread] = None
+
+
+def get_spawn_registry() -> SpawnRegistry:
+    """Return the process-wide registry; its own unreleased entries are reaped at exit."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SpawnRegistry()
+            atexit.register(_reap_own)
+        return _registry
+
+
+def _reap_own() -> None:
+    try:
+        _registry.reap(own=True)
+    except Exception:
+        pass
+
+
+def reap_leftovers() -> Dict[str, int]:
+    """reap() on the shared registry; never fails a run because cleanup did."""
+    try:
+        return get_spawn_registry().reap()
+    except Exception as e:
+        logger.warning(f"  Warning: Reaper failed: {e}")
+        return {}
+
+
+def start_periodic_reaper(interval: float = REAP_INTERVAL) -> None:
+    """Reap every interval seconds in a daemon thread (once per process)."""
+    global _reaper_thread
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            reap_leftovers()
+
+    with _registry_lock:
+        if _reaper_thread is None:
+            _reaper_thread = threading.Thread(target=loop, name="reaper", daemon=True)
+            _reaper_thread.start()
+
+
+if __name__ == "__main__":
+    counts = reap_leftovers()
+    print(f"Removed {counts.get('process', 0)} process(es) and {counts.get('dir', 0)} directory(ies)")
+    sys.exit(0)
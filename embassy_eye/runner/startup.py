@@ -0,0 +1,152 @@
+"""
+Startup as a small dependency graph, with independent steps run concurrently.
+
+A StartupGraph holds named nodes, each with the nodes it depends on. run()
+starts every node as soon as its dependencies have finished, on a thread
+pool. The results of the dependencies are passed to the node as keyword
+arguments named after them. Optional nodes that fail yield None, and their
+dependents still run; a failing required node fails the graph. run() returns
+once the required nodes are done: an optional node nothing required depends
+on (a cache warm-up, a diagnostic) is left to finish in the background.
+Nodes run in a copy of the caller's context, so log records and registered
+resources carry the caller's run id.
+
+Each node's start offset and duration are logged, along with the critical
+path (the chain of dependencies that decided when the graph finished), and
+the durations are observed as step metrics.
+"""
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ..telemetry import get_logger
+from ..telemetry.metrics import STEP_DURATION
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class StartupNode:
+    name: str
+    func: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    optional: bool = False
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or 0.0) - (self.started or 0.0)
+
+
+class StartupGraph:
+    """Named startup steps and their dependencies; run() executes them concurrently."""
+
+    def __init__(self, scraper: str, max_workers: int = 4):
+        self.scraper = scraper
+        self.max_workers = max_workers
+        self.nodes: Dict[str, StartupNode] = {}
+
+    def add(self, name: str, func: Callable[..., Any], deps: Tuple[str, ...] = (), optional: bool = False) -> None:
+        for dep in deps:
+            if dep not in self.nodes:
+                raise ValueError(f"startup node '{name}' depends on unknown node '{dep}'")
+        self.nodes[name] = StartupNode(name, func, tuple(deps), optional)
+
+    def _call(self, node: StartupNode, results: Dict[str, Any]) -> Any:
+        node.started = time.monotonic()
+        try:
+            return node.func(**{dep: results[dep] for dep in node.deps})
+        finally:
+            node.finished = time.monotonic()
+
+    def _needed(self) -> Set[str]:
+        """Required nodes and everything they depend on."""
+        needed: Set[str] = set()
+        stack = [name for name, node in self.nodes.items() if not node.optional]
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.nodes[name].deps)
+        return needed
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every node once its dependencies are done; returns the results by node name.
+
+        Optional nodes that are still running when the required ones are done
+        keep running in the background and have no entry in the results.
+        """
+        results: Dict[str, Any] = {}
+        failed: Dict[str, BaseException] = {}
+        pending = dict(self.nodes)
+        running: Dict[Future, StartupNode] = {}
+        needed = self._needed()
+        began = time.monotonic()
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"startup-{self.scraper}")
+        try:
+            while pending or running:
+                ready = [node for node in pending.values() if all(dep in results for dep in node.deps)]
+                for node in ready:
+                    del pending[node.name]
+                    context = contextvars.copy_context()
+                    running[pool.submit(context.run, self._call, node, results)] = node
+                if needed.isdisjoint(pending) and needed.isdisjoint(node.name for node in running.values()):
+                    break
+                if not running:
+                    # Remaining nodes depend on a failed required node
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        if not node.optional:
+                            failed[node.name] = e
+                            continue
+                        logger.warning(f"  Warning: Startup step {node.name} failed ({e}), continuing without it")
+                        value = None
+                    results[node.name] = value
+                if failed:
+                    # Let running nodes finish, but start nothing new
+                    pending.clear()
+        finally:
+            pool.shutdown(wait=False)
+
+        self._report(began)
+        if failed:
+            raise next(iter(failed.values()))
+        return results
+
+    def critical_path(self) -> List[StartupNode]:
+        """The chain of finished nodes, each waiting on the dependency that finished last."""
+        finished = [node for node in self.nodes.values() if node.finished is not None]
+        if not finished:
+            return []
+        node = max(finished, key=lambda n: n.finished)
+        path = [node]
+        while node.deps:
+            deps = [self.nodes[dep] for dep in node.deps if self.nodes[dep].finished is not None]
+            if not deps:
+                break
+            node = max(deps, key=lambda n: n.finished)
+            path.append(node)
+        return list(reversed(path))
+
+    def _report(self, began: float) -> None:
+        for node in sorted(self.nodes.values(), key=lambda n: n.started or float("inf")):
+            if node.finished is None:
+                continue
+            STEP_DURATION.observe(node.duration, scraper=self.scraper, step=f"startup_{node.name}")
+            logger.info(f"  startup {node.name:<16} +{(node.started - began) * 1000:6.0f}ms  {node.duration * 1000:6.0f}ms")
+        path = self.critical_path()
+        if path:
+            total = (path[-1].finished - began) * 1000
+            chain = " -> ".join(node.name for node in path)
+            logger.info(f"  startup critical path: {chain} ({total:.0f}ms)")
@@ -0,0 +1,71 @@
+"""
+Background browser teardown, off the run's critical path.
+
+Quitting a driver or terminating Chrome takes seconds: driver.quit(), SIGTERM
+and a wait for Chrome to exit, removing the profile directory.
+schedule_teardown() runs these steps in a daemon thread, so the caller can
+record its outcome, send notifications and move on (e.g. to the next
+location) while the old browser shuts down.
+
+At interpreter exit, pending teardowns get TEARDOWN_DEADLINE seconds
+(wait_for_teardowns). Whatever is still running after that is left to the
+reaper, which kills the process trees this process registered and never
+released.
+"""
+
+import atexit
+import threading
+import time
+from typing import Callable, List
+
+from ..telemetry import get_logger
+from ..telemetry.metrics import TEARDOWN_DURATION
+
+logger = get_logger(__name__)
+
+# Seconds pending teardowns get at exit before the reaper takes over
+TEARDOWN_DEADLINE = 15.0
+
+_pending: List[threading.Thread] = []
+_lock = threading.Lock()
+_atexit_registered = False
+
+
+def schedule_teardown(target: str, teardown: Callable, *args) -> threading.Thread:
+    """Run teardown(*args) in a daemon thread; target names it in logs and metrics."""
+    global _atexit_registered
+
+    def run():
+        started = time.monotonic()
+        try:
+            teardown(*args)
+        except Exception as e:
+            logger.warning(f"  Warning: Teardown of {target} failed: {e}")
+        finally:
+            TEARDOWN_DURATION.observe(time.monotonic() - started, target=target)
+            with _lock:
+                if thread in _pending:
+                    _pending.remove(thread)
+
+    thread = threading.Thread(target=run, name=f"teardown-{target}", daemon=True)
+    with _lock:
+        _pending.append(thread)
+        if not _atexit_registered:
+            # Registered after the reaper's exit hook, so it runs first
+            atexit.register(wait_for_teardowns)
+            _atexit_registered = True
+    thread.start()
+    return thread
+
+
+def wait_for_teardowns(timeout: float = TEARDOWN_DEADLINE) -> int:
+    """Wait up to timeout seconds for pending teardowns; returns how many are still running."""
+    deadline = time.monotonic() + timeout
+    with _lock:
+        pending = list(_pending)
+    for thread in pending:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    remaining = sum(1 for thread in pending if thread.is_alive())
+    if remaining:
+        logger.warning(f"  {remaining} browser teardown(s) still running after {timeout:.0f}s; leaving them to the reaper")
+    return remaining
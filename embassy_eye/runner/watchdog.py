@@ -0,0 +1,308 @@
+"""
+Chrome memory watchdog and proactive browser recycling.
+
+Every browser the scrapers start is registered by the pids at the root of its
+process tree (chromedriver and/or Chrome itself). A daemon thread samples the
+memory of each tree every CHROME_WATCHDOG_INTERVAL seconds and exports it as
+metrics. Memory is the proportional set size (PSS), so the Chrome binary and
+libraries every renderer maps are split between them instead of being counted
+once per process.
+
+A browser whose tree grows past CHROME_MAX_RSS_MB, or that has been running
+for longer than CHROME_MAX_AGE_MINUTES, is flagged for recycling and its
+owner replaces it at the next safe point (the async Italy host does so
+between sessions). An owner that never gets there, e.g. one stuck on a hung
+page, has RECYCLE_GRACE seconds before the watchdog kills the tree and the
+owner's own error handling takes over. Browsers watched with enforce=False
+(interactive runs, and owners with no safe point such as the sync Italy bot)
+are only measured.
+
+kill_new_processes() covers the other leak: when create_driver gives up on a
+hung undetected-chromedriver start, the startup thread keeps running, and the
+Chrome it launched would otherwise outlive the run.
+
+Process trees are read from /proc, so the watchdog only runs on Linux (the
+Docker images); elsewhere watch() hands back an unwatched handle.
+"""
+
+import os
+import signal
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..config.settings import get_settings
+from ..telemetry import get_logger
+from ..telemetry.metrics import CHROME_ORPHANS_KILLED, CHROME_PROCESSES, CHROME_RECYCLES, CHROME_RSS_BYTES
+
+logger = get_logger(__name__)
+
+PROC = Path("/proc")
+PROC_AVAILABLE = PROC.is_dir()
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+MB = 1024 * 1024
+
+# Seconds a flagged browser gets to be recycled by its owner before it is killed
+RECYCLE_GRACE = 120.0
+# Seconds between SIGTERM and SIGKILL when killing a process tree
+KILL_TIMEOUT = 3.0
+
+ProcessTable = Dict[int, Tuple[str, str, int]]
+
+
+def _read_stat(pid: int) -> Optional[Tuple[str, str, int]]:
+    """(command name, state, parent pid) of a process, from /proc/<pid>/stat."""
+    try:
+        data = (PROC / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    # The command name is in parentheses and may itself contain spaces or parentheses
+    name = data[data.find("(") + 1:data.rfind(")")]
+    fields = data[data.rfind(")") + 2:].split()
+    try:
+        return name, fields[0], int(fields[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def process_start_time(pid: int) -> Optional[int]:
+    """Start time of a live process in clock ticks after boot (tells it apart from a later one reusing its pid)."""
+    try:
+        data = (PROC / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    fields = data[data.rfind(")") + 2:].split()
+    try:
+        return None if fields[0] == "Z" else int(fields[19])
+    except (IndexError, ValueError):
+        return None
+
+
+def process_table() -> ProcessTable:
+    """Snapshot of all processes: pid -> (command name, state, parent pid)."""
+    table: ProcessTable = {}
+    try:
+        entries = os.listdir(PROC)
+    except OSError:
+        return table
+    for entry in entries:
+        if entry.isdigit():
+            stat = _read_stat(int(entry))
+            if stat:
+                table[int(entry)] = stat
+    return table
+
+
+def descendants(roots: Iterable[int], table: Optional[ProcessTable] = None) -> Set[int]:
+    """The given pids and all of their descendants that are still running."""
+    table = process_table() if table is None else table
+    children: Dict[int, List[int]] = defaultdict(list)
+    for pid, (_, _, parent) in table.items():
+        children[parent].append(pid)
+    found: Set[int] = set()
+    stack = [pid for pid in roots if pid in table]
+    while stack:
+        pid = stack.pop()
+        if pid in found:
+            continue
+        found.add(pid)
+        stack.extend(children[pid])
+    return {pid for pid in found if table[pid][1] != "Z"}
+
+
+def memory_bytes(pid: int) -> int:
+    """
+    Memory of one process with shared pages split between the processes mapping them.
+
+    PSS from /proc/<pid>/smaps_rollup (Linux 4.14+); on older kernels the
+    resident pages that are not shared, from statm.
+    """
+    try:
+        for line in (PROC / str(pid) / "smaps_rollup").read_text().splitlines():
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        resident, shared = (int(value) for value in (PROC / str(pid) / "statm").read_text().split()[1:3])
+    except (OSError, ValueError):
+        return 0
+    return max(resident - shared, 0) * PAGE_SIZE
+
+
+def _is_chrome(name: str) -> bool:
+    # Covers chrome, chromium, chromedriver and undetected_chromedriver (names are cut at 15 chars)
+    return "chrom" in name.lower()
+
+
+def _signal_all(pids: Iterable[int], sig: int) -> None:
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def kill_tree(roots: Iterable[int], timeout: float = KILL_TIMEOUT) -> int:
+    """SIGTERM a process tree, SIGKILL whatever is left after timeout; returns the number of processes."""
+    pids = descendants(roots)
+    if not pids:
+        return 0
+    _signal_all(pids, signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    remaining = pids
+    while remaining and time.monotonic() < deadline:
+        time.sleep(0.1)
+        remaining = descendants(remaining)
+    _signal_all(remaining, signal.SIGKILL)
+    return len(pids)
+
+
+def chrome_processes() -> Set[int]:
+    """Chrome and chromedriver processes descended from this process."""
+    if not PROC_AVAILABLE:
+        return set()
+    table = process_table()
+    own = os.getpid()
+    return {pid for pid in descendants([own], table) if pid != own and _is_chrome(table[pid][0])}
+
+
+def kill_new_processes(before: Set[int]) -> int:
+    """Kill Chrome/chromedriver processes this process started since the `before` snapshot."""
+    orphans = chrome_processes() - before
+    if not orphans:
+        return 0
+    killed = kill_tree(orphans)
+    CHROME_ORPHANS_KILLED.inc(killed)
+    logger.warning(f"  Killed {killed} Chrome process(es) left behind by the timed-out startup")
+    return killed
+
+
+def driver_pids(driver) -> Tuple[int, ...]:
+    """Root pids of a Selenium driver: chromedriver, plus Chrome when undetected-chromedriver launched it."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    pids = (getattr(process, "pid", None), getattr(driver, "browser_pid", None))
+    return tuple(pid for pid in pids if pid)
+
+
+@dataclass(eq=False)
+class WatchedBrowser:
+    """A registered browser and its latest sample."""
+
+    name: str
+    pids: Tuple[int, ...]
+    enforce: bool = True
+    started_at: float = field(default_factory=time.monotonic)
+    rss: int = 0
+    processes: int = 0
+    recycle_reason: Optional[str] = None
+    recycle_requested_at: Optional[float] = None
+    killed: bool = False
+
+    @property
+    def recycle_requested(self) -> bool:
+        return self.recycle_reason is not None
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.started_at
+
+
+class ChromeWatchdog:
+    """Process-wide browser registry and sampling thread. Use ChromeWatchdog.instance()."""
+
+    _instance: Optional["ChromeWatchdog"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, interval: Optional[float] = None, max_rss_mb: Optional[int] = None,
+                 max_age_minutes: Optional[int] = None):
+        settings = get_settings()
+        self.interval = settings.chrome_watchdog_interval if interval is None else interval
+        max_rss_mb = settings.chrome_max_rss_mb if max_rss_mb is None else max_rss_mb
+        max_age_minutes = settings.chrome_max_age_minutes if max_age_minutes is None else max_age_minutes
+        self.max_rss_bytes = max_rss_mb * MB
+        self.max_age = max_age_minutes * 60
+        self._browsers: List[WatchedBrowser] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def instance(cls) -> "ChromeWatchdog":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return PROC_AVAILABLE and self.interval > 0
+
+    def watch(self, name: str, *pids: Optional[int], enforce: bool = True) -> WatchedBrowser:
+        """Start sampling the process tree under pids; the handle says when to recycle."""
+        browser = WatchedBrowser(name=name, pids=tuple(pid for pid in pids if pid), enforce=enforce)
+        if not self.enabled or not browser.pids:
+            return browser
+        with self._lock:
+            self._browsers.append(browser)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="chrome-watchdog", daemon=True)
+                self._thread.start()
+        return browser
+
+    def unwatch(self, browser: Optional[WatchedBrowser]) -> None:
+        if browser is None:
+            return
+        with self._lock:
+            if browser in self._browsers:
+                self._browsers.remove(browser)
+        CHROME_RSS_BYTES.set(0, browser=browser.name)
+        CHROME_PROCESSES.set(0, browser=browser.name)
+
+    def sample(self) -> None:
+        """Measure every watched browser once and act on the limits."""
+        with self._lock:
+            browsers = list(self._browsers)
+        if not browsers:
+            return
+        table = process_table()
+        for browser in browsers:
+            pids = descendants(browser.pids, table)
+            browser.processes = len(pids)
+            browser.rss = sum(memory_bytes(pid) for pid in pids)
+            CHROME_RSS_BYTES.set(browser.rss, browser=browser.name)
+            CHROME_PROCESSES.set(browser.processes, browser=browser.name)
+            if pids and browser.enforce:
+                self._check_limits(browser)
+
+    def _check_limits(self, browser: WatchedBrowser) -> None:
+        now = time.monotonic()
+        if not browser.recycle_requested:
+            if self.max_rss_bytes and browser.rss > self.max_rss_bytes:
+                browser.recycle_reason = "memory"
+            elif self.max_age and browser.age > self.max_age:
+                browser.recycle_reason = "age"
+            else:
+                return
+            browser.recycle_requested_at = now
+            CHROME_RECYCLES.inc(browser=browser.name, reason=browser.recycle_reason)
+            logger.warning(
+                f"  Chrome watchdog: {browser.name} over its {browser.recycle_reason} limit "
+                f"({browser.rss // MB} MB in {browser.processes} processes, {browser.age / 60:.0f} min old); "
+                f"recycle requested"
+            )
+        elif not browser.killed and now - browser.recycle_requested_at > RECYCLE_GRACE:
+            browser.killed = True
+            CHROME_RECYCLES.inc(browser=browser.name, reason="killed")
+            logger.error(f"  Chrome watchdog: {browser.name} was not recycled within {RECYCLE_GRACE:.0f}s; killing it")
+            kill_tree(browser.pids)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"  Warning: Chrome watchdog sample failed: {e}")
@@ -1,4 +1,38 @@
 """
 Scrapers package for different embassy booking systems.
+
+Scrapers are registered by entry point ("module:function") rather than
+imported here, so selecting one only loads its own dependencies: Hungary
+pulls in Selenium and undetected-chromedriver, Italy pulls in Playwright.
+Each entry point takes the location argument of fill_booking_form.
 """
 
+import importlib
+from typing import Callable, Dict, List
+
+SCRAPERS: Dict[str, str] = {
+    "hungary": "embassy_eye.scrapers.hungary.runner:run_scraper",
+    "italy": "embassy_eye.scrapers.italy.runner:run_scraper",
+    "italy-async": "embassy_eye.scrapers.italy.async_runner:run_scraper",
+}
+
+
+def register_scraper(name: str, entry_point: str) -> None:
+    """Register (or replace) a scraper under name; entry_point is 'package.module:function'."""
+    module, _, attr = entry_point.partition(":")
+    if not module or not attr:
+        raise ValueError(f"Invalid entry point '{entry_point}' (expected 'module:function')")
+    SCRAPERS[name.lower()] = entry_point
+
+
+def available_scrapers() -> List[str]:
+    return list(SCRAPERS)
+
+
+def load_scraper(name: str) -> Callable[[str], None]:
+    """Import the selected scraper's module and return its entry point (raises KeyError if unknown)."""
+    module, _, attr = SCRAPERS[name.lower()].partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+__all__ = ["SCRAPERS", "available_scrapers", "load_scraper", "register_scraper"]
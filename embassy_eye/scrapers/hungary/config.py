@@ -1,10 +1,21 @@
 """
 Configuration constants and default values for the Hungary embassy booking form filler.
+
+Applicant details are random per run: get_run_profile() returns an immutable
+ApplicantProfile for the current run id, taken from a small pool that a
+background thread keeps filled. DEFAULT_VALUES and FIELD_MAP are still
+available as module attributes and resolve to the current run's profile.
 """
 
+from collections import deque
+from dataclasses import asdict, dataclass
 from datetime import date, timedelta
 import random
 import string
+import threading
+from typing import Deque, Dict, Optional, Tuple
+
+from ...telemetry import get_run_id
 
 
 def _system_rng():
@@ -14,154 +25,155 @@ def _system_rng():
     return _system_rng._instance
 
 
-def _random_name():
-    rng = _system_rng()
-    first_names = [
-        # Serbian names
-        "Marko",
-        "Nikola",
-        "Jelena",
-        "Mila",
-        "Sara",
-        "Luka",
-        "Stefan",
-        "Ana",
-        "Ivana",
-        "Petar",
-        "Milan",
-        "Dragan",
-        "Zoran",
-        "Dejan",
-        "Nenad",
-        "Bojan",
-        "Vladimir",
-        "Aleksandar",
-        "Milos",
-        "Dusan",
-        "Jovana",
-        "Milica",
-        "Tamara",
-        "Jasmina",
-        "Snezana",
-        "Natasa",
-        "Marija",
-        "Katarina",
-        "Aleksandra",
-        # Russian names
-        "Ivan",
-        "Dmitri",
-        "Alexander",
-        "Sergei",
-        "Andrei",
-        "Mikhail",
-        "Vladimir",
-        "Alexei",
-        "Nikolai",
-        "Pavel",
-        "Yuri",
-        "Maxim",
-        "Anton",
-        "Roman",
-        "Igor",
-        "Elena",
-        "Maria",
-        "Anna",
-        "Olga",
-        "Tatiana",
-        "Natalia",
-        "Svetlana",
-        "Irina",
-        "Ekaterina",
-        "Yulia",
-        "Anastasia",
-        "Daria",
-        "Victoria",
-        "Kristina",
-        "Marina",
-    ]
-    last_names = [
-        # Serbian surnames
-        "Petrovic",
-        "Jovanovic",
-        "Markovic",
-        "Nikolic",
-        "Ilic",
-        "Kovacevic",
-        "Stankovic",
-        "Milosevic",
-        "Savic",
-        "Filipovic",
-        "Djordjevic",
-        "Pavlovic",
-        "Lazic",
-        "Stefanovic",
-        "Mitic",
-        "Radic",
-        "Popovic",
-        "Tomic",
-        "Vukovic",
-        "Zivkovic",
-        "Simic",
-        "Maric",
-        "Jankovic",
-        "Ristic",
-        "Mladenovic",
-        "Stojanovic",
-        "Bogdanovic",
-        "Cvetkovic",
-        "Kostic",
-        "Djuric",
-        # Russian surnames
-        "Ivanov",
-        "Petrov",
-        "Sidorov",
-        "Smirnov",
-        "Kuznetsov",
-        "Popov",
-        "Sokolov",
-        "Lebedev",
-        "Kozlov",
-        "Novikov",
-        "Morozov",
-        "Volkov",
-        "Alekseev",
-        "Romanov",
-        "Orlov",
-        "Pavlov",
-        "Semenov",
-        "Stepanov",
-        "Nikolaev",
-        "Orlova",
-        "Ivanova",
-        "Petrova",
-        "Sidorova",
-        "Smirnova",
-        "Kuznetsova",
-        "Popova",
-        "Sokolova",
-        "Lebedeva",
-        "Kozlova",
-        "Novikova",
-    ]
-    return f"{rng.choice(first_names)} {rng.choice(last_names)}"
-
-
-def _random_email(name: str):
-    rng = _system_rng()
+FIRST_NAMES = (
+    # Serbian names
+    "Marko",
+    "Nikola",
+    "Jelena",
+    "Mila",
+    "Sara",
+    "Luka",
+    "Stefan",
+    "Ana",
+    "Ivana",
+    "Petar",
+    "Milan",
+    "Dragan",
+    "Zoran",
+    "Dejan",
+    "Nenad",
+    "Bojan",
+    "Vladimir",
+    "Aleksandar",
+    "Milos",
+    "Dusan",
+    "Jovana",
+    "Milica",
+    "Tamara",
+    "Jasmina",
+    "Snezana",
+    "Natasa",
+    "Marija",
+    "Katarina",
+    "Aleksandra",
+    # Russian names
+    "Ivan",
+    "Dmitri",
+    "Alexander",
+    "Sergei",
+    "Andrei",
+    "Mikhail",
+    "Vladimir",
+    "Alexei",
+    "Nikolai",
+    "Pavel",
+    "Yuri",
+    "Maxim",
+    "Anton",
+    "Roman",
+    "Igor",
+    "Elena",
+    "Maria",
+    "Anna",
+    "Olga",
+    "Tatiana",
+    "Natalia",
+    "Svetlana",
+    "Irina",
+    "Ekaterina",
+    "Yulia",
+    "Anastasia",
+    "Daria",
+    "Victoria",
+    "Kristina",
+    "Marina",
+)
+
+LAST_NAMES = (
+    # Serbian surnames
+    "Petrovic",
+    "Jovanovic",
+    "Markovic",
+    "Nikolic",
+    "Ilic",
+    "Kovacevic",
+    "Stankovic",
+    "Milosevic",
+    "Savic",
+    "Filipovic",
+    "Djordjevic",
+    "Pavlovic",
+    "Lazic",
+    "Stefanovic",
+    "Mitic",
+    "Radic",
+    "Popovic",
+    "Tomic",
+    "Vukovic",
+    "Zivkovic",
+    "Simic",
+    "Maric",
+    "Jankovic",
+    "Ristic",
+    "Mladenovic",
+    "Stojanovic",
+    "Bogdanovic",
+    "Cvetkovic",
+    "Kostic",
+    "Djuric",
+    # Russian surnames
+    "Ivanov",
+    "Petrov",
+    "Sidorov",
+    "Smirnov",
+    "Kuznetsov",
+    "Popov",
+    "Sokolov",
+    "Lebedev",
+    "Kozlov",
+    "Novikov",
+    "Morozov",
+    "Volkov",
+    "Alekseev",
+    "Romanov",
+    "Orlov",
+    "Pavlov",
+    "Semenov",
+    "Stepanov",
+    "Nikolaev",
+    "Orlova",
+    "Ivanova",
+    "Petrova",
+    "Sidorova",
+    "Smirnova",
+    "Kuznetsova",
+    "Popova",
+    "Sokolova",
+    "Lebedeva",
+    "Kozlova",
+    "Novikova",
+)
+
+EMAIL_DOMAINS = ("example.com", "mail.com", "inbox.eu", "test.org")
+
+
+def _random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _random_email(rng, name: str):
     handle = name.lower().replace(" ", ".")
-    domain = rng.choice(["example.com", "mail.com", "inbox.eu", "test.org"])
+    domain = rng.choice(EMAIL_DOMAINS)
     suffix = rng.randint(10, 9999)
     return f"{handle}{suffix}@{domain}"
 
 
-def _random_phone():
-    rng = _system_rng()
+def _random_phone(rng):
     digits = "".join(str(rng.randint(0, 9)) for _ in range(7))
     return f"+361{digits}"
 
 
-def _random_date_of_birth(start_year=1960, end_year=2002):
-    rng = _system_rng()
+def _random_date_of_birth(rng, start_year=1960, end_year=2002):
     start = date(start_year, 1, 1)
     end = date(end_year, 12, 31)
     random_days = rng.randint(0, (end - start).days)
@@ -169,63 +181,149 @@ def _random_date_of_birth(start_year=1960, end_year=2002):
     return dob.strftime("%d/%m/%Y"), dob.strftime("%Y-%m-%d")
 
 
-def _random_passport():
-    rng = _system_rng()
+def _random_passport(rng):
     letters = "".join(rng.choice(string.ascii_uppercase) for _ in range(2))
     numbers = "".join(str(rng.randint(0, 9)) for _ in range(6))
     return f"{letters}{numbers}"
 
 
-def _random_residence_permit():
-    rng = _system_rng()
+def _random_residence_permit(rng):
     return "".join(str(rng.randint(0, 9)) for _ in range(9))
 
 
-def _generate_dynamic_defaults():
-    name = _random_name()
-    email = _random_email(name)
-    phone = _random_phone()
-    dob_display, dob_iso = _random_date_of_birth()
-    passport = _random_passport()
-    residence_permit = _random_residence_permit()
-    return {
-        "name": name,
-        "email": email,
-        "phone": phone,
-        "date_of_birth": dob_display,
-        "date_of_birth_iso": dob_iso,
-        "passport": passport,
-        "residence_permit": residence_permit,
-    }
+@dataclass(frozen=True)
+class ApplicantProfile:
+    """One fake applicant, used for every form filled during a run."""
+
+    name: str
+    email: str
+    phone: str
+    date_of_birth: str
+    date_of_birth_iso: str
+    passport: str
+    residence_permit: str
+    citizenship: str = "Russian Federation"
+    residential_community: str = "Novi Sad"
+    applicants: str = "1"
+
+    @classmethod
+    def generate(cls, rng: Optional[random.Random] = None) -> "ApplicantProfile":
+        rng = rng or _system_rng()
+        name = _random_name(rng)
+        dob_display, dob_iso = _random_date_of_birth(rng)
+        return cls(
+            name=name,
+            email=_random_email(rng, name),
+            phone=_random_phone(rng),
+            date_of_birth=dob_display,
+            date_of_birth_iso=dob_iso,
+            passport=_random_passport(rng),
+            residence_permit=_random_residence_permit(rng),
+        )
+
+    def as_dict(self) -> Dict[str, str]:
+        """The profile in the DEFAULT_VALUES layout."""
+        return asdict(self)
+
+    def field_map(self) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Form field id -> (field type, value), the FIELD_MAP layout."""
+        return {
+            "label4": ("name", self.name),
+            "birthDate": ("date_of_birth", self.date_of_birth),
+            "label6": ("applicants", self.applicants),
+            "label9": ("phone", self.phone),
+            "label10": ("email", self.email),
+            "label1000": ("residence_permit", self.residence_permit),
+            "label1001": ("citizenship", self.citizenship),
+            "label1002": ("passport", self.passport),
+            "label1003": ("residential_community", self.residential_community),
+            "slabel13": ("checkbox", None),  # First consent checkbox
+            "label13": ("checkbox", None),   # Second consent checkbox
+        }
 
 
-_DYNAMIC_DEFAULTS = _generate_dynamic_defaults()
+class ApplicantProfilePool:
+    """Profiles generated ahead of time on a background thread; take() never waits for a refill."""
+
+    def __init__(self, size: int = 4):
+        self.size = size
+        self._profiles: Deque[ApplicantProfile] = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+
+    def prefill(self) -> None:
+        """Start filling the pool in the background."""
+        self._refill_async()
+
+    def take(self) -> ApplicantProfile:
+        with self._lock:
+            profile = self._profiles.popleft() if self._profiles else None
+        self._refill_async()
+        return profile or ApplicantProfile.generate()
+
+    def _refill_async(self) -> None:
+        with self._lock:
+            if self._refilling or len(self._profiles) >= self.size:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, name="applicant-profiles", daemon=True).start()
+
+    def _refill(self) -> None:
+        try:
+            while True:
+                profile = ApplicantProfile.generate()
+                with self._lock:
+                    if len(self._profiles) >= self.size:
+                        return
+                    self._profiles.append(profile)
+        finally:
+            with self._lock:
+                self._refilling = False
+
+
+_pool = ApplicantProfilePool()
+_run_profiles: Dict[Optional[str], ApplicantProfile] = {}
+_run_profiles_lock = threading.Lock()
+# Profiles of finished runs are dropped once more than this many runs are tracked
+_MAX_TRACKED_RUNS = 32
+
+
+def get_run_profile(run_id: Optional[str] = None) -> ApplicantProfile:
+    """
+    Return the applicant profile of a run (the current run by default), creating it on first use.
+
+    Outside a bound run all callers share one process-wide profile.
+    """
+    run_id = run_id or get_run_id()
+    with _run_profiles_lock:
+        profile = _run_profiles.get(run_id)
+        if profile is not None:
+            return profile
+    profile = _pool.take()
+    with _run_profiles_lock:
+        profile = _run_profiles.setdefault(run_id, profile)
+        while len(_run_profiles) > _MAX_TRACKED_RUNS:
+            del _run_profiles[next(iter(_run_profiles))]
+    return profile
+
+
+def prefill_profiles() -> None:
+    """Generate profiles for upcoming runs in the background (call before starting Chrome)."""
+    _pool.prefill()
+
 
 # URL Configuration
 BOOKING_URL = "https://konzinfobooking.mfa.gov.hu/"
 
-# Default form values
-DEFAULT_VALUES = {
-    **_DYNAMIC_DEFAULTS,
-    "citizenship": "Russian Federation",
-    "residential_community": "Novi Sad",
-    "applicants": "1",
-}
-
-# Field mapping by ID
-FIELD_MAP = {
-    "label4": ("name", DEFAULT_VALUES["name"]),
-    "birthDate": ("date_of_birth", DEFAULT_VALUES["date_of_birth"]),
-    "label6": ("applicants", DEFAULT_VALUES["applicants"]),
-    "label9": ("phone", DEFAULT_VALUES["phone"]),
-    "label10": ("email", DEFAULT_VALUES["email"]),
-    "label1000": ("residence_permit", DEFAULT_VALUES["residence_permit"]),
-    "label1001": ("citizenship", DEFAULT_VALUES["citizenship"]),
-    "label1002": ("passport", DEFAULT_VALUES["passport"]),
-    "label1003": ("residential_community", DEFAULT_VALUES["residential_community"]),
-    "slabel13": ("checkbox", None),  # First consent checkbox
-    "label13": ("checkbox", None),   # Second consent checkbox
-}
+
+def __getattr__(name):
+    # Backward compatibility: DEFAULT_VALUES and FIELD_MAP resolve to the current run's profile
+    if name == "DEFAULT_VALUES":
+        return get_run_profile().as_dict()
+    if name == "FIELD_MAP":
+        return get_run_profile().field_map()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Dropdown IDs and options
 CONSULATE_DROPDOWN_NAME = "ugyfelszolgalat"
@@ -6,10 +6,10 @@ Script to fill the booking form on konzinfobooking.mfa.gov.hu
 import sys
 import time
 import datetime
-import os
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from ...automation import (
+    ProxyConnectionError,
     check_appointment_availability,
     click_next_button,
     create_driver,
@@ -23,92 +23,253 @@ from ...automation import (
     get_ip_from_chrome,
     inspect_form_fields,
     navigate_to_booking_page,
+    quit_driver,
     select_consulate_option,
     select_visa_type_option,
+    wait_for_form_or_block,
 )
+from ...automation.form_state import refill_form
+from ...automation.page_load import BOOKING_FORM, mark_document_stale
+from ...automation.screenshots import capture_screenshot
+from ...config.settings import get_settings
 from ...notifications import send_result_notification, send_telegram_message, send_healthcheck_reloaded_page
+from ...netstate.preflight import lookup_egress_ip, record_preflight, run_preflight
+from ...netstate.proxy_pool import get_proxy_pool
+from ...netstate.resource_policy import report_run_stats
 from ...runner.cooldown import check_and_handle_cooldown, save_captcha_cooldown
-from .config import BOOKING_URL, PAGE_LOAD_WAIT
+from ...storage.artifacts import get_artifact_store
+from ...storage.events import get_event_store
+from ...telemetry import get_logger, get_run_id
+from ...telemetry.metrics import record_outcome, setup_metrics_export, time_step
+from .config import BOOKING_URL, PAGE_LOAD_WAIT, prefill_profiles
 
-# Headless mode configuration (for Docker/server environments)
-# Set HUNGARY_HEADLESS=false or HUNGARY_INTERACTIVE=true to run in visible mode for debugging
-HEADLESS_MODE = os.getenv("HUNGARY_HEADLESS", "").lower() not in ("false", "0", "no") and \
-                os.getenv("HUNGARY_INTERACTIVE", "").lower() not in ("true", "1", "yes")
+logger = get_logger(__name__)
 
+# Headless mode (for Docker/server environments) comes from get_settings().hungary_headless:
+# set HUNGARY_HEADLESS=false or HUNGARY_INTERACTIVE=true to run in visible mode for debugging
 
-def fill_and_submit_form(driver, wait, location="tel_aviv", chrome_ip=None):
-    """Fill the booking form and submit it. Returns (slots_available, special_case, diagnostic_info)."""
+# Egress IP lookups run here while Chrome navigates to the booking page
+_ip_lookups = ThreadPoolExecutor(max_workers=2, thread_name_prefix="egress-ip")
+# Seconds to wait for a background IP lookup before asking Chrome instead
+IP_LOOKUP_TIMEOUT = 10.0
+
+
+def _record_outcome(location, outcome, chrome_ip=None):
+    """Count the outcome in metrics and append it to the run history."""
+    record_outcome("hungary", location, outcome)
+    try:
+        get_event_store().record_outcome("hungary", location, outcome, ip=chrome_ip, run_id=get_run_id())
+    except Exception as e:
+        logger.warning(f"  Warning: Failed to record outcome in event store: {e}")
+
+
+def _assigned_proxy():
+    """This run's sticky proxy upstream from the pool (None without a proxy)."""
+    return get_proxy_pool().assign(get_run_id())
+
+
+def _detect_chrome_ip(driver):
+    """Return the egress IP Chrome sees, or None."""
+    try:
+        logger.info("\n[1.5/8] Detecting IP address from Chrome...")
+        with time_step("hungary", "detect_ip"):
+            chrome_ip = get_ip_from_chrome(driver)
+        if chrome_ip:
+            logger.info(f"✓ IP detected: {chrome_ip}")
+        else:
+            logger.warning("  Warning: Could not detect IP from Chrome")
+        return chrome_ip
+    except Exception as e:
+        logger.warning(f"  Warning: Failed to get IP from Chrome: {e}")
+        return None
+
+
+def _start_ip_lookup(upstream=None):
+    """Look up the egress IP through the driver's upstream in the background; returns a future."""
+    return _ip_lookups.submit(lookup_egress_ip, upstream.url if upstream else None, IP_LOOKUP_TIMEOUT)
+
+
+def _resolve_chrome_ip(ip_lookup, driver):
+    """Result of a background IP lookup; falls back to asking Chrome when it failed."""
+    logger.info("\n[1.5/8] Detecting IP address...")
+    with time_step("hungary", "detect_ip"):
+        try:
+            chrome_ip = ip_lookup.result(timeout=IP_LOOKUP_TIMEOUT) if ip_lookup else None
+        except Exception:
+            chrome_ip = None
+    if chrome_ip:
+        logger.info(f"✓ IP detected: {chrome_ip}")
+        return chrome_ip
+    return _detect_chrome_ip(driver)
+
+
+def _navigate_with_failover(driver, ip_lookup=None):
+    """
+    Navigate to the booking page, moving the run to another proxy upstream on connection errors.
+
+    Each failover quits the current driver and starts a new one through the
+    next pool upstream. Returns (driver, wait, ip_lookup) because both the
+    driver and the egress IP change after a failover; ip_lookup is the
+    background lookup for the driver returned (see _start_ip_lookup).
+    """
+    pool = get_proxy_pool()
+    session_id = get_run_id()
+    tried = set()
+    while True:
+        try:
+            with time_step("hungary", "navigate"):
+                wait = navigate_to_booking_page(driver)
+        except ProxyConnectionError as e:
+            current = pool.current(session_id)
+            if current:
+                tried.add(current.server)
+            upstream = pool.failover(session_id, str(e), exclude=tried) if len(pool) > 1 else None
+            if upstream is None:
+                raise
+            logger.warning(f"  Proxy upstream unreachable, failing over to {upstream.name}...")
+            try:
+                quit_driver(driver)
+            except Exception:
+                pass
+            driver = None
+            with time_step("hungary", "create_driver"):
+                driver = create_driver(headless=get_settings().hungary_headless, proxy=upstream)
+            ip_lookup = _start_ip_lookup(upstream)
+            continue
+        pool.report_success(pool.current(session_id))
+        return driver, wait, ip_lookup
+
+
+def _recycle_if_flagged(driver, chrome_ip=None):
+    """
+    Replace a driver the Chrome watchdog flagged (memory or age limit) with a fresh one.
+
+    Returns (driver, chrome_ip, recycled); a new driver is already on the booking page.
+    """
+    watch = getattr(driver, "chrome_watch", None)
+    if not watch or not watch.recycle_requested:
+        return driver, chrome_ip, False
+    logger.info(f"\n[Retry] Recycling Chrome ({watch.recycle_reason} limit reached)...")
+    try:
+        quit_driver(driver)
+    except Exception:
+        pass
+    driver = None
+    upstream = _assigned_proxy()
+    with time_step("hungary", "create_driver"):
+        driver = create_driver(headless=get_settings().hungary_headless, proxy=upstream)
+    driver, _, ip_lookup = _navigate_with_failover(driver, _start_ip_lookup(upstream))
+    return driver, _resolve_chrome_ip(ip_lookup, driver), True
+
+
+def _preflight_or_exit(location):
+    """
+    Probe DNS/connect/TLS/TTFB to the booking host before paying for a Chrome start.
+
+    Exits with code 3 if the host is unreachable, which makes run_script.sh
+    rotate to another VPN exit.
+    """
+    if not get_settings().preflight:
+        return
+    logger.info("\n[0/8] Pre-flight check of the booking site...")
+    with time_step("hungary", "preflight"):
+        proxy = _assigned_proxy()
+        results = run_preflight([BOOKING_URL], proxy=proxy.url if proxy else None)
+    try:
+        record_preflight(results, run_id=get_run_id())
+    except Exception as e:
+        logger.warning(f"  Warning: Failed to record pre-flight results: {e}")
+    result = results[0]
+    if result.ok:
+        logger.info(f"✓ {result.summary()}")
+        return
+    logger.error(f"✗ {result.summary()}")
+    _record_outcome(location, "unreachable")
+    logger.info("  Exit code 3 will trigger VPN rotation and retry.")
+    sys.exit(3)  # Booking site unreachable from this exit - triggers VPN rotation
+
+
+def _outcome_name(slots_available, special_case):
+    """Map a (slots_available, special_case) result to its metrics outcome label."""
+    if special_case == "captcha_required":
+        return "captcha"
+    if special_case:
+        return special_case
+    return "slots" if slots_available else "busy"
+
+
+def _fill_form(driver, wait, location):
+    """Fill every control of the booking form; returns the number of fields filled."""
     # Inspect form fields
-    print("\n[3/8] Inspecting form fields...")
-    sys.stdout.flush()
+    logger.info("\n[3/8] Inspecting form fields...")
     inputs, selects, textareas = inspect_form_fields(driver)
-    print("✓ Form fields inspected")
-    sys.stdout.flush()
+    logger.info("✓ Form fields inspected")
 
-    print("\n[4/8] Starting form filling...")
-    sys.stdout.flush()
+    logger.info("\n[4/8] Starting form filling...")
     
     # Step 1: Select consulate option (Serbia - Subotica or Serbia - Belgrade)
     location_display = location.capitalize()
-    print(f"  → Selecting consulate ({location_display})...")
-    sys.stdout.flush()
+    logger.info(f"  → Selecting consulate ({location_display})...")
     select_consulate_option(driver, location=location)
     
     # Step 2: Select visa type option
-    print("  → Selecting visa type...")
-    sys.stdout.flush()
+    logger.info("  → Selecting visa type...")
     select_visa_type_option(driver, location=location)
     
     # Fill standard HTML select dropdowns
-    print("  → Filling select dropdowns...")
-    sys.stdout.flush()
+    logger.info("  → Filling select dropdowns...")
     fill_select_dropdowns(driver, selects)
     
     # Fill form fields with default data
     filled_count = 0
     
     # Fill re-enter email field (special handling)
-    print("  → Filling email field...")
-    sys.stdout.flush()
+    logger.info("  → Filling email field...")
     filled_count += fill_reenter_email_field(driver)
     
     # Fill fields by field map
-    print("  → Filling mapped fields...")
-    sys.stdout.flush()
+    logger.info("  → Filling mapped fields...")
     filled_count += fill_fields_by_map(driver)
     
     # Fill any remaining fields
-    print("  → Filling remaining fields...")
-    sys.stdout.flush()
+    logger.info("  → Filling remaining fields...")
     filled_count += fill_remaining_fields(driver, inputs)
     
     # Fill textareas
-    print("  → Filling textareas...")
-    sys.stdout.flush()
+    logger.info("  → Filling textareas...")
     filled_count += fill_textareas(driver, textareas, wait)
+    return filled_count
+
+
+def fill_and_submit_form(driver, wait, location="tel_aviv", chrome_ip=None, refill=False):
+    """Fill the booking form and submit it. Returns (slots_available, special_case, diagnostic_info).
+    
+    With refill=True (a retry after reloading the page) only the controls the
+    reload lost or changed are filled again (automation.form_state).
+    """
+    if refill:
+        logger.info("\n[3/8] Reading form state after reload...")
+        filled_count = refill_form(driver, wait, location=location)
+    else:
+        filled_count = _fill_form(driver, wait, location)
 
-    print(f"\n[5/8] Summary: Filled {filled_count} field(s)")
-    sys.stdout.flush()
+    logger.info(f"\n[5/8] Summary: Filled {filled_count} field(s)")
     
     # If nothing was filled, return early with special case
     if filled_count == 0:
-        print("  ⚠️  No fields were filled - will trigger retry")
-        sys.stdout.flush()
+        logger.warning("  ⚠️  No fields were filled - will trigger retry")
         return None, "no_fields_filled", {"filled_count": 0}
     
     # Click the next button
-    print("\n[6/8] Clicking next button...")
-    sys.stdout.flush()
+    logger.info("\n[6/8] Clicking next button...")
     slots_available = None
     special_case = None
     diagnostic_info = {}
     
     if click_next_button(driver):
-        print("✓ Next button clicked")
-        sys.stdout.flush()
+        logger.info("✓ Next button clicked")
         # Check for appointment availability
-        print("\n[7/8] Checking appointment availability...")
-        sys.stdout.flush()
+        logger.info("\n[7/8] Checking appointment availability...")
         result = check_appointment_availability(driver, location=location, chrome_ip=chrome_ip)
         
         # Handle tuple return (slots_available, special_case, diagnostic_info) or boolean for backward compatibility
@@ -127,12 +288,11 @@ def fill_and_submit_form(driver, wait, location="tel_aviv", chrome_ip=None):
             special_case = None
             diagnostic_info = {}
     else:
-        print("  Next button not found or not clickable")
-        sys.stdout.flush()
-        blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip)
+        logger.info("  Next button not found or not clickable")
+        blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip, location=location)
         if blocked_ip:
-            print("  🚫 IP blocked detected after failing to find next button.")
-            print("  Details saved to logs/blocked_ips.log")
+            logger.info("  🚫 IP blocked detected after failing to find next button.")
+            logger.info("  Details saved to logs/blocked_ips.log")
             special_case = "ip_blocked"
     
     return slots_available, special_case, diagnostic_info
@@ -145,67 +305,54 @@ def fill_booking_form(location="tel_aviv"):
         location: Either 'subotica', 'belgrade', or 'tel_aviv' to select the appropriate consulate
     """
     location_display = location.capitalize()
-    print("=" * 60)
-    print(f"Starting embassy-eye (Hungary - {location_display}) at {datetime.datetime.now()}")
-    print("=" * 60)
-    sys.stdout.flush()
+    logger.info("=" * 60)
+    logger.info(f"Starting embassy-eye (Hungary - {location_display}) at {datetime.datetime.now()}")
+    logger.info("=" * 60)
+    
+    setup_metrics_export()
     
     # Check for captcha cooldown
     should_skip, cooldown_message = check_and_handle_cooldown()
     if should_skip:
-        print(f"\n⏸️  {cooldown_message}")
-        print("=" * 60)
-        sys.stdout.flush()
+        logger.info(f"\n⏸️  {cooldown_message}")
+        logger.info("=" * 60)
         return
     elif cooldown_message:
-        print(f"\nℹ️  {cooldown_message}")
-        sys.stdout.flush()
+        logger.info(f"\nℹ️  {cooldown_message}")
+    
+    _preflight_or_exit(location)
     
     # Initialize Chrome driver
-    print("\n[1/8] Initializing Chrome driver...")
-    if not HEADLESS_MODE:
-        print("  Running in INTERACTIVE mode (browser will be visible)")
-    sys.stdout.flush()  # Force output to appear immediately
+    logger.info("\n[1/8] Initializing Chrome driver...")
+    if not get_settings().hungary_headless:
+        logger.info("  Running in INTERACTIVE mode (browser will be visible)")
     
+    # The egress IP (to track which IP is actually being used) is looked up
+    # through the same upstream while Chrome starts and loads the page
+    upstream = _assigned_proxy()
+    ip_lookup = _start_ip_lookup(upstream)
     try:
-        driver = create_driver(headless=HEADLESS_MODE)
-        print("✓ Chrome driver initialized successfully")
-        sys.stdout.flush()
+        with time_step("hungary", "create_driver"):
+            driver = create_driver(headless=get_settings().hungary_headless, proxy=upstream)
+        logger.info("✓ Chrome driver initialized successfully")
     except Exception as e:
-        print(f"✗ Failed to initialize Chrome driver: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.stdout.flush()
+        logger.error(f"✗ Failed to initialize Chrome driver: {e}", exc_info=True)
         return
     
-    # Get IP address from Chrome (to track which IP is actually being used)
     chrome_ip = None
-    try:
-        print("\n[1.5/8] Detecting IP address from Chrome...")
-        sys.stdout.flush()
-        chrome_ip = get_ip_from_chrome(driver)
-        if chrome_ip:
-            print(f"✓ IP detected: {chrome_ip}")
-        else:
-            print("  Warning: Could not detect IP from Chrome")
-        sys.stdout.flush()
-    except Exception as e:
-        print(f"  Warning: Failed to get IP from Chrome: {e}")
-        sys.stdout.flush()
-    
     try:
         # Navigate to the booking page
-        print("\n[2/8] Navigating to booking page...")
-        sys.stdout.flush()
-        wait = navigate_to_booking_page(driver)
-        print("✓ Page loaded")
-        sys.stdout.flush()
+        logger.info("\n[2/8] Navigating to booking page...")
+        driver, wait, ip_lookup = _navigate_with_failover(driver, ip_lookup)
+        logger.info("✓ Page loaded")
+        chrome_ip = _resolve_chrome_ip(ip_lookup, driver)
 
         # Immediately check if access is blocked by IP
-        blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip)
+        blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip, location=location)
         if blocked_ip:
-            print("  Detected blocked IP right after page load. Aborting run.")
-            print("  Exit code 2 will trigger VPN IP rotation and retry.")
+            _record_outcome(location, "ip_blocked", chrome_ip)
+            logger.info("  Detected blocked IP right after page load. Aborting run.")
+            logger.info("  Exit code 2 will trigger VPN IP rotation and retry.")
             sys.exit(2)  # Special exit code for IP blocked - triggers VPN rotation
         
         # Try form filling and submission (with retry logic)
@@ -215,18 +362,23 @@ def fill_booking_form(location="tel_aviv"):
         special_case = None
         diagnostic_info = {}
         
+        refill = False
         while attempt <= max_attempts:
             if attempt > 1:
-                print(f"\n{'='*60}")
-                print(f"Retry attempt {attempt}/{max_attempts}: Reloading page and filling form again...")
-                print(f"{'='*60}")
-                sys.stdout.flush()
+                logger.info(f"\n{'='*60}")
+                logger.info(f"Retry attempt {attempt}/{max_attempts}: Reloading page and filling form again...")
+                logger.info(f"{'='*60}")
                 
-                # Reload the page
-                print("\n[Retry] Reloading page...")
-                sys.stdout.flush()
-                driver.refresh()
-                time.sleep(3)  # Wait for page to reload
+                # Reload the page (in a fresh browser if the Chrome watchdog flagged this one)
+                driver, chrome_ip, recycled = _recycle_if_flagged(driver, chrome_ip)
+                refill = not recycled
+                if not recycled:
+                    logger.info("\n[Retry] Reloading page...")
+                    mark_document_stale(driver)
+                    driver.refresh()
+                    # A block page shows up from DOMContentLoaded; otherwise wait for the form to render
+                    if not wait_for_form_or_block(driver, PAGE_LOAD_WAIT):
+                        BOOKING_FORM.settle()
                 
                 # Send healthcheck notification for reloaded page
                 reason = None
@@ -241,19 +393,22 @@ def fill_booking_form(location="tel_aviv"):
                 wait = WebDriverWait(driver, PAGE_LOAD_WAIT)
                 
                 # Check if IP is blocked after reload
-                blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip)
+                blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip, location=location)
                 if blocked_ip:
-                    print("  Detected blocked IP after page reload. Aborting run.")
-                    print("  Exit code 2 will trigger VPN IP rotation and retry.")
+                    _record_outcome(location, "ip_blocked", chrome_ip)
+                    logger.info("  Detected blocked IP after page reload. Aborting run.")
+                    logger.info("  Exit code 2 will trigger VPN IP rotation and retry.")
                     sys.exit(2)  # Special exit code for IP blocked - triggers VPN rotation
             
             # Fill and submit the form
-            slots_available, special_case, diagnostic_info = fill_and_submit_form(driver, wait, location=location, chrome_ip=chrome_ip)
+            with time_step("hungary", "fill_and_submit"):
+                slots_available, special_case, diagnostic_info = fill_and_submit_form(driver, wait, location=location, chrome_ip=chrome_ip, refill=refill)
             
             # Check if IP was blocked during form submission
             if special_case == "ip_blocked":
-                print("  🚫 IP blocked detected during form submission.")
-                print("  Exit code 2 will trigger VPN IP rotation and retry.")
+                _record_outcome(location, "ip_blocked", chrome_ip)
+                logger.info("  🚫 IP blocked detected during form submission.")
+                logger.info("  Exit code 2 will trigger VPN IP rotation and retry.")
                 sys.exit(2)  # Special exit code for IP blocked - triggers VPN rotation
             
             # Check if we should retry
@@ -262,13 +417,12 @@ def fill_booking_form(location="tel_aviv"):
             if attempt < max_attempts:
                 if special_case == "no_fields_filled":
                     should_retry = True
-                    print(f"\n⚠️  No fields were filled. Will retry once by reloading page...")
+                    logger.warning(f"\n⚠️  No fields were filled. Will retry once by reloading page...")
                 elif slots_available and special_case is None and not diagnostic_info.get('modal_found', False):
                     should_retry = True
-                    print(f"\n⚠️  Slots detected but no modal found. Will retry once by reloading page...")
+                    logger.warning(f"\n⚠️  Slots detected but no modal found. Will retry once by reloading page...")
             
             if should_retry:
-                sys.stdout.flush()
                 attempt += 1
                 continue
             else:
@@ -276,25 +430,25 @@ def fill_booking_form(location="tel_aviv"):
                 break
         
         # Process the result
+        _record_outcome(location, _outcome_name(slots_available, special_case), chrome_ip)
         if special_case == "ip_blocked":
-            print("  🚫 IP blocked detected. Please switch network.")
-            print("  Details saved to logs/blocked_ips.log")
+            logger.info("  🚫 IP blocked detected. Please switch network.")
+            logger.info("  Details saved to logs/blocked_ips.log")
         elif special_case == "no_fields_filled":
-            print("  ⚠️  No fields were filled after retry. Ending Hungary scraping for this run.")
-            sys.stdout.flush()
+            logger.warning("  ⚠️  No fields were filled after retry. Ending Hungary scraping for this run.")
         elif slots_available:
-            print("\n[8/8] Sending notification...")
-            sys.stdout.flush()
+            logger.info("\n[8/8] Sending notification...")
             
             # Save HTML only if it's not a captcha or email verification case
             if special_case not in ("captcha_required", "email_verification"):
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                html_path = Path("screenshots") / f"slots_found_{timestamp}.html"
+                html_path = get_settings().artifact_dir
                 try:
-                    html_path.parent.mkdir(parents=True, exist_ok=True)
-                    with html_path.open("w", encoding="utf-8") as f:
-                        f.write(driver.page_source)
-                    print(f"  Saved page HTML to {html_path}")
+                    artifact = get_artifact_store().put(
+                        driver.page_source, "slots_html", reason=f"slots found ({location})",
+                        url=diagnostic_info.get('url'), run_id=get_run_id(),
+                    )
+                    html_path = artifact.path
+                    logger.info(f"  Saved page HTML to {html_path}" + (" (same as an earlier snapshot)" if artifact.deduplicated else ""))
                     
                     # Build diagnostic message
                     diag_msg_parts = [
@@ -340,179 +494,169 @@ def fill_booking_form(location="tel_aviv"):
                     send_telegram_message(diag_message)
                 except PermissionError as html_err:
                     error_msg = f"❌ Failed to save HTML: Permission denied\n\nFile: {html_path}\nError: {html_err}\n\nThis is not critical, script continues..."
-                    print(f"  Warning: Permission denied saving page HTML: {html_err}")
-                    print("  This is not critical, continuing...")
+                    logger.warning(f"  Warning: Permission denied saving page HTML: {html_err}")
+                    logger.info("  This is not critical, continuing...")
                     send_telegram_message(error_msg)
                 except Exception as html_err:
                     error_msg = f"❌ Failed to save HTML\n\nFile: {html_path}\nError: {html_err}\n\nThis is not critical, script continues..."
-                    print(f"  Warning: Failed to save page HTML: {html_err}")
-                    print("  This is not critical, continuing...")
+                    logger.warning(f"  Warning: Failed to save page HTML: {html_err}")
+                    logger.info("  This is not critical, continuing...")
                     send_telegram_message(error_msg)
             else:
                 case_name = "captcha" if special_case == "captcha_required" else "email verification"
-                print(f"  Skipping HTML save ({case_name} case)")
+                logger.info(f"  Skipping HTML save ({case_name} case)")
             
             if special_case in ("captcha_required", "email_verification"):
                 # Send notification without screenshot for special cases
                 send_result_notification(slots_available, None, special_case=special_case, booking_url=BOOKING_URL, location=location, chrome_ip=chrome_ip)
                 case_name = "captcha required" if special_case == "captcha_required" else "email verification"
-                print(f"✓ Notification sent (no screenshot - {case_name} required)")
+                logger.info(f"✓ Notification sent (no screenshot - {case_name} required)")
                 
                 # Save cooldown if captcha is required
                 if special_case == "captcha_required":
                     save_captcha_cooldown()
             else:
-                print("  Capturing full page screenshot...")
-                sys.stdout.flush()
-                screenshot_bytes = get_full_page_screenshot(driver)
-                send_result_notification(slots_available, screenshot_bytes, special_case=None, booking_url=BOOKING_URL, location=location, chrome_ip=chrome_ip)
-                print("✓ Notification sent")
+                logger.info("  Capturing screenshot...")
+                with time_step("hungary", "screenshot"):
+                    screenshot = capture_screenshot(driver)
+                if screenshot:
+                    send_result_notification(slots_available, screenshot.data, special_case=None, booking_url=BOOKING_URL, location=location, chrome_ip=chrome_ip, image_format=screenshot.image_format)
+                else:
+                    send_result_notification(slots_available, get_full_page_screenshot(driver), special_case=None, booking_url=BOOKING_URL, location=location, chrome_ip=chrome_ip)
+                logger.info("✓ Notification sent")
         else:
-            print("  No slots available")
-        sys.stdout.flush()
+            logger.info("  No slots available")
         
         # Keep browser open for inspection (only if not headless)
-        if not HEADLESS_MODE:
-            print("\n[Debug] Browser will remain open for 60 seconds for inspection...")
-            print("  Press Ctrl+C to close early, or wait for automatic close.")
-            sys.stdout.flush()
+        if not get_settings().hungary_headless:
+            logger.info("\n[Debug] Browser will remain open for 60 seconds for inspection...")
+            logger.info("  Press Ctrl+C to close early, or wait for automatic close.")
             time.sleep(60)  # Keep browser open for 60 seconds in interactive mode
         # Since we're in headless mode, skip the inspection delay
         
     except Exception as e:
-        print(f"\n✗ Error occurred: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.stdout.flush()
+        logger.error(f"\n✗ Error occurred: {e}", exc_info=True)
+        _record_outcome(location, "error", chrome_ip)
     finally:
-        print("\n[Cleanup] Closing browser...")
-        sys.stdout.flush()
-        try:
-            driver.quit()
-            print("✓ Browser closed")
-        except Exception as e:
-            print(f"  Warning: Error closing browser: {e}")
-        sys.stdout.flush()
-        print("=" * 60)
-        print(f"Finished at {datetime.datetime.now()}")
-        print("=" * 60)
-        sys.stdout.flush()
+        if driver is not None:
+            logger.info("\n[Cleanup] Closing browser...")
+            try:
+                quit_driver(driver)
+                logger.info("✓ Browser closing in the background")
+            except Exception as e:
+                logger.warning(f"  Warning: Error closing browser: {e}")
+        report_run_stats("hungary", location)
+        get_proxy_pool().release(get_run_id())
+        logger.info("=" * 60)
+        logger.info(f"Finished at {datetime.datetime.now()}")
+        logger.info("=" * 60)
 
 
 def fill_booking_form_both_locations():
     """Fill booking forms for both Subotica and Belgrade in sequence, reloading browser between."""
-    print("=" * 60)
-    print(f"Starting embassy-eye (Hungary - Both Locations) at {datetime.datetime.now()}")
-    print("=" * 60)
-    sys.stdout.flush()
+    logger.info("=" * 60)
+    logger.info(f"Starting embassy-eye (Hungary - Both Locations) at {datetime.datetime.now()}")
+    logger.info("=" * 60)
+    
+    setup_metrics_export()
     
     # Check for captcha cooldown
     should_skip, cooldown_message = check_and_handle_cooldown()
     if should_skip:
-        print(f"\n⏸️  {cooldown_message}")
-        print("=" * 60)
-        sys.stdout.flush()
+        logger.info(f"\n⏸️  {cooldown_message}")
+        logger.info("=" * 60)
         return
     elif cooldown_message:
-        print(f"\nℹ️  {cooldown_message}")
-        sys.stdout.flush()
+        logger.info(f"\nℹ️  {cooldown_message}")
+    
+    _preflight_or_exit("both")
     
     # Initialize Chrome driver
-    print("\n[1/8] Initializing Chrome driver...")
-    if not HEADLESS_MODE:
-        print("  Running in INTERACTIVE mode (browser will be visible)")
-    sys.stdout.flush()
+    logger.info("\n[1/8] Initializing Chrome driver...")
+    if not get_settings().hungary_headless:
+        logger.info("  Running in INTERACTIVE mode (browser will be visible)")
     
+    # The egress IP is looked up through the same upstream while Chrome starts and loads the page
+    upstream = _assigned_proxy()
+    ip_lookup = _start_ip_lookup(upstream)
     try:
-        driver = create_driver(headless=HEADLESS_MODE)
-        print("✓ Chrome driver initialized successfully")
-        sys.stdout.flush()
+        with time_step("hungary", "create_driver"):
+            driver = create_driver(headless=get_settings().hungary_headless, proxy=upstream)
+        logger.info("✓ Chrome driver initialized successfully")
     except Exception as e:
-        print(f"✗ Failed to initialize Chrome driver: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.stdout.flush()
+        logger.error(f"✗ Failed to initialize Chrome driver: {e}", exc_info=True)
         return
     
-    # Get IP address from Chrome (to track which IP is actually being used)
     chrome_ip = None
-    try:
-        print("\n[1.5/8] Detecting IP address from Chrome...")
-        sys.stdout.flush()
-        chrome_ip = get_ip_from_chrome(driver)
-        if chrome_ip:
-            print(f"✓ IP detected: {chrome_ip}")
-        else:
-            print("  Warning: Could not detect IP from Chrome")
-        sys.stdout.flush()
-    except Exception as e:
-        print(f"  Warning: Failed to get IP from Chrome: {e}")
-        sys.stdout.flush()
-    
     try:
         # Run Subotica first
-        print("\n" + "=" * 60)
-        print("CHECKING SUBOTICA")
-        print("=" * 60)
-        _run_location_check(driver, "subotica", chrome_ip)
+        logger.info("\n" + "=" * 60)
+        logger.info("CHECKING SUBOTICA")
+        logger.info("=" * 60)
+        driver, chrome_ip = _run_location_check(driver, "subotica", ip_lookup)
         
         # Reload browser for Belgrade check
-        print("\n" + "=" * 60)
-        print("Reloading browser for Belgrade check...")
-        print("=" * 60)
-        driver.quit()
-        time.sleep(2)
+        logger.info("\n" + "=" * 60)
+        logger.info("Reloading browser for Belgrade check...")
+        logger.info("=" * 60)
+        # Subotica's browser shuts down in the background while Belgrade's starts
+        quit_driver(driver)
+        driver = None
         
         # Reinitialize driver for Belgrade
-        print("\n[1/8] Reinitializing Chrome driver for Belgrade...")
-        sys.stdout.flush()
-        driver = create_driver(headless=HEADLESS_MODE)
-        print("✓ Chrome driver reinitialized successfully")
-        sys.stdout.flush()
+        logger.info("\n[1/8] Reinitializing Chrome driver for Belgrade...")
+        upstream = _assigned_proxy()
+        ip_lookup = _start_ip_lookup(upstream)
+        with time_step("hungary", "create_driver"):
+            driver = create_driver(headless=get_settings().hungary_headless, proxy=upstream)
+        logger.info("✓ Chrome driver reinitialized successfully")
         
         # Run Belgrade
-        print("\n" + "=" * 60)
-        print("CHECKING BELGRADE")
-        print("=" * 60)
-        _run_location_check(driver, "belgrade", chrome_ip)
+        logger.info("\n" + "=" * 60)
+        logger.info("CHECKING BELGRADE")
+        logger.info("=" * 60)
+        driver, chrome_ip = _run_location_check(driver, "belgrade", ip_lookup)
         
     except Exception as e:
-        print(f"\n✗ Error occurred: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.stdout.flush()
+        logger.error(f"\n✗ Error occurred: {e}", exc_info=True)
+        _record_outcome("both", "error", chrome_ip)
     finally:
-        print("\n[Cleanup] Closing browser...")
-        sys.stdout.flush()
-        try:
-            driver.quit()
-            print("✓ Browser closed")
-        except Exception as e:
-            print(f"  Warning: Error closing browser: {e}")
-        sys.stdout.flush()
-        print("=" * 60)
-        print(f"Finished checking both locations at {datetime.datetime.now()}")
-        print("=" * 60)
-        sys.stdout.flush()
-
-
-def _run_location_check(driver, location, chrome_ip=None):
-    """Helper function to run a single location check."""
+        if driver is not None:
+            logger.info("\n[Cleanup] Closing browser...")
+            try:
+                quit_driver(driver)
+                logger.info("✓ Browser closing in the background")
+            except Exception as e:
+                logger.warning(f"  Warning: Error closing browser: {e}")
+        report_run_stats("hungary", "both")
+        get_proxy_pool().release(get_run_id())
+        logger.info("=" * 60)
+        logger.info(f"Finished checking both locations at {datetime.datetime.now()}")
+        logger.info("=" * 60)
+
+
+def _run_location_check(driver, location, ip_lookup=None):
+    """Helper function to run a single location check.
+    
+    Returns (driver, chrome_ip): the driver in use afterwards (a proxy
+    failover replaces it) and the egress IP from ip_lookup.
+    """
     location_display = location.capitalize()
+    chrome_ip = None
     
     try:
         # Navigate to the booking page
-        print("\n[2/8] Navigating to booking page...")
-        sys.stdout.flush()
-        wait = navigate_to_booking_page(driver)
-        print("✓ Page loaded")
-        sys.stdout.flush()
+        logger.info("\n[2/8] Navigating to booking page...")
+        driver, wait, ip_lookup = _navigate_with_failover(driver, ip_lookup)
+        logger.info("✓ Page loaded")
+        chrome_ip = _resolve_chrome_ip(ip_lookup, driver)
 
         # Immediately check if access is blocked by IP
-        blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip)
+        blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip, location=location)
         if blocked_ip:
-            print("  Detected blocked IP right after page load. Aborting run.")
-            print("  Exit code 2 will trigger VPN IP rotation and retry.")
+            _record_outcome(location, "ip_blocked", chrome_ip)
+            logger.info("  Detected blocked IP right after page load. Aborting run.")
+            logger.info("  Exit code 2 will trigger VPN IP rotation and retry.")
             sys.exit(2)  # Special exit code for IP blocked - triggers VPN rotation
         
         # Try form filling and submission (with retry logic)
@@ -522,18 +666,23 @@ def _run_location_check(driver, location, chrome_ip=None):
         special_case = None
         diagnostic_info = {}
         
+        refill = False
         while attempt <= max_attempts:
             if attempt > 1:
-                print(f"\n{'='*60}")
-                print(f"Retry attempt {attempt}/{max_attempts}: Reloading page and filling form again...")
-                print(f"{'='*60}")
-                sys.stdout.flush()
+                logger.info(f"\n{'='*60}")
+                logger.info(f"Retry attempt {attempt}/{max_attempts}: Reloading page and filling form again...")
+                logger.info(f"{'='*60}")
                 
-                # Reload the page
-                print("\n[Retry] Reloading page...")
-                sys.stdout.flush()
-                driver.refresh()
-                time.sleep(3)  # Wait for page to reload
+                # Reload the page (in a fresh browser if the Chrome watchdog flagged this one)
+                driver, chrome_ip, recycled = _recycle_if_flagged(driver, chrome_ip)
+                refill = not recycled
+                if not recycled:
+                    logger.info("\n[Retry] Reloading page...")
+                    mark_document_stale(driver)
+                    driver.refresh()
+                    # A block page shows up from DOMContentLoaded; otherwise wait for the form to render
+                    if not wait_for_form_or_block(driver, PAGE_LOAD_WAIT):
+                        BOOKING_FORM.settle()
                 
                 # Send healthcheck notification for reloaded page
                 reason = None
@@ -548,19 +697,22 @@ def _run_location_check(driver, location, chrome_ip=None):
                 wait = WebDriverWait(driver, PAGE_LOAD_WAIT)
                 
                 # Check if IP is blocked after reload
-                blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip)
+                blocked_ip = detect_blocked_ip(driver, chrome_ip=chrome_ip, location=location)
                 if blocked_ip:
-                    print("  Detected blocked IP after page reload. Aborting run.")
-                    print("  Exit code 2 will trigger VPN IP rotation and retry.")
+                    _record_outcome(location, "ip_blocked", chrome_ip)
+                    logger.info("  Detected blocked IP after page reload. Aborting run.")
+                    logger.info("  Exit code 2 will trigger VPN IP rotation and retry.")
                     sys.exit(2)  # Special exit code for IP blocked - triggers VPN rotation
             
             # Fill and submit the form
-            slots_available, special_case, diagnostic_info = fill_and_submit_form(driver, wait, location=location, chrome_ip=chrome_ip)
+            with time_step("hungary", "fill_and_submit"):
+                slots_available, special_case, diagnostic_info = fill_and_submit_form(driver, wait, location=location, chrome_ip=chrome_ip, refill=refill)
             
             # Check if IP was blocked during form submission
             if special_case == "ip_blocked":
-                print("  🚫 IP blocked detected during form submission.")
-                print("  Exit code 2 will trigger VPN IP rotation and retry.")
+                _record_outcome(location, "ip_blocked", chrome_ip)
+                logger.info("  🚫 IP blocked detected during form submission.")
+                logger.info("  Exit code 2 will trigger VPN IP rotation and retry.")
                 sys.exit(2)  # Special exit code for IP blocked - triggers VPN rotation
             
             # Check if we should retry
@@ -569,13 +721,12 @@ def _run_location_check(driver, location, chrome_ip=None):
             if attempt < max_attempts:
                 if special_case == "no_fields_filled":
                     should_retry = True
-                    print(f"\n⚠️  No fields were filled. Will retry once by reloading page...")
+                    logger.warning(f"\n⚠️  No fields were filled. Will retry once by reloading page...")
                 elif slots_available and special_case is None and not diagnostic_info.get('modal_found', False):
                     should_retry = True
-                    print(f"\n⚠️  Slots detected but no modal found. Will retry once by reloading page...")
+                    logger.warning(f"\n⚠️  Slots detected but no modal found. Will retry once by reloading page...")
             
             if should_retry:
-                sys.stdout.flush()
                 attempt += 1
                 continue
             else:
@@ -583,25 +734,25 @@ def _run_location_check(driver, location, chrome_ip=None):
                 break
         
         # Process the result
+        _record_outcome(location, _outcome_name(slots_available, special_case), chrome_ip)
         if special_case == "ip_blocked":
-            print("  🚫 IP blocked detected. Please switch network.")
-            print("  Details saved to logs/blocked_ips.log")
+            logger.info("  🚫 IP blocked detected. Please switch network.")
+            logger.info("  Details saved to logs/blocked_ips.log")
         elif special_case == "no_fields_filled":
-            print(f"  ⚠️  No fields were filled after retry. Ending {location_display} scraping for this run.")
-            sys.stdout.flush()
+            logger.warning(f"  ⚠️  No fields were filled after retry. Ending {location_display} scraping for this run.")
         elif slots_available:
-            print("\n[8/8] Sending notification...")
-            sys.stdout.flush()
+            logger.info("\n[8/8] Sending notification...")
             
             # Save HTML only if it's not a captcha or email verification case
             if special_case not in ("captcha_required", "email_verification"):
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                html_path = Path("screenshots") / f"slots_found_{location}_{timestamp}.html"
+                html_path = get_settings().artifact_dir
                 try:
-                    html_path.parent.mkdir(parents=True, exist_ok=True)
-                    with html_path.open("w", encoding="utf-8") as f:
-                        f.write(driver.page_source)
-                    print(f"  Saved page HTML to {html_path}")
+                    artifact = get_artifact_store().put(
+                        driver.page_source, "slots_html", reason=f"slots found ({location})",
+                        url=diagnostic_info.get('url'), run_id=get_run_id(),
+                    )
+                    html_path = artifact.path
+                    logger.info(f"  Saved page HTML to {html_path}" + (" (same as an earlier snapshot)" if artifact.deduplicated else ""))
                     
                     # Build diagnostic message
                     diag_msg_parts = [
@@ -648,41 +799,51 @@ def _run_location_check(driver, location, chrome_ip=None):
                     send_telegram_message(diag_message)
                 except PermissionError as html_err:
                     error_msg = f"❌ Failed to save HTML: Permission denied\n\nFile: {html_path}\nError: {html_err}\n\nThis is not critical, script continues..."
-                    print(f"  Warning: Permission denied saving page HTML: {html_err}")
-                    print("  This is not critical, continuing...")
+                    logger.warning(f"  Warning: Permission denied saving page HTML: {html_err}")
+                    logger.info("  This is not critical, continuing...")
                     send_telegram_message(error_msg)
                 except Exception as html_err:
                     error_msg = f"❌ Failed to save HTML\n\nFile: {html_path}\nError: {html_err}\n\nThis is not critical, script continues..."
-                    print(f"  Warning: Failed to save page HTML: {html_err}")
-                    print("  This is not critical, continuing...")
+                    logger.warning(f"  Warning: Failed to save page HTML: {html_err}")
+                    logger.info("  This is not critical, continuing...")
                     send_telegram_message(error_msg)
             else:
                 case_name = "captcha" if special_case == "captcha_required" else "email verification"
-                print(f"  Skipping HTML save ({case_name} case)")
+                logger.info(f"  Skipping HTML save ({case_name} case)")
             
             if special_case in ("captcha_required", "email_verification"):
                 # Send notification without screenshot for special cases
                 send_result_notification(slots_available, None, special_case=special_case, booking_url=BOOKING_URL, location=location, chrome_ip=chrome_ip)
                 case_name = "captcha required" if special_case == "captcha_required" else "email verification"
-                print(f"✓ Notification sent (no screenshot - {case_name} required)")
+                logger.info(f"✓ Notification sent (no screenshot - {case_name} required)")
                 
                 # Save cooldown if captcha is required
                 if special_case == "captcha_required":
                     save_captcha_cooldown()
             else:
-                print("  Capturing full page screenshot...")
-                sys.stdout.flush()
-                screenshot_bytes = get_full_page_screenshot(driver)
-                send_result_notification(slots_available, screenshot_bytes, special_case=None, booking_url=BOOKING_URL, location=location, chrome_ip=chrome_ip)
-                print("✓ Notification sent")
+                logger.info("  Capturing screenshot...")
+                with time_step("hungary", "screenshot"):
+                    screenshot = capture_screenshot(driver)
+                if screenshot:
+                    send_result_notification(slots_available, screenshot.data, special_case=None, booking_url=BOOKING_URL, location=location, chrome_ip=chrome_ip, image_format=screenshot.image_format)
+                else:
+                    send_result_notification(slots_available, get_full_page_screenshot(driver), special_case=None, booking_url=BOOKING_URL, location=location, chrome_ip=chrome_ip)
+                logger.info("✓ Notification sent")
         else:
-            print("  No slots available")
-        sys.stdout.flush()
+            logger.info("  No slots available")
     except Exception as e:
-        print(f"\n✗ Error occurred during {location_display} check: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.stdout.flush()
+        logger.error(f"\n✗ Error occurred during {location_display} check: {e}", exc_info=True)
+        _record_outcome(location, "error", chrome_ip)
+    return driver, chrome_ip
+
+
+def run_scraper(location="tel_aviv"):
+    """Scraper registry entry point: one location, or 'both' for Subotica and Belgrade."""
+    prefill_profiles()
+    if location == "both":
+        fill_booking_form_both_locations()
+    else:
+        fill_booking_form(location=location)
 
 
 if __name__ == "__main__":
@@ -697,8 +858,5 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
     
-    if args.location == "both":
-        fill_booking_form_both_locations()
-    else:
-        fill_booking_form(location=args.location)
+    run_scraper(args.location)
 
@@ -0,0 +1,964 @@
+#!/usr/bin/env python3
+"""
+asyncio-based port of the Italy login bot.
+
+Runs the same stages as ItalyLoginBot (launch real Chrome, connect via CDP,
+log in through reCAPTCHA Enterprise, open /Services, probe booking buttons),
+but every wait is an awaited Playwright event instead of a time.sleep polling
+loop. Several credential sessions can therefore share one event loop, one
+Playwright driver and one Chrome process (each session gets its own browser
+context).
+"""
+
+import asyncio
+import math
+import os
+import random
+import shutil
+import signal
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    Response,
+    TimeoutError as PlaywrightTimeoutError,
+)
+
+from ...config.settings import get_settings
+from ...notifications import send_telegram_message, send_healthcheck_slots_found, get_ip_and_country
+from ...netstate.resource_policy import (
+    get_resource_policy,
+    get_run_stats,
+    report_run_stats,
+    route_with_policy_async,
+    track_transfer_async,
+)
+from ...runner.display import VirtualDisplayManager
+from ...runner.reaper import get_spawn_registry
+from ...runner.watchdog import ChromeWatchdog, WatchedBrowser
+from ...telemetry import bind_run, get_run_id, new_run_id
+from ...telemetry.metrics import record_outcome, setup_metrics_export, time_step
+from .runner import (
+    APPOINTMENT_PORTAL_URL,
+    BOOKING_TARGET_URLS,
+    CAPTCHA_COMPLETE_TIMEOUT,
+    CAPTCHA_TRIGGER_SELECTOR,
+    ELEMENT_WAIT_TIMEOUT,
+    EMAIL_SELECTOR,
+    LOGIN_COMPLETE_TIMEOUT,
+    LOGIN_FORM_SELECTOR,
+    NETWORK_IDLE_TIMEOUT,
+    NO_SLOT_MESSAGES,
+    PAGE_LOAD_TIMEOUT,
+    PASSWORD_SELECTOR,
+    SERVICES_TAB_SELECTOR,
+    CaptchaError,
+    ItalyCredentialManager,
+    ItalyCredentials,
+    Logger,
+    LoginError,
+    ProxyConfig,
+    StealthPatcher,
+    preflight_login_host,
+)
+
+# Paths that indicate the session reached an authenticated page
+AUTHENTICATED_PATHS = ["/UserArea", "/Home", "/Dashboard", "/Account", "/Services"]
+
+# How long to wait for Chrome to announce its DevTools endpoint (seconds)
+CDP_READY_TIMEOUT = 30
+
+# Maximum number of credential sessions driven concurrently by default
+DEFAULT_MAX_SESSIONS = 3
+
+
+def _is_authenticated_url(url: Optional[str]) -> bool:
+    """Return True if the URL looks like a page behind the login."""
+    if not url or url == "about:blank":
+        return False
+    if "/Error" in url or "/Home/Login" in url:
+        return False
+    return any(path in url for path in AUTHENTICATED_PATHS)
+
+
+def _is_login_post(response: Response) -> bool:
+    return "/Home/Login" in response.url and response.request.method == "POST"
+
+
+class AsyncMouseSimulator:
+    """Human-like mouse movement simulation (async variant of MouseSimulator)."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.current_x = 0
+        self.current_y = 0
+
+    async def move_to(self, target_x: int, target_y: int, steps: Optional[int] = None) -> None:
+        """Move mouse to target coordinates along a jittered Bezier curve."""
+        if steps is None:
+            distance = math.sqrt((target_x - self.current_x)**2 + (target_y - self.current_y)**2)
+            steps = max(10, min(50, int(distance / 10)))
+
+        control_x1 = self.current_x + (target_x - self.current_x) * 0.25 + random.randint(-20, 20)
+        control_y1 = self.current_y + (target_y - self.current_y) * 0.25 + random.randint(-20, 20)
+        control_x2 = self.current_x + (target_x - self.current_x) * 0.75 + random.randint(-20, 20)
+        control_y2 = self.current_y + (target_y - self.current_y) * 0.75 + random.randint(-20, 20)
+
+        for i in range(steps + 1):
+            t = i / steps
+            x = (1-t)**3 * self.current_x + 3*(1-t)**2*t * control_x1 + 3*(1-t)*t**2 * control_x2 + t**3 * target_x
+            y = (1-t)**3 * self.current_y + 3*(1-t)**2*t * control_y1 + 3*(1-t)*t**2 * control_y2 + t**3 * target_y
+            x += random.uniform(-1, 1)
+            y += random.uniform(-1, 1)
+            await self.page.mouse.move(int(x), int(y))
+            await asyncio.sleep(random.uniform(0.005, 0.015))
+
+        self.current_x = target_x
+        self.current_y = target_y
+
+    async def random_movement(self, center_x: int, center_y: int, radius: int = 50) -> None:
+        """Perform random jitter movement around a center point."""
+        for _ in range(random.randint(2, 5)):
+            jitter_x = center_x + random.randint(-radius, radius)
+            jitter_y = center_y + random.randint(-radius, radius)
+            await self.move_to(jitter_x, jitter_y, steps=random.randint(5, 15))
+            await asyncio.sleep(random.uniform(0.2, 0.6))
+
+    async def move_to_element(self, element, offset_x: int = 0, offset_y: int = 0) -> None:
+        """Move mouse to an element with human-like movement."""
+        box = await element.bounding_box()
+        if box:
+            target_x = int(box['x'] + box['width'] / 2 + offset_x)
+            target_y = int(box['y'] + box['height'] / 2 + offset_y)
+            if self.current_x > 0 or self.current_y > 0:
+                await self.random_movement(self.current_x, self.current_y, radius=30)
+            await self.move_to(target_x, target_y)
+            await asyncio.sleep(random.uniform(0.3, 0.9))
+
+
+async def random_delay(min_ms: float = 300, max_ms: float = 900) -> None:
+    """Random delay to simulate human thinking/reading time."""
+    await asyncio.sleep(random.uniform(min_ms / 1000, max_ms / 1000))
+
+
+async def type_human_like(page: Page, selector: str, text: str) -> None:
+    """Type text with human-like delays and fire the events Parsley listens to."""
+    field = page.locator(selector)
+    await field.click()
+    await asyncio.sleep(random.uniform(0.2, 0.4))
+    await field.fill("")
+    await asyncio.sleep(random.uniform(0.1, 0.2))
+
+    for char in text:
+        await field.type(char, delay=random.uniform(80, 160))
+        if random.random() < 0.1:
+            await asyncio.sleep(random.uniform(0.2, 0.5))
+
+    await page.evaluate(
+        """
+        ([selector, value]) => {
+            const field = document.querySelector(selector);
+            if (field) {
+                field.value = value;
+                for (const name of ['input', 'change', 'keyup', 'blur']) {
+                    field.dispatchEvent(new Event(name, { bubbles: true, cancelable: true }));
+                }
+                if (typeof jQuery !== 'undefined') {
+                    jQuery(field).trigger('input');
+                    jQuery(field).trigger('change');
+                    jQuery(field).trigger('blur');
+                }
+            }
+        }
+        """,
+        [selector, text],
+    )
+    await asyncio.sleep(random.uniform(0.3, 0.6))
+
+
+async def scroll_realistic(page: Page, direction: str = "down", amount: int = 300) -> None:
+    """Perform realistic scrolling with incremental wheel steps."""
+    steps = random.randint(5, 12)
+    step_size = amount // steps
+    for _ in range(steps):
+        scroll_amount = step_size + random.randint(-10, 10)
+        await page.mouse.wheel(0, scroll_amount if direction == "down" else -scroll_amount)
+        await asyncio.sleep(random.uniform(0.05, 0.15))
+    await asyncio.sleep(random.uniform(0.2, 0.4))
+
+
+async def simulate_reading(page: Page, mouse: AsyncMouseSimulator) -> None:
+    """Simulate reading the page with a few idle mouse movements."""
+    await random_delay(800, 1800)
+    viewport = page.viewport_size
+    if viewport:
+        for _ in range(random.randint(1, 3)):
+            x = random.randint(100, viewport['width'] - 100)
+            y = random.randint(100, viewport['height'] - 100)
+            await mouse.move_to(x, y, steps=random.randint(5, 15))
+            await random_delay(200, 600)
+
+
+async def _first_completed(tasks: Dict[str, "asyncio.Future"], timeout_s: float) -> Tuple[Optional[str], Any]:
+    """
+    Wait for the first of several named awaitables to finish.
+
+    Returns:
+        (name, result) of the first task that completed without raising, or
+        (None, None) on timeout. Pending tasks are cancelled.
+    """
+    pending = set(tasks.values())
+    names = {task: name for name, task in tasks.items()}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                return names[task], task.result()
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+class AsyncChromeHost:
+    """
+    A single real Google Chrome process shared by several async login sessions.
+
+    Chrome is started with --remote-debugging-port=0 and the DevTools endpoint is
+    read from Chrome's own "DevTools listening on ..." announcement, so no port
+    is hardcoded and no polling loop is needed.
+
+    The Chrome watchdog samples the process tree; once it flags the host
+    (memory or age limit), Chrome is restarted before the next session starts,
+    provided no other session still has a context open.
+    """
+
+    def __init__(self, playwright: Playwright):
+        self.playwright = playwright
+        self.browser: Optional[Browser] = None
+        self.chrome_process: Optional[asyncio.subprocess.Process] = None
+        self.chrome_watch: Optional[WatchedBrowser] = None
+        self.spawn_entries: List[Optional[int]] = []
+        self.open_contexts = 0
+        self.user_data_dir: Optional[str] = None
+        self.display: Optional[str] = None
+        self._stderr_drain: Optional[asyncio.Task] = None
+        self._default_context_taken = False
+        # With several proxy upstreams each session gets a context bound to its own upstream
+        self.per_session_proxies = len(ProxyConfig.pool()) > 1
+
+    async def _acquire_display(self) -> bool:
+        """Borrow a display from the shared Xvfb manager."""
+        self.display = await asyncio.to_thread(VirtualDisplayManager.instance().acquire)
+        if not self.display:
+            Logger.log("⚠ Xvfb unavailable, falling back to --headless mode", "WARN")
+            return False
+        Logger.log(f"✓ Xvfb virtual display acquired (DISPLAY={self.display})")
+        return True
+
+    async def start(self) -> None:
+        """Launch Chrome and connect Playwright to it over CDP."""
+        xvfb_started = await self._acquire_display() if get_settings().italy_headless else False
+
+        self.user_data_dir = tempfile.mkdtemp(prefix="chrome_user_data_")
+        chrome_args = [
+            '--remote-debugging-port=0',
+            f'--user-data-dir={self.user_data_dir}',
+            '--disable-dev-shm-usage',
+            '--no-sandbox',
+            '--disable-blink-features=AutomationControlled',
+        ]
+        if get_settings().italy_headless:
+            if xvfb_started:
+                chrome_args.extend([f'--display={self.display}', '--window-size=1920,1080'])
+            else:
+                chrome_args.extend([
+                    '--headless=new',
+                    '--disable-gpu',
+                    '--disable-software-rasterizer',
+                    '--disable-extensions',
+                ])
+                Logger.log("Running Chrome in headless mode (may be detected by website)", "WARN")
+
+        if self.per_session_proxies:
+            Logger.log(f"Spreading sessions across {len(ProxyConfig.pool())} proxy upstreams")
+        else:
+            proxy_config = ProxyConfig.get_proxy_config()
+            if proxy_config:
+                chrome_args.append(f"--proxy-server={proxy_config['server']}")
+                Logger.log(f"Using proxy: {proxy_config['server']}")
+
+        env = dict(os.environ)
+        if self.display:
+            env['DISPLAY'] = self.display
+
+        for executable in ['google-chrome', 'chromium', 'chrome', 'chromium-browser',
+                           '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome']:
+            try:
+                self.chrome_process = await asyncio.create_subprocess_exec(
+                    executable, *chrome_args,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=env,
+                    start_new_session=hasattr(os, 'setsid'),
+                )
+                Logger.log(f"✓ Chrome launched using: {executable}")
+                break
+            except FileNotFoundError:
+                continue
+        else:
+            raise LoginError("Could not find Google Chrome executable. Please install Chrome or set PATH correctly.")
+        self._default_context_taken = False
+        registry = get_spawn_registry()
+        self.spawn_entries = [
+            registry.register_process("italy_async_chrome", self.chrome_process.pid),
+            registry.register_dir("italy_async_profile", self.user_data_dir),
+        ]
+        self.chrome_watch = ChromeWatchdog.instance().watch(
+            "italy_async", self.chrome_process.pid, enforce=get_settings().italy_headless
+        )
+
+        ws_endpoint = await self._wait_for_devtools_endpoint()
+        # Keep reading stderr so Chrome never blocks on a full pipe
+        self._stderr_drain = asyncio.create_task(self._drain_stderr())
+
+        try:
+            self.browser = await self.playwright.chromium.connect_over_cdp(ws_endpoint)
+            Logger.log("✓ Connected to Chrome via CDP")
+        except Exception as e:
+            raise LoginError(f"Failed to connect to Chrome via CDP: {e}. Make sure Chrome started successfully.")
+
+    async def _wait_for_devtools_endpoint(self) -> str:
+        """Await Chrome's 'DevTools listening on ws://...' line on stderr."""
+        prefix = b"DevTools listening on "
+
+        async def read_endpoint() -> str:
+            while True:
+                line = await self.chrome_process.stderr.readline()
+                if not line:
+                    raise LoginError("Chrome process exited before DevTools became available.")
+                if line.startswith(prefix):
+                    return line[len(prefix):].strip().decode("utf-8")
+
+        try:
+            endpoint = await asyncio.wait_for(read_endpoint(), timeout=CDP_READY_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise LoginError(f"Chrome CDP did not become available after {CDP_READY_TIMEOUT} seconds.")
+        Logger.log(f"✓ Chrome CDP is ready ({endpoint})")
+        return endpoint
+
+    async def _drain_stderr(self) -> None:
+        try:
+            while await self.chrome_process.stderr.readline():
+                pass
+        except Exception:
+            pass
+
+    async def new_context(self) -> BrowserContext:
+        """
+        Hand out a browser context; the first caller gets Chrome's default context.
+
+        With a multi-upstream proxy pool every caller gets a fresh context
+        routed through the upstream assigned to its run id instead.
+        """
+        if self.chrome_watch and self.chrome_watch.recycle_requested and self.open_contexts == 0:
+            Logger.log(f"Recycling Chrome ({self.chrome_watch.recycle_reason} limit reached)")
+            await self.close()
+            await self.start()
+        if not self.browser:
+            raise LoginError("Chrome host is not started.")
+        self.open_contexts += 1
+        if self.per_session_proxies:
+            proxy_config = await asyncio.to_thread(ProxyConfig.get_proxy_config)
+            if proxy_config:
+                Logger.log(f"Session {get_run_id()} uses proxy {proxy_config['server']}")
+                return await self.browser.new_context(proxy=proxy_config)
+        if not self._default_context_taken and self.browser.contexts:
+            self._default_context_taken = True
+            return self.browser.contexts[0]
+        return await self.browser.new_context()
+
+    def release_context(self) -> None:
+        """A session is done with the context new_context() gave it."""
+        self.open_contexts = max(0, self.open_contexts - 1)
+
+    async def close(self) -> None:
+        """Disconnect Playwright, terminate Chrome, release the display and remove the profile."""
+        try:
+            if self.browser:
+                await self.browser.close()
+        except Exception:
+            pass
+
+        if self.chrome_process and self.chrome_process.returncode is None:
+            try:
+                if hasattr(os, 'setsid'):
+                    os.killpg(os.getpgid(self.chrome_process.pid), signal.SIGTERM)
+                else:
+                    self.chrome_process.terminate()
+                await asyncio.wait_for(self.chrome_process.wait(), timeout=5)
+                Logger.log("✓ Chrome process terminated")
+            except asyncio.TimeoutError:
+                try:
+                    if hasattr(os, 'setsid'):
+                        os.killpg(os.getpgid(self.chrome_process.pid), signal.SIGKILL)
+                    else:
+                        self.chrome_process.kill()
+                    Logger.log("✓ Chrome process force killed")
+                except Exception:
+                    pass
+            except Exception:
+                pass
+
+        ChromeWatchdog.instance().unwatch(self.chrome_watch)
+        self.chrome_watch = None
+
+        if self._stderr_drain:
+            self._stderr_drain.cancel()
+
+        if self.user_data_dir and os.path.exists(self.user_data_dir):
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+        get_spawn_registry().release(*self.spawn_entries)
+        self.spawn_entries = []
+
+        VirtualDisplayManager.instance().release(self.display)
+        self.display = None
+
+
+class AsyncItalyLoginBot:
+    """Async Italy login bot. One instance drives one credential in its own browser context."""
+
+    def __init__(
+        self,
+        host: AsyncChromeHost,
+        credentials: Optional[ItalyCredentials] = None,
+        credential_manager: Optional[ItalyCredentialManager] = None,
+    ):
+        self.host = host
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+        self.mouse: Optional[AsyncMouseSimulator] = None
+        self.slots_notified = False
+        self.credentials: Optional[ItalyCredentials] = credentials
+        self.credential_manager = credential_manager or ItalyCredentialManager()
+
+    def _log(self, message: str, level: str = "INFO") -> None:
+        """Log with the credential label so concurrent sessions stay readable."""
+        tag = (self.credentials.label or self.credentials.email) if self.credentials else "?"
+        Logger.log(f"[{tag}] {message}", level)
+
+    async def setup_page(self) -> None:
+        """Obtain a browser context and page from the shared Chrome host."""
+        self.context = await self.host.new_context()
+        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        await self.page.add_init_script(StealthPatcher.get_stealth_script())
+        stats = get_run_stats("italy_async")
+        policy = get_resource_policy("italy")
+        if policy:
+            await route_with_policy_async(self.context, policy, stats)
+        await track_transfer_async(self.context, self.page, stats)
+        self.mouse = AsyncMouseSimulator(self.page)
+        self._log("✓ Browser context ready (real Chrome via CDP)")
+
+    async def _use_page(self, page: Page) -> None:
+        self.page = page
+        self.mouse = AsyncMouseSimulator(page)
+
+    async def check_for_unavailable_error(self) -> bool:
+        """Check if the page shows the 'Unavailable' error page."""
+        try:
+            title = await self.page.title()
+            if title and "Unavailable" in title:
+                return True
+            body_text = await self.page.locator("body").inner_text(timeout=2000)
+            return bool(body_text) and "Unavailable" in body_text.strip()
+        except Exception:
+            return False
+
+    async def is_account_blocked_page(self) -> bool:
+        """Detect the known 'Account Blocked' message on the page."""
+        try:
+            text = (await self.page.inner_text("body", timeout=2000)).lower()
+        except Exception:
+            return False
+        return "account bloccato" in text or "account blocked" in text
+
+    async def detect_account_blocked(self, context: str) -> bool:
+        """Check for blocked account UI and persist state."""
+        if not await self.is_account_blocked_page():
+            return False
+        reason = f"Account blocked page detected ({context})"
+        self._log(f"✗ {reason}", "ERROR")
+        if self.credentials:
+            await asyncio.to_thread(self.credential_manager.mark_blocked, self.credentials, reason)
+        return True
+
+    async def navigate_to_login(self) -> None:
+        """Navigate to the login page and wait until the network settles."""
+        self._log(f"Navigating to login page: {get_settings().italy_login_url}")
+        await random_delay(500, 1000)
+        try:
+            response = await self.page.goto(get_settings().italy_login_url, wait_until='domcontentloaded', timeout=PAGE_LOAD_TIMEOUT)
+            if response and response.status >= 400:
+                raise LoginError(f"HTTP {response.status} error loading login page")
+        except PlaywrightTimeoutError:
+            self._log("⚠ Page load timeout, continuing anyway...", "WARN")
+
+        try:
+            await self.page.wait_for_load_state('networkidle', timeout=NETWORK_IDLE_TIMEOUT)
+        except PlaywrightTimeoutError:
+            self._log("⚠ Network idle timeout, continuing anyway...", "WARN")
+
+        if await self.check_for_unavailable_error():
+            raise LoginError("Page shows 'Unavailable' error - cannot proceed")
+
+        await simulate_reading(self.page, self.mouse)
+        await scroll_realistic(self.page, "down", random.randint(100, 300))
+
+    async def wait_for_recaptcha_scripts(self) -> bool:
+        """Wait for reCAPTCHA Enterprise to expose grecaptcha.enterprise."""
+        try:
+            await self.page.wait_for_function(
+                "() => !!(window.grecaptcha && window.grecaptcha.enterprise)",
+                timeout=20000,
+            )
+            self._log("✓ reCAPTCHA Enterprise loaded")
+            return True
+        except PlaywrightTimeoutError:
+            self._log("⚠ reCAPTCHA Enterprise not loaded within timeout", "WARN")
+            return False
+
+    async def fill_login_form(self) -> None:
+        """Fill login form with human-like behavior."""
+        if not self.credentials:
+            raise LoginError("Credentials were not initialized before filling the login form.")
+        try:
+            await self.page.wait_for_selector(LOGIN_FORM_SELECTOR, timeout=ELEMENT_WAIT_TIMEOUT)
+        except PlaywrightTimeoutError:
+            raise LoginError(f"Login form ({LOGIN_FORM_SELECTOR}) not found on page. URL: {self.page.url}")
+
+        await random_delay(400, 800)
+        for selector, value in ((EMAIL_SELECTOR, self.credentials.email), (PASSWORD_SELECTOR, self.credentials.password)):
+            field = self.page.locator(selector)
+            await field.wait_for(state="visible", timeout=ELEMENT_WAIT_TIMEOUT)
+            await self.mouse.move_to_element(field)
+            await random_delay(300, 600)
+            await type_human_like(self.page, selector, value)
+            await random_delay(400, 1200)
+
+        await self.page.evaluate("""
+            () => {
+                const form = document.querySelector('#login-form');
+                if (window.jQuery && jQuery(form).parsley) {
+                    jQuery('#login-form').parsley().validate();
+                }
+            }
+        """)
+        await random_delay(500, 1000)
+        self._log("✓ Login form filled and validated")
+
+    async def trigger_captcha(self) -> None:
+        """Wait for the captcha button to become enabled and click it."""
+        button = self.page.locator(CAPTCHA_TRIGGER_SELECTOR)
+        await button.wait_for(state="visible", timeout=ELEMENT_WAIT_TIMEOUT)
+        await button.scroll_into_view_if_needed()
+        await random_delay(400, 800)
+        try:
+            await self.page.wait_for_function(
+                "(selector) => { const btn = document.querySelector(selector); return btn && !btn.disabled; }",
+                arg=CAPTCHA_TRIGGER_SELECTOR,
+                timeout=15000,
+            )
+        except PlaywrightTimeoutError:
+            raise CaptchaError("Captcha button did not become enabled - validation may have failed")
+        await self.mouse.move_to_element(button)
+        await random_delay(400, 1200)
+        await button.click(timeout=5000)
+        self._log("✓ Captcha trigger button clicked")
+        await random_delay(300, 600)
+
+    async def wait_for_captcha_completion(self) -> bool:
+        """
+        Wait for reCAPTCHA Enterprise to complete.
+
+        Races three events: the login POST response, a main-frame navigation,
+        and the page itself reporting a token / the login form disappearing.
+        """
+        self._log("Waiting for reCAPTCHA Enterprise to complete...")
+        page = self.page
+        tasks = {
+            "login_response": asyncio.ensure_future(
+                page.wait_for_event("response", predicate=_is_login_post, timeout=CAPTCHA_COMPLETE_TIMEOUT)
+            ),
+            "navigation": asyncio.ensure_future(
+                page.wait_for_event(
+                    "framenavigated",
+                    predicate=lambda frame: frame == page.main_frame,
+                    timeout=CAPTCHA_COMPLETE_TIMEOUT,
+                )
+            ),
+            "token_or_form_gone": asyncio.ensure_future(
+                page.wait_for_function(
+                    """
+                    (formSelector) => {
+                        try {
+                            if (window.grecaptcha && window.grecaptcha.getResponse &&
+                                window.grecaptcha.getResponse().length > 0) {
+                                return true;
+                            }
+                        } catch (e) {}
+                        const form = document.querySelector(formSelector);
+                        if (!form || form.offsetParent === null) {
+                            return true;
+                        }
+                        const inputs = form.querySelectorAll(
+                            'input[name*="recaptcha"], input[name*="g-recaptcha"], textarea[name*="recaptcha"]'
+                        );
+                        return Array.from(inputs).some((input) => input.value && input.value.length > 0);
+                    }
+                    """,
+                    arg=LOGIN_FORM_SELECTOR,
+                    timeout=CAPTCHA_COMPLETE_TIMEOUT,
+                    polling="mutation",
+                )
+            ),
+        }
+        name, result = await _first_completed(tasks, CAPTCHA_COMPLETE_TIMEOUT / 1000)
+
+        if name is None:
+            self._log("✗ Timeout waiting for captcha completion", "ERROR")
+            return False
+        if name == "login_response":
+            if result.status >= 400:
+                self._log(f"✗ Login failed with status {result.status}", "ERROR")
+                return False
+            if result.status == 200 and await self.check_for_unavailable_error():
+                self._log("✗ Login response returned 'Unavailable' error page", "ERROR")
+                return False
+        self._log(f"✓ reCAPTCHA completed ({name})")
+        return True
+
+    async def wait_for_login_completion(self) -> Tuple[bool, Optional[str]]:
+        """
+        Wait for login to complete.
+
+        Races: the current page reaching an authenticated URL, the current page
+        landing on /Error, and a new tab opening (which is then awaited until it
+        has a real URL).
+        """
+        self._log("Waiting for login to complete...")
+        page = self.page
+        timeout_ms = LOGIN_COMPLETE_TIMEOUT
+
+        if _is_authenticated_url(page.url):
+            return True, page.url
+
+        async def new_authenticated_tab() -> Page:
+            new_page = await self.context.wait_for_event("page", timeout=timeout_ms)
+            try:
+                await new_page.wait_for_load_state("domcontentloaded", timeout=PAGE_LOAD_TIMEOUT)
+            except PlaywrightTimeoutError:
+                pass
+            if new_page.url == "about:blank":
+                await new_page.wait_for_url(lambda url: url != "about:blank", timeout=timeout_ms)
+            return new_page
+
+        tasks = {
+            "authenticated": asyncio.ensure_future(
+                page.wait_for_url(_is_authenticated_url, timeout=timeout_ms, wait_until="commit")
+            ),
+            "error_page": asyncio.ensure_future(
+                page.wait_for_url(lambda url: "/Error" in url, timeout=timeout_ms, wait_until="commit")
+            ),
+            "new_tab": asyncio.ensure_future(new_authenticated_tab()),
+        }
+        name, result = await _first_completed(tasks, timeout_ms / 1000)
+
+        if name == "authenticated":
+            self._log(f"✓ Login successful! Navigated to: {page.url}")
+            return True, page.url
+        if name == "error_page":
+            self._log(f"✗ Error page detected: {page.url}", "ERROR")
+            return False, page.url
+        if name == "new_tab":
+            new_url = result.url
+            previous_page = self.page
+            await self._use_page(result)
+            if "/Error" in new_url:
+                self._log(f"✗ Error detected on new tab: {new_url}", "ERROR")
+                return False, new_url
+            self._log(f"✓ Switching automation to newly opened tab: {new_url}")
+            try:
+                await previous_page.close()
+            except Exception:
+                pass
+            return True, new_url
+
+        # Timed out - accept any tab that already sits on an authenticated page
+        for candidate in self.context.pages:
+            if _is_authenticated_url(candidate.url):
+                await self._use_page(candidate)
+                self._log(f"✓ Login succeeded despite timeout: {candidate.url}", "WARN")
+                return True, candidate.url
+        self._log("✗ Timeout waiting for login completion", "ERROR")
+        return False, page.url
+
+    async def navigate_to_services_tab(self) -> bool:
+        """Click the /Services tab and await the navigation."""
+        nav_locator = self.page.locator(SERVICES_TAB_SELECTOR)
+        try:
+            await nav_locator.wait_for(state="visible", timeout=ELEMENT_WAIT_TIMEOUT)
+        except PlaywrightTimeoutError:
+            self._log("✗ Services tab not found on the page", "ERROR")
+            return False
+
+        await random_delay(600, 1200)
+        await self.mouse.move_to_element(nav_locator)
+        try:
+            async with self.page.expect_navigation(url="**/Services*", timeout=PAGE_LOAD_TIMEOUT):
+                await nav_locator.click()
+        except PlaywrightTimeoutError:
+            if "/Services" not in self.page.url:
+                self._log(f"✗ Still not on Services tab (current URL: {self.page.url})", "ERROR")
+                return False
+        self._log(f"✓ Navigation confirmed: {self.page.url}")
+        await simulate_reading(self.page, self.mouse)
+        return True
+
+    async def check_booking_slots(self) -> bool:
+        """Click through targeted booking buttons and look for slot availability."""
+        for href in BOOKING_TARGET_URLS:
+            if await self.try_booking_button(href):
+                return True
+        self._log("✗ No slots detected for monitored services.")
+        return False
+
+    async def try_booking_button(self, href: str) -> bool:
+        """Click a specific booking button and await either the no-slot modal or a timeout."""
+        button_locator = self.page.locator(f"a[href='{href}'] button.button.primary")
+        try:
+            await button_locator.wait_for(state="visible", timeout=ELEMENT_WAIT_TIMEOUT)
+        except PlaywrightTimeoutError:
+            self._log(f"✗ Booking button not found for {href}", "ERROR")
+            return False
+
+        await random_delay(700, 1400)
+        await self.mouse.move_to_element(button_locator)
+        await button_locator.click()
+        self._log(f"✓ Clicked booking button for {href}")
+
+        # The sync bot sleeps 5s and then waits up to 6s; here we simply await the modal
+        modal_locator = self.page.locator(".jconfirm-box").first
+        try:
+            await modal_locator.wait_for(state="visible", timeout=11000)
+        except PlaywrightTimeoutError:
+            self._log(f"✓ No 'fully booked' modal detected for {href} – slots may be available!")
+            await self.notify_slots_found(href)
+            return True
+
+        modal_text = (await modal_locator.inner_text()).strip().lower()
+        if any(message.lower() in modal_text for message in NO_SLOT_MESSAGES):
+            self._log(f"✗ No slots available for {href}")
+        else:
+            self._log(f"⚠ Modal detected with unexpected text: {modal_text}", "WARN")
+        ok_button = modal_locator.locator(".jconfirm-buttons button")
+        if await ok_button.count() > 0:
+            await ok_button.first.click()
+            await random_delay(400, 800)
+        return False
+
+    async def notify_slots_found(self, href: str) -> None:
+        """Send a Telegram notification when slots are found."""
+        if self.slots_notified:
+            return
+        _, country = await asyncio.to_thread(get_ip_and_country)
+        await asyncio.to_thread(send_healthcheck_slots_found, country)
+        service_id = href.split("/")[-1] if "/" in href else href
+        message = (
+            "✅ SLOTS FOUND IN ITALY!\n\n"
+            f"Service ID: {service_id}\n"
+            f"Portal: {APPOINTMENT_PORTAL_URL}"
+        )
+        if await asyncio.to_thread(send_telegram_message, message):
+            self.slots_notified = True
+            self._log("✓ Telegram notification sent for Italy slots.")
+
+    async def get_session_data(self) -> Dict[str, Any]:
+        """Extract cookies and storage from the authenticated page."""
+        cookies = await self.context.cookies()
+        try:
+            storage = await self.page.evaluate(
+                "() => ({localStorage: {...localStorage}, sessionStorage: {...sessionStorage}})"
+            )
+        except Exception:
+            storage = {}
+        return {
+            'cookies': cookies,
+            'localStorage': storage.get('localStorage', {}),
+            'sessionStorage': storage.get('sessionStorage', {}),
+            'url': self.page.url,
+        }
+
+    async def close(self) -> None:
+        """Close this session's context (the shared Chrome host stays up)."""
+        report_run_stats("italy_async", "italy")
+        try:
+            if self.context:
+                await self.context.close()
+        except Exception:
+            pass
+        if self.context:
+            self.host.release_context()
+
+    async def run(self) -> Optional[Dict[str, Any]]:
+        """Run the complete login flow for one credential."""
+        if not self.credentials:
+            self.credentials = await asyncio.to_thread(self.credential_manager.get_credentials)
+        if not self.credentials:
+            Logger.log("✗ No usable Italy credentials for async session", "ERROR")
+            return None
+
+        try:
+            await self.setup_page()
+            with time_step("italy_async", "navigate"):
+                try:
+                    await self.navigate_to_login()
+                except Exception as e:
+                    await asyncio.to_thread(ProxyConfig.report, None, e)
+                    raise
+                await asyncio.to_thread(ProxyConfig.report)
+            if not await self.wait_for_recaptcha_scripts():
+                self._log("⚠ reCAPTCHA scripts may not be loaded, continuing anyway...", "WARN")
+            await random_delay(1000, 2000)
+            await self.fill_login_form()
+            await random_delay(1500, 3000)
+            await self.trigger_captcha()
+
+            with time_step("italy_async", "captcha"):
+                captcha_completed = await self.wait_for_captcha_completion()
+            if not captcha_completed:
+                raise CaptchaError("reCAPTCHA did not complete within timeout")
+
+            with time_step("italy_async", "login"):
+                success, final_url = await self.wait_for_login_completion()
+            if not success:
+                if await self.detect_account_blocked("login_failed"):
+                    record_outcome("italy_async", "italy", "account_blocked")
+                    return None
+                raise LoginError(f"Login did not complete successfully. Final URL: {final_url}")
+            if await self.detect_account_blocked("post_login"):
+                record_outcome("italy_async", "italy", "account_blocked")
+                return None
+
+            if await self.navigate_to_services_tab():
+                with time_step("italy_async", "check_slots"):
+                    slots_found = await self.check_booking_slots()
+                record_outcome("italy_async", "italy", "slots" if slots_found else "busy")
+            else:
+                self._log("⚠ Unable to automatically open /Services tab. Skipping slot check.", "WARN")
+                record_outcome("italy_async", "italy", "services_unavailable")
+
+            return await self.get_session_data()
+        except CaptchaError as e:
+            self._log(f"✗ Captcha Error: {e}", "ERROR")
+            record_outcome("italy_async", "italy", "captcha")
+            return None
+        except LoginError as e:
+            self._log(f"✗ Login Error: {e}", "ERROR")
+            record_outcome("italy_async", "italy", "login_failed")
+            return None
+        except Exception as e:
+            self._log(f"✗ Unexpected error: {e}", "ERROR")
+            record_outcome("italy_async", "italy", "error")
+            return None
+        finally:
+            await self.close()
+            await asyncio.to_thread(ProxyConfig.release)
+
+
+async def run_italy_sessions(
+    credentials: Optional[List[ItalyCredentials]] = None,
+    max_sessions: int = DEFAULT_MAX_SESSIONS,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Run several Italy login sessions concurrently on one event loop and one Chrome.
+
+    Args:
+        credentials: Explicit credentials to use. When omitted, up to
+            max_sessions credentials are drawn from the rotation.
+        max_sessions: Upper bound on concurrently running sessions.
+
+    Returns:
+        One session-data dict (or None on failure) per credential.
+    """
+    setup_metrics_export()
+    manager = ItalyCredentialManager()
+    if credentials is None:
+        credentials = []
+        seen = set()
+        for _ in range(max_sessions):
+            credential = manager.get_credentials()
+            if not credential or credential.email.lower() in seen:
+                break
+            seen.add(credential.email.lower())
+            credentials.append(credential)
+    if not credentials:
+        Logger.log("✗ No usable Italy credentials configured.", "ERROR")
+        return []
+
+    if not await asyncio.to_thread(preflight_login_host, "italy_async"):
+        record_outcome("italy_async", "italy", "unreachable")
+        return []
+
+    Logger.log(f"Starting {len(credentials)} async Italy session(s) on one Chrome instance")
+    semaphore = asyncio.Semaphore(max(1, max_sessions))
+
+    async with async_playwright() as playwright:
+        host = AsyncChromeHost(playwright)
+        try:
+            await host.start()
+
+            async def run_one(credential: ItalyCredentials):
+                async with semaphore:
+                    # Each task runs in its own context copy, so sessions get separate run ids
+                    with bind_run(f"{get_run_id()}-{new_run_id()[:4]}"):
+                        bot = AsyncItalyLoginBot(host, credentials=credential, credential_manager=manager)
+                        return await bot.run()
+
+            return await asyncio.gather(*(run_one(credential) for credential in credentials))
+        finally:
+            await host.close()
+            await asyncio.to_thread(ProxyConfig.release)
+
+
+def fill_italy_login_forms_async(max_sessions: int = DEFAULT_MAX_SESSIONS) -> List[Optional[Dict[str, Any]]]:
+    """Synchronous entry point that drives the async sessions to completion."""
+    return asyncio.run(run_italy_sessions(max_sessions=max_sessions))
+
+
+def run_scraper(location: Optional[str] = None) -> None:
+    """Scraper registry entry point; location is ignored."""
+    fill_italy_login_forms_async(max_sessions=get_settings().italy_async_sessions)
+
+
+if __name__ == "__main__":
+    sessions = get_settings().italy_async_sessions
+    results = fill_italy_login_forms_async(max_sessions=sessions)
+    succeeded = sum(1 for result in results if result)
+    Logger.log(f"Async Italy sessions finished: {succeeded}/{len(results)} succeeded")
+    sys.exit(0 if succeeded else 1)
@@ -24,10 +24,10 @@ import subprocess
 import tempfile
 import signal
 import json
+import logging
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple, List
-from dotenv import load_dotenv
 from playwright.sync_api import (
     sync_playwright,
     Page,
@@ -36,31 +36,28 @@ from playwright.sync_api import (
     Response,
     Request,
 )
+from ...config.settings import get_settings
 from ...notifications import send_telegram_message, send_healthcheck_slots_found, get_ip_and_country
-
-# Load environment variables
-load_dotenv()
-
-# Configuration
-LOGIN_URL = os.getenv("ITALY_LOGIN_URL", "https://prenotami.esteri.it/")
-LOGIN_EMAIL_OVERRIDE = (os.getenv("LOGIN_EMAIL") or "").strip()
-LOGIN_PASSWORD_OVERRIDE = (os.getenv("LOGIN_PASSWORD") or "").strip()
-DEFAULT_ITALY_EMAIL = (os.getenv("ITALY_EMAIL") or "").strip()
-DEFAULT_ITALY_PASSWORD = (os.getenv("ITALY_PASSWORD") or "").strip()
-BLOCKED_USERS_FILE = Path(
-    (os.getenv("ITALY_BLOCKED_USERS_FILE") or "italy_blocked_accounts.json")
-).expanduser()
-
-# Headless mode configuration (for Docker/server environments)
-# Set ITALY_HEADLESS=true or ITALY_INTERACTIVE=false to run in headless mode
-HEADLESS_MODE = os.getenv("ITALY_HEADLESS", "").lower() in ("true", "1", "yes") or \
-                os.getenv("ITALY_INTERACTIVE", "").lower() in ("false", "0", "no")
+from ...netstate.preflight import build_proxy_url, record_preflight, run_preflight
+from ...netstate.proxy_pool import ProxyPool, get_proxy_pool, is_connection_error
+from ...netstate.resource_policy import get_resource_policy, get_run_stats, report_run_stats, route_with_policy, track_transfer
+from ...runner.display import VirtualDisplayManager
+from ...runner.reaper import get_spawn_registry
+from ...runner.teardown import schedule_teardown
+from ...runner.watchdog import ChromeWatchdog
+from ...storage.artifacts import get_artifact_store
+from ...storage.events import get_event_store, import_legacy_json
+from ...telemetry import get_logger, get_run_id
+from ...telemetry.metrics import BLOCKED_CREDENTIALS, record_outcome, setup_metrics_export, time_step
+
+# Configuration (login URL, credentials, state files, headless mode) comes from get_settings();
+# set ITALY_HEADLESS=true or ITALY_INTERACTIVE=false to run in headless mode
+ROTATION_STATE_KEY = "italy_rotation"
 
 # Proxy configuration (required - proxychains handles proxy at system level)
-# These are used for browser-level proxy config as fallback
-PROXY_SERVER = os.getenv("PROXY_SERVER", "")  # e.g., "http://proxy.example.com:8080"
-PROXY_USERNAME = os.getenv("PROXY_USERNAME", "")
-PROXY_PASSWORD = os.getenv("PROXY_PASSWORD", "")
+# Browser-level proxies come from the proxy pool (PROXY_POOL / PROXY_POOL_FILE);
+# without a pool, PROXY_SERVER (+ PROXY_USERNAME/PROXY_PASSWORD) is a pool of one
+ITALY_PROXY_VARS = ("PROXY_SERVER",)
 
 # Selectors
 EMAIL_SELECTOR = "#login-email"
@@ -97,14 +94,16 @@ class CaptchaError(Exception):
 
 
 class Logger:
-    """Centralized logging utility."""
+    """Centralized logging utility (thin adapter over the embassy_eye logging backend)."""
+    
+    _logger = get_logger(__name__)
+    _LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARN": logging.WARNING,
+               "WARNING": logging.WARNING, "ERROR": logging.ERROR}
     
     @staticmethod
     def log(message: str, level: str = "INFO"):
-        """Log a message with timestamp."""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] [{level}] {message}")
-        sys.stdout.flush()
+        """Log a message; timestamps and output are handled by the logging backend."""
+        Logger._logger.log(Logger._LEVELS.get(level, logging.INFO), message)
 
 
 @dataclass
@@ -126,16 +125,17 @@ class ItalyCredentialManager:
     """
 
     def __init__(self):
-        self.override_email = LOGIN_EMAIL_OVERRIDE
-        self.override_password = LOGIN_PASSWORD_OVERRIDE
-        self.default_email = DEFAULT_ITALY_EMAIL
-        self.default_password = DEFAULT_ITALY_PASSWORD
-        self.rotation_state_file = Path(
-            (os.getenv("ITALY_ROTATION_STATE_FILE") or "italy_user_rotation.json")
-        ).expanduser()
-        self.blocked_state_file = BLOCKED_USERS_FILE
+        settings = get_settings()
+        self.override_email = settings.login_email
+        self.override_password = settings.login_password
+        self.default_email = settings.italy_email
+        self.default_password = settings.italy_password
+        # Legacy JSON state files; imported into the event store on first use
+        self.rotation_state_file = Path(settings.italy_rotation_state_file).expanduser()
+        self.blocked_state_file = Path(settings.italy_blocked_users_file).expanduser()
         self.rotation_users = self._load_rotation_users()
         self.blocked_accounts = self._load_blocked_accounts()
+        BLOCKED_CREDENTIALS.set(len(self.blocked_accounts), scraper="italy")
 
     def get_credentials(self) -> Optional[ItalyCredentials]:
         """Return the credential that should be used for the current run."""
@@ -195,7 +195,7 @@ class ItalyCredentialManager:
     def _load_rotation_users(self) -> List[ItalyCredentials]:
         """Parse ITALY_USERS or ITALY_USERS_FILE content."""
         raw_config = ""
-        users_file = (os.getenv("ITALY_USERS_FILE") or "").strip()
+        users_file = get_settings().italy_users_file
 
         if users_file:
             file_path = Path(users_file).expanduser()
@@ -207,7 +207,7 @@ class ItalyCredentialManager:
                 Logger.log(f"⚠ Unable to read ITALY_USERS_FILE ({file_path}): {exc}", "WARN")
 
         if not raw_config:
-            raw_config = (os.getenv("ITALY_USERS") or "").strip()
+            raw_config = get_settings().italy_users
 
         if not raw_config:
             return []
@@ -283,18 +283,18 @@ class ItalyCredentialManager:
         return selected, slot_index
 
     def _read_rotation_index(self) -> int:
-        """Read the saved next index from disk."""
+        """Read the saved next index from the event store (importing the legacy file once)."""
         try:
-            data = json.loads(self.rotation_state_file.read_text(encoding="utf-8"))
-            index = int(data.get("next_index", 0))
+            store = get_event_store()
+            data = store.get_state(ROTATION_STATE_KEY)
+            if data is None and self.rotation_state_file.exists():
+                data = import_legacy_json(self.rotation_state_file)
+                if data is not None:
+                    store.set_state(ROTATION_STATE_KEY, data)
+            index = int((data or {}).get("next_index", 0))
             return max(index, 0)
-        except FileNotFoundError:
-            return 0
         except Exception as exc:
-            Logger.log(
-                f"⚠ Failed to read Italy rotation state {self.rotation_state_file}: {exc}",
-                "WARN",
-            )
+            Logger.log(f"⚠ Failed to read Italy rotation state: {exc}", "WARN")
             return 0
 
     def _write_rotation_index(self, next_index: int, selected: ItalyCredentials, current_index: int) -> None:
@@ -310,37 +310,36 @@ class ItalyCredentialManager:
             },
         }
 
-        tmp_path = self.rotation_state_file.with_name(self.rotation_state_file.name + ".tmp")
         try:
-            self.rotation_state_file.parent.mkdir(parents=True, exist_ok=True)
-            tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-            tmp_path.replace(self.rotation_state_file)
+            get_event_store().set_state(ROTATION_STATE_KEY, payload)
         except Exception as exc:
-            Logger.log(
-                f"⚠ Failed to persist Italy rotation state to {self.rotation_state_file}: {exc}",
-                "WARN",
-            )
+            Logger.log(f"⚠ Failed to persist Italy rotation state: {exc}", "WARN")
 
     def _load_blocked_accounts(self) -> Dict[str, Dict[str, Any]]:
         """Load blocked accounts map keyed by lowercase email."""
         try:
-            data = json.loads(self.blocked_state_file.read_text(encoding="utf-8"))
-            blocked_entries = data.get("blocked", [])
-        except FileNotFoundError:
-            return {}
+            store = get_event_store()
+            if not store.has_credentials("italy") and self.blocked_state_file.exists():
+                legacy = import_legacy_json(self.blocked_state_file) or {}
+                for entry in legacy.get("blocked", []):
+                    email = (entry.get("email") or "").strip()
+                    if email:
+                        store.set_credential_status(
+                            "italy", email, "blocked", label=entry.get("label"), reason=entry.get("reason"),
+                        )
+            rows = store.credentials_with_status("italy", "blocked")
         except Exception as exc:
-            Logger.log(
-                f"⚠ Failed to read Italy blocked accounts {self.blocked_state_file}: {exc}",
-                "WARN",
-            )
+            Logger.log(f"⚠ Failed to read Italy blocked accounts: {exc}", "WARN")
             return {}
 
         accounts: Dict[str, Dict[str, Any]] = {}
-        for entry in blocked_entries:
-            email = (entry.get("email") or "").strip().lower()
-            if not email:
-                continue
-            accounts[email] = entry
+        for row in rows:
+            accounts[row["email"]] = {
+                "email": row["email"],
+                "label": row["label"],
+                "reason": row["reason"],
+                "blocked_at": datetime.datetime.utcfromtimestamp(row["updated_at"]).isoformat() + "Z",
+            }
         return accounts
 
     def _is_blocked(self, email: str) -> bool:
@@ -359,24 +358,16 @@ class ItalyCredentialManager:
             "blocked_at": datetime.datetime.utcnow().isoformat() + "Z",
         }
         self.blocked_accounts[email_key] = entry
+        BLOCKED_CREDENTIALS.set(len(self.blocked_accounts), scraper="italy")
 
-        payload = {
-            "blocked": list(self.blocked_accounts.values()),
-            "updated_at": datetime.datetime.utcnow().isoformat() + "Z",
-            "count": len(self.blocked_accounts),
-        }
-
-        tmp_path = self.blocked_state_file.with_name(self.blocked_state_file.name + ".tmp")
         try:
-            self.blocked_state_file.parent.mkdir(parents=True, exist_ok=True)
-            tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-            tmp_path.replace(self.blocked_state_file)
+            get_event_store().set_credential_status("italy", credential.email, "blocked",
+                                                    label=credential.label, reason=reason)
             Logger.log(f"⚠ Stored blocked Italy credential {credential.email}", "WARN")
         except Exception as exc:
-            Logger.log(
-                f"⚠ Failed to persist blocked Italy credential to {self.blocked_state_file}: {exc}",
-                "WARN",
-            )
+            Logger.log(f"⚠ Failed to persist blocked Italy credential: {exc}", "WARN")
+
+
 class StealthPatcher:
     """Minimal stealth mode - only removes webdriver property."""
     
@@ -666,23 +657,69 @@ class ProxyConfig:
     """Proxy configuration handler."""
     
     @staticmethod
-    def get_proxy_config() -> Optional[Dict[str, str]]:
+    def pool() -> ProxyPool:
+        return get_proxy_pool(ITALY_PROXY_VARS)
+    
+    @staticmethod
+    def get_proxy_config(session_id: Optional[str] = None) -> Optional[Dict[str, str]]:
         """
-        Get proxy configuration from environment variables.
+        Get the proxy for a browser session from the proxy pool.
+        
+        Args:
+            session_id: Sticky-assignment key (default: the current run id)
         
         Returns:
             Proxy config dict or None if not configured
         """
-        if not PROXY_SERVER:
+        upstream = ProxyConfig.pool().assign(session_id or get_run_id())
+        if not upstream:
             return None
         
-        config = {'server': PROXY_SERVER}
+        config = {'server': upstream.server}
         
-        if PROXY_USERNAME and PROXY_PASSWORD:
-            config['username'] = PROXY_USERNAME
-            config['password'] = PROXY_PASSWORD
+        if upstream.username and upstream.password:
+            config['username'] = upstream.username
+            config['password'] = upstream.password
         
         return config
+    
+    @staticmethod
+    def report(session_id: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        """Feed a navigation result into the session's upstream health (only connection errors count)."""
+        pool = ProxyConfig.pool()
+        upstream = pool.current(session_id or get_run_id())
+        if error is None:
+            pool.report_success(upstream)
+        elif is_connection_error(str(error)):
+            pool.report_failure(upstream, str(error))
+    
+    @staticmethod
+    def release(session_id: Optional[str] = None) -> None:
+        ProxyConfig.pool().release(session_id or get_run_id())
+
+
+def preflight_login_host(scraper: str = "italy") -> bool:
+    """Probe the login host (DNS/connect/TLS/TTFB) before launching Chrome; False if unreachable."""
+    if not get_settings().preflight:
+        return True
+    proxy_config = ProxyConfig.get_proxy_config()
+    proxy = None
+    if proxy_config:
+        proxy = build_proxy_url(
+            proxy_config['server'], proxy_config.get('username', ''), proxy_config.get('password', '')
+        )
+    with time_step(scraper, "preflight"):
+        results = run_preflight([get_settings().italy_login_url], proxy=proxy)
+    try:
+        record_preflight(results, run_id=get_run_id())
+    except Exception as e:
+        Logger.log(f"Warning: Failed to record pre-flight results: {e}", "WARN")
+    result = results[0]
+    if result.ok:
+        Logger.log(f"✓ Pre-flight: {result.summary()}")
+        return True
+    Logger.log(f"✗ Pre-flight failed, not starting the browser: {result.summary()}", "ERROR")
+    return False
 
 
 class ItalyLoginBot:
@@ -699,7 +736,9 @@ class ItalyLoginBot:
         self.page = None
         self.mouse = None
         self.chrome_process = None
-        self.xvfb_process = None
+        self.chrome_watch = None
+        self.spawn_entries = []
+        self.display = None
         self.user_data_dir = None
         self.slots_notified = False
         self.credentials: Optional[ItalyCredentials] = credentials
@@ -756,33 +795,18 @@ class ItalyLoginBot:
         
         # Try to use Xvfb virtual display for headless mode (avoids detection)
         # This is better than --headless flag because it's harder to detect
-        self.xvfb_process = None
+        self.display = None
         xvfb_started = False
         
-        if HEADLESS_MODE:
+        if get_settings().italy_headless:
             Logger.log("Attempting to use Xvfb virtual display (better than --headless for anti-detection)...")
-            try:
-                self.xvfb_process = subprocess.Popen(
-                    ['Xvfb', ':99', '-screen', '0', '1920x1080x24', '-ac', '+extension', 'RANDR'],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-                time.sleep(2)  # Give Xvfb time to start
-                
-                # Check if Xvfb is running
-                if self.xvfb_process.poll() is None:
-                    os.environ['DISPLAY'] = ':99'
-                    Logger.log("✓ Xvfb virtual display started (DISPLAY=:99)")
-                    xvfb_started = True
-                else:
-                    Logger.log("⚠ Xvfb failed to start, will fall back to --headless mode", "WARN")
-                    self.xvfb_process = None
-            except FileNotFoundError:
-                Logger.log("⚠ Xvfb not found (install with: apt-get install xvfb or brew install xquartz)", "WARN")
+            self.display = VirtualDisplayManager.instance().acquire()
+            if self.display:
+                os.environ['DISPLAY'] = self.display
+                Logger.log(f"✓ Xvfb virtual display acquired (DISPLAY={self.display})")
+                xvfb_started = True
+            else:
                 Logger.log("⚠ Falling back to --headless mode (may be detected by website)", "WARN")
-            except Exception as e:
-                Logger.log(f"⚠ Failed to start Xvfb: {e}, falling back to --headless mode", "WARN")
-                self.xvfb_process = None
         
         # Create temporary user data directory for Chrome
         self.user_data_dir = tempfile.mkdtemp(prefix="chrome_user_data_")
@@ -801,11 +825,11 @@ class ItalyLoginBot:
         ]
         
         # Add headless mode flags if running in Docker/server environment
-        if HEADLESS_MODE:
+        if get_settings().italy_headless:
             if xvfb_started:
                 # Use Xvfb virtual display instead of --headless (harder to detect)
                 chrome_args.extend([
-                    '--display=:99',
+                    f'--display={self.display}',
                     '--window-size=1920,1080',
                 ])
                 Logger.log("Running Chrome with Xvfb virtual display (avoids headless detection)")
@@ -855,6 +879,16 @@ class ItalyLoginBot:
             else:
                 raise LoginError("Could not find Google Chrome executable. Please install Chrome or set PATH correctly.")
         
+        # Let the reaper clean up Chrome and its profile if this process dies before cleanup()
+        registry = get_spawn_registry()
+        self.spawn_entries = [
+            registry.register_process("italy_chrome", self.chrome_process.pid),
+            registry.register_dir("italy_profile", self.user_data_dir),
+        ]
+        # Sample Chrome's memory only: this bot has no point where it could swap
+        # browsers, so enforcing the limits would just kill it mid-run
+        self.chrome_watch = ChromeWatchdog.instance().watch("italy", self.chrome_process.pid, enforce=False)
+        
         # Wait for Chrome to start and CDP to be available
         Logger.log("Waiting for Chrome CDP to be ready...")
         import urllib.request
@@ -916,6 +950,14 @@ class ItalyLoginBot:
         self.page.add_init_script(StealthPatcher.get_stealth_script())
         Logger.log("✓ Minimal stealth mode enabled (webdriver only)")
         
+        # Abort images, fonts and analytics (captcha scripts always load) and count the bytes transferred
+        stats = get_run_stats("italy")
+        policy = get_resource_policy("italy")
+        if policy:
+            route_with_policy(self.context, policy, stats)
+            Logger.log("✓ Resource policy enabled (images, fonts, analytics blocked)")
+        track_transfer(self.context, self.page, stats)
+        
         # Initialize mouse simulator
         self.mouse = MouseSimulator(self.page)
         
@@ -923,14 +965,14 @@ class ItalyLoginBot:
     
     def navigate_to_login(self) -> None:
         """Navigate to login page with human-like behavior."""
-        Logger.log(f"Navigating to login page: {LOGIN_URL}")
+        Logger.log(f"Navigating to login page: {get_settings().italy_login_url}")
         
         # Small delay before navigation
         HumanBehavior.random_delay(500, 1000)
         
         try:
             response = self.page.goto(
-                LOGIN_URL,
+                get_settings().italy_login_url,
                 wait_until='domcontentloaded',
                 timeout=PAGE_LOAD_TIMEOUT
             )
@@ -964,9 +1006,9 @@ class ItalyLoginBot:
                 raise LoginError("Page shows 'Unavailable' error - cannot proceed")
             
             # Verify we're on the login page
-            if "/Home/Login" not in final_url and final_url.rstrip("/") != LOGIN_URL.rstrip("/"):
+            if "/Home/Login" not in final_url and final_url.rstrip("/") != get_settings().italy_login_url.rstrip("/"):
                 Logger.log(f"⚠ Unexpected URL after navigation: {final_url}", "WARN")
-                Logger.log(f"  Expected login URL: {LOGIN_URL}", "WARN")
+                Logger.log(f"  Expected login URL: {get_settings().italy_login_url}", "WARN")
         except Exception as e:
             Logger.log(f"⚠ Error checking page after navigation: {e}", "WARN")
         
@@ -1682,24 +1724,12 @@ class ItalyLoginBot:
                 Logger.log(f"⚠ Debug snapshot skipped - page is error page: {current_url}", "WARN")
                 return
             
-            # Save HTML to file
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_reason = reason.replace(" ", "_").replace("/", "_")[:50]
-            filename = f"italy_debug_{safe_reason}_{timestamp}.html"
-            
-            # Ensure screenshots directory exists
-            screenshots_dir = "screenshots"
-            os.makedirs(screenshots_dir, exist_ok=True)
-            filepath = os.path.join(screenshots_dir, filename)
-            
-            # Get page HTML
-            html_content = self.page.content()
-            
-            # Save to file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            Logger.log(f"✓ Debug HTML snapshot saved: {filepath} (reason: {reason})")
+            # Identical pages are stored once; the store keeps disk usage capped
+            artifact = get_artifact_store().put(
+                self.page.content(), "italy_debug_html", reason=reason, url=current_url, run_id=get_run_id()
+            )
+            duplicate = " (same as an earlier snapshot)" if artifact.deduplicated else ""
+            Logger.log(f"✓ Debug HTML snapshot saved: {artifact.path}{duplicate} (reason: {reason})")
             Logger.log(f"  URL: {current_url}")
         except Exception as e:
             Logger.log(f"⚠ Failed to save debug HTML snapshot: {e}", "WARN")
@@ -1919,7 +1949,15 @@ class ItalyLoginBot:
             }
     
     def cleanup(self) -> None:
-        """Clean up browser and resources."""
+        """
+        Clean up browser and resources.
+
+        Playwright is disconnected here (its sync API is bound to this thread);
+        terminating Chrome, removing the profile and returning the display run
+        in a background teardown.
+        """
+        report_run_stats("italy", "italy")
+        
         try:
             if self.context:
                 self.context.close()
@@ -1940,48 +1978,53 @@ class ItalyLoginBot:
         except:
             pass
         
+        ChromeWatchdog.instance().unwatch(self.chrome_watch)
+        self.chrome_watch = None
+        schedule_teardown(
+            "italy_chrome", self._terminate_chrome,
+            self.chrome_process, self.user_data_dir, self.display, self.spawn_entries,
+        )
+        self.chrome_process = None
+        self.user_data_dir = None
+        self.display = None
+        self.spawn_entries = []
+    
+    @staticmethod
+    def _terminate_chrome(chrome_process, user_data_dir, display, spawn_entries) -> None:
+        """Kill Chrome, remove its profile and hand the display back (runs in a teardown thread)."""
         # Kill Chrome process
         try:
-            if self.chrome_process:
+            if chrome_process:
                 if hasattr(os, 'setsid'):
                     # Kill the process group
-                    os.killpg(os.getpgid(self.chrome_process.pid), signal.SIGTERM)
+                    os.killpg(os.getpgid(chrome_process.pid), signal.SIGTERM)
                 else:
                     # Windows
-                    self.chrome_process.terminate()
-                self.chrome_process.wait(timeout=5)
+                    chrome_process.terminate()
+                chrome_process.wait(timeout=5)
                 Logger.log("✓ Chrome process terminated")
         except subprocess.TimeoutExpired:
             try:
                 if hasattr(os, 'setsid'):
-                    os.killpg(os.getpgid(self.chrome_process.pid), signal.SIGKILL)
+                    os.killpg(os.getpgid(chrome_process.pid), signal.SIGKILL)
                 else:
-                    self.chrome_process.kill()
+                    chrome_process.kill()
                 Logger.log("✓ Chrome process force killed")
             except:
                 pass
         
         # Clean up user data directory
         try:
-            if self.user_data_dir and os.path.exists(self.user_data_dir):
+            if user_data_dir and os.path.exists(user_data_dir):
                 import shutil
-                shutil.rmtree(self.user_data_dir)
+                shutil.rmtree(user_data_dir)
                 Logger.log("✓ Chrome user data directory cleaned up")
         except:
             pass
+        get_spawn_registry().release(*spawn_entries)
         
-        # Stop Xvfb if it was started
-        try:
-            if self.xvfb_process and self.xvfb_process.poll() is None:
-                self.xvfb_process.terminate()
-                self.xvfb_process.wait(timeout=2)
-                Logger.log("✓ Xvfb virtual display stopped")
-        except:
-            try:
-                if self.xvfb_process:
-                    self.xvfb_process.kill()
-            except:
-                pass
+        # Hand the Xvfb display back; the manager keeps it running for the next bot
+        VirtualDisplayManager.instance().release(display)
     
     def wait_for_user_to_finish(self) -> None:
         """
@@ -1992,7 +2035,7 @@ class ItalyLoginBot:
             return
         
         # Skip interactive wait in headless mode (Docker/server environments)
-        if HEADLESS_MODE:
+        if get_settings().italy_headless:
             Logger.log("Headless mode: skipping interactive wait, closing browser immediately")
             return
         
@@ -2011,6 +2054,8 @@ class ItalyLoginBot:
         Logger.log("Starting Anti-Detection Login Bot")
         Logger.log("=" * 70)
         
+        setup_metrics_export()
+        
         if not self.credentials:
             self.credentials = self.credential_manager.get_credentials()
         
@@ -2020,19 +2065,31 @@ class ItalyLoginBot:
                 "ITALY_EMAIL/ITALY_PASSWORD, or ITALY_USERS / ITALY_USERS_FILE.",
                 "ERROR",
             )
+            record_outcome("italy", "italy", "no_credentials")
             return None
         
         Logger.log(f"Using email: {self.credentials.email}")
-        Logger.log(f"Login URL: {LOGIN_URL}")
+        Logger.log(f"Login URL: {get_settings().italy_login_url}")
+        
+        if not preflight_login_host():
+            record_outcome("italy", "italy", "unreachable")
+            return None
         
         try:
-            self.setup_browser()
-            self.navigate_to_login()
+            with time_step("italy", "setup_browser"):
+                self.setup_browser()
+            with time_step("italy", "navigate"):
+                try:
+                    self.navigate_to_login()
+                except LoginError as e:
+                    ProxyConfig.report(error=e)
+                    raise
+                ProxyConfig.report()
             
             # Verify we're on the login page before proceeding
             try:
                 current_url = self.page.url
-                if "/Home/Login" not in current_url and current_url.rstrip("/") != LOGIN_URL.rstrip("/"):
+                if "/Home/Login" not in current_url and current_url.rstrip("/") != get_settings().italy_login_url.rstrip("/"):
                     Logger.log(f"⚠ Warning: Not on expected login page. URL: {current_url}", "WARN")
                 
                 # Check for "Unavailable" error
@@ -2056,15 +2113,19 @@ class ItalyLoginBot:
             
             self.trigger_captcha()
             
-            if not self.wait_for_captcha_completion():
+            with time_step("italy", "captcha"):
+                captcha_completed = self.wait_for_captcha_completion()
+            if not captcha_completed:
                 raise CaptchaError("reCAPTCHA did not complete within timeout")
             
             Logger.log("✓ reCAPTCHA completed")
             
-            success, final_url = self.wait_for_login_completion()
+            with time_step("italy", "login"):
+                success, final_url = self.wait_for_login_completion()
             
             if not success:
                 if self.detect_account_blocked("login_failed"):
+                    record_outcome("italy", "italy", "account_blocked")
                     return None
                 reason = f"Login completion failed (final URL: {final_url})"
                 self.send_debug_html_snapshot(reason)
@@ -2072,6 +2133,7 @@ class ItalyLoginBot:
             
             Logger.log("✓ Login successful!")
             if self.detect_account_blocked("post_login"):
+                record_outcome("italy", "italy", "account_blocked")
                 return None
             
             # Check for "Unavailable" error after login
@@ -2080,13 +2142,16 @@ class ItalyLoginBot:
             
             slots_found = False
             if self.navigate_to_services_tab():
-                slots_found = self.check_booking_slots()
+                with time_step("italy", "check_slots"):
+                    slots_found = self.check_booking_slots()
                 if slots_found:
                     Logger.log("✓ Slot availability detected and notification dispatched.")
                 else:
                     Logger.log("ℹ No slots detected during this run.")
+                record_outcome("italy", "italy", "slots" if slots_found else "busy")
             else:
                 Logger.log("⚠ Unable to automatically open /Services tab. Skipping slot check.", "WARN")
+                record_outcome("italy", "italy", "services_unavailable")
             
             # Extract session data
             Logger.log("Extracting session data...")
@@ -2098,18 +2163,22 @@ class ItalyLoginBot:
             
         except CaptchaError as e:
             Logger.log(f"✗ Captcha Error: {e}", "ERROR")
+            record_outcome("italy", "italy", "captcha")
             return None
         except LoginError as e:
             Logger.log(f"✗ Login Error: {e}", "ERROR")
+            record_outcome("italy", "italy", "login_failed")
             return None
         except Exception as e:
             Logger.log(f"✗ Unexpected error: {e}", "ERROR")
             import traceback
             traceback.print_exc()
+            record_outcome("italy", "italy", "error")
             return None
         finally:
             self.wait_for_user_to_finish()
             self.cleanup()
+            ProxyConfig.release()
         
         Logger.log("=" * 70)
         Logger.log("Finished")
@@ -2128,6 +2197,11 @@ def fill_italy_login_form() -> Optional[Dict[str, Any]]:
     return bot.run()
 
 
+def run_scraper(location: Optional[str] = None) -> None:
+    """Scraper registry entry point; Italy has a single login page, so location is ignored."""
+    fill_italy_login_form()
+
+
 if __name__ == "__main__":
     result = fill_italy_login_form()
     if result:
@@ -0,0 +1,18 @@
+"""
+Storage subpackage: embedded SQLite event store for run history and state,
+the compressed artifact store for HTML snapshots, and the on-disk cache for
+generated files.
+"""
+
+from .artifacts import ArtifactStore, get_artifact_store
+from .cache import get_cache_dir, get_cache_root
+from .events import EventStore, get_event_store
+
+__all__ = [
+    "ArtifactStore",
+    "EventStore",
+    "get_artifact_store",
+    "get_cache_dir",
+    "get_cache_root",
+    "get_event_store",
+]
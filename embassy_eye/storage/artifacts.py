@@ -0,0 +1,245 @@
+"""
+Content-addressed, compressed store for HTML snapshots and other debug artifacts.
+
+Every artifact is hashed (sha256 of the raw content) and stored once as a
+compressed blob under EMBASSY_EYE_ARTIFACT_DIR (default screenshots/artifacts):
+
+    blobs/<first two hex digits>/<digest>.<ext>.zst   (zstandard, if installed)
+    blobs/<first two hex digits>/<digest>.<ext>.gz    (gzip otherwise)
+
+Saving the same error page again only adds a reference row. The index lives
+in the event store's database: artifact_blobs holds one row per blob with its
+last use, and artifact_refs records each save with its run id, kind, reason
+and URL.
+
+Disk usage stays bounded. After every save, blobs unused for
+EMBASSY_EYE_ARTIFACT_MAX_AGE_DAYS are deleted, and then the least recently
+used blobs go until the total is under EMBASSY_EYE_ARTIFACT_MAX_MB.
+
+    python -m embassy_eye.storage.artifacts list [--kind slots_html] [--limit 20]
+    python -m embassy_eye.storage.artifacts show <digest prefix> [-o page.html]
+    python -m embassy_eye.storage.artifacts prune
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from ..config.settings import get_settings
+from .events import EventStore, get_event_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifact_blobs (
+    digest        TEXT PRIMARY KEY,
+    path          TEXT NOT NULL,
+    codec         TEXT NOT NULL,
+    size          INTEGER NOT NULL,
+    stored_size   INTEGER NOT NULL,
+    created_at    REAL NOT NULL,
+    last_used_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifact_blobs_last_used ON artifact_blobs (last_used_at);
+CREATE TABLE IF NOT EXISTS artifact_refs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    digest      TEXT NOT NULL,
+    run_id      TEXT,
+    kind        TEXT NOT NULL,
+    reason      TEXT,
+    url         TEXT,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifact_refs_digest ON artifact_refs (digest);
+CREATE INDEX IF NOT EXISTS idx_artifact_refs_kind_time ON artifact_refs (kind, created_at DESC);
+"""
+
+
+@dataclass
+class ArtifactRef:
+    """Where a saved artifact ended up."""
+
+    digest: str
+    path: Path
+    size: int
+    stored_size: int
+    deduplicated: bool
+
+
+def _compress(data: bytes) -> tuple:
+    if ZSTD_AVAILABLE:
+        return "zst", zstandard.ZstdCompressor(level=10).compress(data)
+    return "gz", gzip.compress(data, compresslevel=6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zst":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("this artifact is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class ArtifactStore:
+    """Deduplicated artifact blobs with an index in the shared event store."""
+
+    def __init__(self, root: Optional[Path] = None, store: Optional[EventStore] = None,
+                 max_total_mb: Optional[float] = None, max_age_days: Optional[float] = None):
+        settings = get_settings()
+        max_total_mb = settings.artifact_max_mb if max_total_mb is None else max_total_mb
+        self.root = Path(root or settings.artifact_dir)
+        self.store = store or get_event_store()
+        self.store.executescript(SCHEMA)
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024)
+        self.max_age_days = settings.artifact_max_age_days if max_age_days is None else max_age_days
+        self._lock = threading.Lock()
+
+    def put(self, content: Union[str, bytes], kind: str, reason: Optional[str] = None, url: Optional[str] = None,
+            run_id: Optional[str] = None, extension: str = "html") -> ArtifactRef:
+        """Store content once (by hash), record a reference to it, and enforce the size/age caps."""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._lock:
+            rows = self.store.query("SELECT path, stored_size FROM artifact_blobs WHERE digest = ?", (digest,))
+            if rows and Path(rows[0]["path"]).is_file():
+                path, stored_size, deduplicated = Path(rows[0]["path"]), rows[0]["stored_size"], True
+                self.store.execute("UPDATE artifact_blobs SET last_used_at = ? WHERE digest = ?", (now, digest))
+            else:
+                codec, blob = _compress(data)
+                path = self.root / "blobs" / digest[:2] / f"{digest}.{extension}.{codec}"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{digest[:12]}.")
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(blob)
+                os.replace(tmp_path, path)
+                stored_size, deduplicated = len(blob), False
+                self.store.execute(
+                    "INSERT OR REPLACE INTO artifact_blobs (digest, path, codec, size, stored_size, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (digest, str(path), codec, len(data), stored_size, now, now),
+                )
+            self.store.execute(
+                "INSERT INTO artifact_refs (digest, run_id, kind, reason, url, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, run_id, kind, reason, url, now),
+            )
+        self.enforce_limits()
+        return ArtifactRef(digest=digest, path=path, size=len(data), stored_size=stored_size, deduplicated=deduplicated)
+
+    def get(self, digest_prefix: str) -> bytes:
+        """Decompressed content of the blob whose digest starts with digest_prefix (raises KeyError)."""
+        rows = self.store.query(
+            "SELECT digest, path, codec FROM artifact_blobs WHERE digest LIKE ? LIMIT 2", (f"{digest_prefix}%",)
+        )
+        if len(rows) != 1:
+            raise KeyError(f"{'no' if not rows else 'more than one'} artifact matches '{digest_prefix}'")
+        self.store.execute("UPDATE artifact_blobs SET last_used_at = ? WHERE digest = ?", (time.time(), rows[0]["digest"]))
+        return _decompress(rows[0]["codec"], Path(rows[0]["path"]).read_bytes())
+
+    def recent(self, kind: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Latest references, newest first."""
+        sql = ("SELECT r.digest, r.run_id, r.kind, r.reason, r.url, r.created_at, b.size, b.stored_size "
+               "FROM artifact_refs r JOIN artifact_blobs b ON b.digest = r.digest")
+        params: tuple = ()
+        if kind:
+            sql += " WHERE r.kind = ?"
+            params = (kind,)
+        rows = self.store.query(sql + " ORDER BY r.created_at DESC LIMIT ?", params + (limit,))
+        return [dict(row) for row in rows]
+
+    def total_bytes(self) -> int:
+        return int(self.store.query("SELECT COALESCE(SUM(stored_size), 0) AS total FROM artifact_blobs")[0]["total"])
+
+    def _evict(self, digest: str, path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        self.store.execute("DELETE FROM artifact_refs WHERE digest = ?", (digest,))
+        self.store.execute("DELETE FROM artifact_blobs WHERE digest = ?", (digest,))
+
+    def enforce_limits(self) -> int:
+        """Delete blobs past the age cap, then least recently used ones past the size cap; returns the count."""
+        removed = 0
+        with self._lock:
+            if self.max_age_days > 0:
+                cutoff = time.time() - self.max_age_days * 86400
+                for row in self.store.query("SELECT digest, path FROM artifact_blobs WHERE last_used_at < ?", (cutoff,)):
+                    self._evict(row["digest"], row["path"])
+                    removed += 1
+            if self.max_total_bytes > 0:
+                excess = self.total_bytes() - self.max_total_bytes
+                if excess > 0:
+                    for row in self.store.query(
+                        "SELECT digest, path, stored_size FROM artifact_blobs ORDER BY last_used_at ASC"
+                    ):
+                        if excess <= 0:
+                            break
+                        self._evict(row["digest"], row["path"])
+                        excess -= row["stored_size"]
+                        removed += 1
+        return removed
+
+
+_artifact_store: Optional[ArtifactStore] = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide artifact store."""
+    global _artifact_store
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            _artifact_store = ArtifactStore()
+        return _artifact_store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m embassy_eye.storage.artifacts",
+                                     description="Inspect stored HTML snapshots and other artifacts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    list_cmd = sub.add_parser("list", help="Show the latest saved artifacts")
+    list_cmd.add_argument("--kind")
+    list_cmd.add_argument("--limit", type=int, default=20)
+    show = sub.add_parser("show", help="Print (or write) an artifact's content")
+    show.add_argument("digest", help="Digest or unique digest prefix")
+    show.add_argument("-o", "--output", help="Write to this file instead of stdout")
+    sub.add_parser("prune", help="Apply the size and age caps now")
+    args = parser.parse_args(argv)
+
+    artifacts = get_artifact_store()
+    if args.command == "list":
+        for row in artifacts.recent(args.kind, args.limit):
+            created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["created_at"]))
+            print(f"{created}  {row['digest'][:12]}  {row['kind']:<16} {row['stored_size'] // 1024:>5} KB  "
+                  f"{row['reason'] or '-'}  {row['url'] or ''}".rstrip())
+        print(f"Total stored: {artifacts.total_bytes() / 1024 / 1024:.1f} MB")
+    elif args.command == "show":
+        try:
+            content = artifacts.get(args.digest)
+        except KeyError as exc:
+            print(f"Error: {exc.args[0]}", file=sys.stderr)
+            return 1
+        if args.output:
+            Path(args.output).write_bytes(content)
+        else:
+            sys.stdout.buffer.write(content)
+    else:
+        print(f"Removed {artifacts.enforce_limits()} artifact(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
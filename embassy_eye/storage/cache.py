@@ -0,0 +1,23 @@
+"""
+On-disk cache for generated files that can be rebuilt at any time.
+
+Lives at EMBASSY_EYE_CACHE_DIR (default: $XDG_CACHE_HOME/embassy-eye, i.e.
+~/.cache/embassy-eye), outside the working directory so the Docker bind
+mount of the project root does not hide what the image build pre-warmed.
+"""
+
+from pathlib import Path
+
+from ..config.settings import get_settings
+
+
+def get_cache_root() -> Path:
+    """The cache directory from the settings (not created)."""
+    return Path(get_settings().cache_dir)
+
+
+def get_cache_dir(name: str) -> Path:
+    """Return (and create) a private subdirectory of the cache."""
+    path = get_cache_root() / name
+    path.mkdir(parents=True, exist_ok=True, mode=0o700)
+    return path
@@ -0,0 +1,227 @@
+"""
+Embedded SQLite event store for run history and persistent state.
+
+Replaces the ad-hoc JSON/log files (captcha cooldown, Italy blocked accounts and
+rotation pointer, blocked IP log, saved HTML) with one WAL-mode database so
+readers never block the writer and lookups are indexed queries.
+
+The database lives at EMBASSY_EYE_DB (default: embassy_eye.db in the working
+directory, next to the legacy state files).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import get_settings
+
+DEFAULT_DB_PATH = "embassy_eye.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    scraper     TEXT NOT NULL,
+    location    TEXT,
+    ip          TEXT,
+    started_at  REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id      TEXT,
+    scraper     TEXT NOT NULL,
+    location    TEXT NOT NULL,
+    outcome     TEXT NOT NULL,
+    ip          TEXT,
+    detail      TEXT,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outcomes_location_time ON outcomes (location, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_outcomes_outcome_time ON outcomes (outcome, created_at DESC);
+CREATE TABLE IF NOT EXISTS ips (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    ip          TEXT NOT NULL,
+    event       TEXT NOT NULL,
+    location    TEXT,
+    run_id      TEXT,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ips_ip_event ON ips (ip, event, created_at DESC);
+CREATE TABLE IF NOT EXISTS credentials (
+    scraper     TEXT NOT NULL,
+    email       TEXT NOT NULL,
+    label       TEXT,
+    status      TEXT NOT NULL,
+    reason      TEXT,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (scraper, email)
+);
+CREATE INDEX IF NOT EXISTS idx_credentials_status ON credentials (scraper, status);
+CREATE TABLE IF NOT EXISTS artifacts (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id      TEXT,
+    kind        TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    size        INTEGER,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_kind_time ON artifacts (kind, created_at DESC);
+CREATE TABLE IF NOT EXISTS state (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    updated_at  REAL NOT NULL
+);
+"""
+
+
+class EventStore:
+    """Thread-safe wrapper around one SQLite connection in WAL mode."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or get_settings().event_db or DEFAULT_DB_PATH).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(SCHEMA)
+
+    def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def executescript(self, script: str) -> None:
+        """Run DDL for tables owned by other modules (e.g. netstate)."""
+        with self._lock:
+            self._conn.executescript(script)
+
+    def query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- runs / outcomes -------------------------------------------------
+
+    def start_run(self, run_id: str, scraper: str, location: Optional[str] = None, ip: Optional[str] = None) -> None:
+        self.execute(
+            "INSERT OR IGNORE INTO runs (run_id, scraper, location, ip, started_at) VALUES (?, ?, ?, ?, ?)",
+            (run_id, scraper, location, ip, time.time()),
+        )
+
+    def finish_run(self, run_id: str, ip: Optional[str] = None) -> None:
+        self.execute(
+            "UPDATE runs SET finished_at = ?, ip = COALESCE(?, ip) WHERE run_id = ?",
+            (time.time(), ip, run_id),
+        )
+
+    def record_outcome(self, scraper: str, location: str, outcome: str, ip: Optional[str] = None,
+                       run_id: Optional[str] = None, detail: Optional[Dict[str, Any]] = None) -> None:
+        self.execute(
+            "INSERT INTO outcomes (run_id, scraper, location, outcome, ip, detail, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, scraper, location, outcome, ip, json.dumps(detail) if detail else None, time.time()),
+        )
+
+    def last_outcomes(self, location: str, limit: int = 10) -> List[Dict[str, Any]]:
+        rows = self.query(
+            "SELECT run_id, scraper, location, outcome, ip, created_at FROM outcomes "
+            "WHERE location = ? ORDER BY created_at DESC LIMIT ?",
+            (location, limit),
+        )
+        return [dict(row) for row in rows]
+
+    # -- IPs ---------------------------------------------------------------
+
+    def record_ip_event(self, ip: str, event: str, location: Optional[str] = None, run_id: Optional[str] = None) -> None:
+        self.execute(
+            "INSERT INTO ips (ip, event, location, run_id, created_at) VALUES (?, ?, ?, ?, ?)",
+            (ip, event, location, run_id, time.time()),
+        )
+
+    # -- credentials -------------------------------------------------------
+
+    def set_credential_status(self, scraper: str, email: str, status: str,
+                              label: Optional[str] = None, reason: Optional[str] = None,
+                              updated_at: Optional[float] = None) -> None:
+        self.execute(
+            "INSERT INTO credentials (scraper, email, label, status, reason, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(scraper, email) DO UPDATE SET label = excluded.label, status = excluded.status, "
+            "reason = excluded.reason, updated_at = excluded.updated_at",
+            (scraper, email.strip().lower(), label, status, reason, updated_at or time.time()),
+        )
+
+    def credentials_with_status(self, scraper: str, status: str) -> List[Dict[str, Any]]:
+        rows = self.query(
+            "SELECT email, label, status, reason, updated_at FROM credentials WHERE scraper = ? AND status = ?",
+            (scraper, status),
+        )
+        return [dict(row) for row in rows]
+
+    def has_credentials(self, scraper: str) -> bool:
+        return bool(self.query("SELECT 1 FROM credentials WHERE scraper = ? LIMIT 1", (scraper,)))
+
+    # -- artifacts ---------------------------------------------------------
+
+    def record_artifact(self, kind: str, path: str, size: Optional[int] = None, run_id: Optional[str] = None) -> None:
+        self.execute(
+            "INSERT INTO artifacts (run_id, kind, path, size, created_at) VALUES (?, ?, ?, ?, ?)",
+            (run_id, kind, str(path), size, time.time()),
+        )
+
+    # -- key/value state ---------------------------------------------------
+
+    def get_state(self, key: str) -> Optional[Any]:
+        rows = self.query("SELECT value FROM state WHERE key = ?", (key,))
+        return json.loads(rows[0]["value"]) if rows else None
+
+    def set_state(self, key: str, value: Any) -> None:
+        self.execute(
+            "INSERT INTO state (key, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (key, json.dumps(value), time.time()),
+        )
+
+    def delete_state(self, key: str) -> None:
+        self.execute("DELETE FROM state WHERE key = ?", (key,))
+
+
+_stores: Dict[str, EventStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_event_store(path: Optional[str] = None) -> EventStore:
+    """Return the shared EventStore for a database path (EMBASSY_EYE_DB by default)."""
+    resolved = str(Path(path or get_settings().event_db or DEFAULT_DB_PATH).expanduser().resolve())
+    with _stores_lock:
+        store = _stores.get(resolved)
+        if store is None:
+            store = EventStore(resolved)
+            _stores[resolved] = store
+        return store
+
+
+def import_legacy_json(path: Path) -> Optional[Any]:
+    """
+    Read a legacy JSON state file for one-time migration into the store.
+
+    The file is renamed to *.migrated afterwards so it is imported only once.
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except Exception:
+        return None
+    try:
+        path.replace(path.with_name(path.name + ".migrated"))
+    except Exception:
+        pass
+    return data
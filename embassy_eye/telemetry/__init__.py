@@ -0,0 +1,13 @@
+"""
+Telemetry subpackage: logging backend and run correlation.
+"""
+
+from .logs import bind_run, configure_logging, get_logger, get_run_id, new_run_id
+
+__all__ = [
+    "bind_run",
+    "configure_logging",
+    "get_logger",
+    "get_run_id",
+    "new_run_id",
+]
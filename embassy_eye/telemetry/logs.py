@@ -0,0 +1,143 @@
+"""
+Logging backend for embassy-eye.
+
+All modules log through get_logger(__name__). Records are pushed onto an
+in-memory queue and written by a QueueListener thread, so console I/O never
+blocks the scraping thread. Every record carries the current run id so lines
+from concurrent runs (or a run and its Telegram/VPN side effects) can be
+correlated.
+
+Environment (read through get_settings(), so .env applies):
+    EMBASSY_EYE_LOG_LEVEL: DEBUG, INFO (default), WARNING, ERROR.
+    EMBASSY_EYE_LOG_FORMAT: "text" (default) or "json" (one object per line).
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+ROOT_LOGGER_NAME = "embassy_eye"
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_run_id: contextvars.ContextVar[str] = contextvars.ContextVar("embassy_eye_run_id", default="-")
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RunIdFilter(logging.Filter):
+    """Stamp each record with the run id active where it was emitted."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _run_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, suitable for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "run_id": getattr(record, "run_id", "-"),
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def _logging_settings():
+    """The settings (with .env applied); defaults when they do not parse, which the runner reports later."""
+    # Imported here: the config package imports telemetry
+    from ..config.settings import Settings, SettingsError, get_settings
+
+    try:
+        return get_settings()
+    except SettingsError:
+        return Settings()
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT, DATE_FORMAT)
+
+
+def configure_logging() -> None:
+    """Install the queue handler on the package root logger (idempotent)."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        settings = _logging_settings()
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        root.setLevel(getattr(logging, settings.log_level, logging.INFO))
+        root.propagate = False
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(_build_formatter(settings.log_format))
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        # Filter on the producer side: the contextvar is only visible on the emitting thread
+        queue_handler.addFilter(RunIdFilter())
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _configure_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger under the embassy_eye hierarchy, configuring the backend on first use."""
+    configure_logging()
+    if name != ROOT_LOGGER_NAME and not name.startswith(ROOT_LOGGER_NAME + "."):
+        name = f"{ROOT_LOGGER_NAME}.{name}"
+    return logging.getLogger(name)
+
+
+def new_run_id() -> str:
+    """Generate a short correlation id for one scraper run."""
+    return uuid.uuid4().hex[:12]
+
+
+def get_run_id() -> str:
+    return _run_id.get()
+
+
+@contextmanager
+def bind_run(run_id: Optional[str] = None):
+    """
+    Bind a run id to every log record emitted inside the block.
+
+    Yields:
+        The bound run id.
+    """
+    run_id = run_id or new_run_id()
+    token = _run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _run_id.reset(token)
@@ -0,0 +1,389 @@
+"""
+Prometheus/OpenMetrics metrics for embassy-eye runs.
+
+A small in-process registry (Counter, Gauge, Histogram) rendered in the
+OpenMetrics text format, so no client library is needed. Two ways out:
+
+    EMBASSY_EYE_METRICS_PORT: serve /metrics over HTTP (daemon mode).
+    EMBASSY_EYE_METRICS_TEXTFILE: write the metrics to this path on exit for
+        the node_exporter textfile collector (cron mode). Counters and
+        histograms are seeded from the previous file so they stay cumulative
+        across runs.
+"""
+
+import atexit
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} {self.metric_type}", f"# HELP {self.name} {self.documentation}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing value. The exposed sample name gets a _total suffix."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (current state)."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed observations with _bucket, _sum and _count samples."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def _series(self, key: LabelValues) -> List[float]:
+        series = self._values.get(key)
+        if series is None:
+            series = [0.0] * (len(self.buckets) + 2)
+            self._values[key] = series
+        return series
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series(key)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        for key, series in items:
+            for index, bound in enumerate(self.buckets):
+                le = ("le", _format_value(bound))
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(series[index])}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(series[-1])}"
+
+
+class MetricsRegistry:
+    """Holds every metric and renders the exposition text."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def seed_from_text(self, text: str) -> None:
+        """Add counter and histogram samples from a previous exposition (textfile mode)."""
+        sample_re = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(.*)\})?\s+(\S+)$')
+        label_re = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+        for line in text.splitlines():
+            match = sample_re.match(line)
+            if not match:
+                continue
+            sample_name, _, label_text, raw_value = match.groups()
+            try:
+                value = float(raw_value)
+            except ValueError:
+                continue
+            labels = dict(label_re.findall(label_text or ""))
+            for metric in self._metrics.values():
+                if isinstance(metric, Counter) and sample_name == f"{metric.name}_total":
+                    metric.inc(value, **labels)
+                elif isinstance(metric, Histogram) and sample_name.startswith(metric.name + "_"):
+                    suffix = sample_name[len(metric.name) + 1:]
+                    with metric._lock:
+                        series = metric._series(metric._key(labels))
+                        if suffix == "sum":
+                            series[-2] += value
+                        elif suffix == "count":
+                            series[-1] += value
+                        elif suffix == "bucket":
+                            le = labels.get("le")
+                            bound = float("inf") if le == "+Inf" else float(le)
+                            if bound in metric.buckets:
+                                series[metric.buckets.index(bound)] += value
+
+
+REGISTRY = MetricsRegistry()
+
+RUN_OUTCOMES = REGISTRY.register(Counter(
+    "embassy_eye_run_outcomes",
+    "Scraper run outcomes (slots, busy, captcha, email_verification, ip_blocked, no_fields_filled, ...).",
+    ("scraper", "location", "outcome"),
+))
+STEP_DURATION = REGISTRY.register(Histogram(
+    "embassy_eye_step_duration_seconds",
+    "Duration of individual scraper steps.",
+    ("scraper", "step"),
+))
+COOLDOWN_ACTIVE = REGISTRY.register(Gauge(
+    "embassy_eye_captcha_cooldown_active",
+    "1 while runs are being skipped because of a captcha cooldown.",
+))
+COOLDOWN_SKIPPED_RUNS = REGISTRY.register(Gauge(
+    "embassy_eye_captcha_cooldown_skipped_runs",
+    "Runs skipped so far in the current captcha cooldown.",
+))
+BLOCKED_CREDENTIALS = REGISTRY.register(Gauge(
+    "embassy_eye_blocked_credentials",
+    "Number of credentials currently marked as blocked.",
+    ("scraper",),
+))
+PREFLIGHT_PHASE_DURATION = REGISTRY.register(Histogram(
+    "embassy_eye_preflight_phase_seconds",
+    "Pre-flight probe latency per phase (dns, connect, tls, ttfb).",
+    ("target", "phase"),
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0),
+))
+PREFLIGHT_RESULTS = REGISTRY.register(Counter(
+    "embassy_eye_preflight_results",
+    "Pre-flight probe results (ok or <phase>_failed).",
+    ("target", "result"),
+))
+BLOCKED_REQUESTS = REGISTRY.register(Counter(
+    "embassy_eye_blocked_requests",
+    "Requests aborted by the per-site resource policy.",
+    ("scraper", "resource_type"),
+))
+BANDWIDTH_SAVED = REGISTRY.register(Counter(
+    "embassy_eye_bandwidth_saved_bytes",
+    "Estimated bytes not downloaded because of the resource policy.",
+    ("scraper",),
+))
+BANDWIDTH_BYTES = REGISTRY.register(Counter(
+    "embassy_eye_bandwidth_bytes",
+    "Bytes transferred by scraper runs (encoded, as seen by the browser).",
+    ("scraper", "location"),
+))
+BANDWIDTH_TODAY_BYTES = REGISTRY.register(Gauge(
+    "embassy_eye_bandwidth_today_bytes",
+    "Bytes transferred today, as counted against BANDWIDTH_DAILY_BUDGET_MB.",
+))
+SCREENSHOT_BYTES = REGISTRY.register(Histogram(
+    "embassy_eye_screenshot_bytes",
+    "Encoded size of notification screenshots.",
+    ("format",),
+    buckets=(25_000, 50_000, 100_000, 200_000, 500_000, 1_000_000, 2_000_000, 5_000_000),
+))
+CHROME_RSS_BYTES = REGISTRY.register(Gauge(
+    "embassy_eye_chrome_rss_bytes",
+    "Memory (PSS) of the Chrome/chromedriver process tree behind a browser.",
+    ("browser",),
+))
+CHROME_PROCESSES = REGISTRY.register(Gauge(
+    "embassy_eye_chrome_processes",
+    "Processes in the Chrome/chromedriver tree behind a browser.",
+    ("browser",),
+))
+CHROME_RECYCLES = REGISTRY.register(Counter(
+    "embassy_eye_chrome_recycles",
+    "Browsers the watchdog asked to recycle or killed, by reason.",
+    ("browser", "reason"),
+))
+CHROME_ORPHANS_KILLED = REGISTRY.register(Counter(
+    "embassy_eye_chrome_orphans_killed",
+    "Chrome/chromedriver processes left behind by a timed-out startup and killed.",
+))
+REAPED_RESOURCES = REGISTRY.register(Counter(
+    "embassy_eye_reaped_resources",
+    "Leftover processes and temp directories of dead runs cleaned up by the reaper.",
+    ("kind",),
+))
+TEARDOWN_DURATION = REGISTRY.register(Histogram(
+    "embassy_eye_teardown_seconds",
+    "Time background browser teardowns took.",
+    ("target",),
+))
+LAST_RUN_TIMESTAMP = REGISTRY.register(Gauge(
+    "embassy_eye_last_run_timestamp_seconds",
+    "Unix time the last run of a scraper/location finished.",
+    ("scraper", "location"),
+))
+
+
+def record_outcome(scraper: str, location: str, outcome: str) -> None:
+    """Count one run outcome and stamp the last-run time."""
+    RUN_OUTCOMES.inc(scraper=scraper, location=location, outcome=outcome)
+    LAST_RUN_TIMESTAMP.set(time.time(), scraper=scraper, location=location)
+
+
+@contextmanager
+def time_step(scraper: str, step: str):
+    """Observe the wall time of the enclosed block, even if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STEP_DURATION.observe(time.perf_counter() - started, scraper=scraper, step=step)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_textfile_registered = False
+_setup_lock = threading.Lock()
+
+
+def start_http_server(port: int, addr: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread."""
+    global _server
+    with _setup_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info(f"Metrics available at http://{addr}:{port}/metrics")
+        return _server
+
+
+def write_textfile(path: str) -> None:
+    """Atomically write the current metrics for the node_exporter textfile collector."""
+    target = Path(path)
+    tmp_path = target.with_name(target.name + f".{os.getpid()}.tmp")
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(REGISTRY.render(), encoding="utf-8")
+        tmp_path.replace(target)
+    except Exception as exc:
+        logger.warning(f"⚠ Failed to write metrics textfile {target}: {exc}")
+
+
+def setup_metrics_export() -> None:
+    """Enable the exporters configured through the environment (idempotent)."""
+    global _textfile_registered
+    # Imported here: the config package imports telemetry
+    from ..config.settings import get_settings
+
+    settings = get_settings()
+    port = settings.metrics_port
+    if port:
+        try:
+            start_http_server(port, settings.metrics_addr)
+        except OSError as exc:
+            logger.warning(f"⚠ Could not start metrics endpoint on port {port}: {exc}")
+
+    textfile = settings.metrics_textfile
+    with _setup_lock:
+        if textfile and not _textfile_registered:
+            try:
+                REGISTRY.seed_from_text(Path(textfile).read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                pass
+            except Exception as exc:
+                logger.warning(f"⚠ Could not read previous metrics textfile {textfile}: {exc}")
+            atexit.register(write_textfile, textfile)
+            _textfile_registered = True
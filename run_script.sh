@@ -61,20 +61,49 @@ get_vpn_country() {
     esac
 }
 
-select_random_vpn() {
-    VPN_NAME="${VPN_OPTIONS[$RANDOM % ${#VPN_OPTIONS[@]}]}"
+# Record a VPN exit event for the health-scored scheduler (best effort)
+record_vpn_event() {
+    python3 -m embassy_eye.netstate vpn-record "$VPN_NAME" "$@" >/dev/null 2>&1 || true
+}
+
+# Pick the next exit by health score (success rate, connect latency, TTFB,
+# recent blocks) via embassy_eye.netstate; exits passed as arguments are
+# skipped. Falls back to a uniform random choice if the scheduler can't run.
+select_vpn() {
+    local exclude_args=()
+    local name
+    for name in "$@"; do
+        exclude_args+=(--exclude "$name")
+    done
+
+    local picked
+    picked=$(python3 -m embassy_eye.netstate vpn-pick "${exclude_args[@]}" "${VPN_OPTIONS[@]}" 2>/dev/null)
+    if [[ " ${VPN_OPTIONS[*]} " == *" $picked "* ]] && [ -n "$picked" ]; then
+        VPN_NAME="$picked"
+        VPN_SELECTION="health-scored"
+    else
+        local remaining=()
+        for name in "${VPN_OPTIONS[@]}"; do
+            [[ " $* " == *" $name "* ]] || remaining+=("$name")
+        done
+        [ ${#remaining[@]} -eq 0 ] && remaining=("${VPN_OPTIONS[@]}")
+        VPN_NAME="${remaining[$RANDOM % ${#remaining[@]}]}"
+        VPN_SELECTION="randomly chosen"
+    fi
     VPN_UP_CMD="sudo wg-quick up $VPN_NAME"
     VPN_DOWN_CMD="sudo wg-quick down $VPN_NAME"
     VPN_COUNTRY=$(get_vpn_country "$VPN_NAME")
-    echo "$(date): Selected VPN: $VPN_NAME - $VPN_COUNTRY (randomly chosen from ${#VPN_OPTIONS[@]} available VPNs)"
+    echo "$(date): Selected VPN: $VPN_NAME - $VPN_COUNTRY ($VPN_SELECTION from ${#VPN_OPTIONS[@]} available VPNs)"
 }
 
-select_random_vpn
+select_vpn
 
 # Function to start VPN
 start_vpn() {
     VPN_COUNTRY=$(get_vpn_country "$VPN_NAME")
     echo "$(date): Starting VPN: $VPN_NAME - $VPN_COUNTRY"
+    local started_ms
+    started_ms=$(date +%s%3N)
     $VPN_UP_CMD 2>&1
     VPN_UP_EXIT=$?
 
@@ -85,14 +114,23 @@ start_vpn() {
             return 0
         else
             echo "$(date): ERROR: Failed to start VPN $VPN_NAME - $VPN_COUNTRY (exit code $VPN_UP_EXIT)"
+            record_vpn_event connect_failed
             return $VPN_UP_EXIT
         fi
     else
         echo "$(date): VPN started successfully: $VPN_NAME - $VPN_COUNTRY"
     fi
 
-    # Wait a moment for VPN to establish connection
-    sleep 5
+    # Wait for the first WireGuard handshake (at most 5 seconds) instead of a fixed sleep
+    local waited=0
+    while [ $waited -lt 25 ]; do
+        if sudo wg show "$VPN_NAME" latest-handshakes 2>/dev/null | awk '$2 > 0 { found = 1 } END { exit !found }'; then
+            break
+        fi
+        sleep 0.2
+        waited=$((waited + 1))
+    done
+    record_vpn_event connected --ms $(( $(date +%s%3N) - started_ms ))
     return 0
 }
 
@@ -105,12 +143,26 @@ get_public_ip() {
     echo "$ip"
 }
 
+# Exact/CIDR lookup with TTL expiry via embassy_eye.netstate (indexed SQLite table).
+# Falls back to an exact-match scan of the legacy log if the Python check can't run.
 ip_is_blocked() {
     local ip="$1"
-    if [ -z "$ip" ] || [ ! -f "$BLOCKED_IPS_FILE" ]; then
+    if [ -z "$ip" ]; then
+        return 1
+    fi
+
+    # Match on the printed verdict: a crashed interpreter also exits 1
+    local verdict
+    verdict=$(python3 -m embassy_eye.netstate check "$ip" 2>/dev/null)
+    case "$verdict" in
+        "$ip not blocked") return 1 ;;
+        "$ip blocked by "*) return 0 ;;
+    esac
+
+    if [ ! -f "$BLOCKED_IPS_FILE" ]; then
         return 1
     fi
-    grep -Fq "$ip" "$BLOCKED_IPS_FILE"
+    grep -Eq -- " - ${ip//./\\.}\$" "$BLOCKED_IPS_FILE"
 }
 
 log_vpn_usage() {
@@ -124,6 +176,7 @@ log_vpn_usage() {
     # Format: timestamp - country - IP
     local timestamp=$(date '+%Y-%m-%d %H:%M:%S')
     echo "$timestamp - $country - $ip" >> "$VPN_USAGE_LOG"
+    record_vpn_event assigned --ip "$ip"
 }
 
 ensure_vpn_ip_allowed() {
@@ -143,13 +196,14 @@ ensure_vpn_ip_allowed() {
         
         if ip_is_blocked "$CURRENT_IP"; then
             echo "$(date): Detected blocked IP ($CURRENT_IP). Attempt $attempt/$MAX_VPN_IP_ATTEMPTS."
+            record_vpn_event ip_blocked --ip "$CURRENT_IP"
             if [ $attempt -eq $MAX_VPN_IP_ATTEMPTS ]; then
                 echo "$(date): ERROR: Reached maximum VPN retries with blocked IPs."
                 return 1
             fi
             echo "$(date): Restarting VPN to obtain a different IP..."
             shutdown_vpn
-            select_random_vpn
+            select_vpn "$VPN_NAME"
             if ! start_vpn; then
                 echo "$(date): WARNING: Failed to restart VPN while rotating IP. Attempt $attempt/$MAX_VPN_IP_ATTEMPTS."
                 attempt=$((attempt + 1))
@@ -172,14 +226,34 @@ test_target_website_connectivity() {
     local timeout=10
     
     echo "$(date): Testing connectivity to target website ($url)..."
-    
-    # Try using curl first (more reliable)
+
+    # Phase-timed probe (DNS/connect/TLS/TTFB with short per-phase timeouts);
+    # the VPN is host-level, so bypass any proxy configured for the containers.
+    # Exit 0 = reachable, 1 with a verdict = unreachable; anything else means the
+    # probe itself could not run (a crashed interpreter also exits 1, silently).
+    local preflight_output preflight_exit
+    preflight_output=$(python3 -m embassy_eye.netstate preflight "$url" --proxy '' --exit "$VPN_NAME" 2>/dev/null)
+    preflight_exit=$?
+    if [ $preflight_exit -eq 0 ]; then
+        echo "$(date): ✓ Target website: $preflight_output"
+        return 0
+    elif [ $preflight_exit -eq 1 ] && [ -n "$preflight_output" ]; then
+        echo "$(date): ✗ Target website: $preflight_output"
+        return 1
+    fi
+
+    # Fall back to curl (also reports time to first byte)
     if command -v curl &> /dev/null; then
-        if curl -s --max-time "$timeout" --head "$url" &>/dev/null; then
-            echo "$(date): ✓ Target website: OK (curl test passed)"
+        local ttfb
+        if ttfb=$(curl -s -o /dev/null --max-time "$timeout" --head -w '%{time_starttransfer}' "$url" 2>/dev/null); then
+            local ttfb_ms
+            ttfb_ms=$(awk -v t="$ttfb" 'BEGIN { printf "%d", t * 1000 }')
+            echo "$(date): ✓ Target website: OK (curl test passed, first byte after ${ttfb_ms}ms)"
+            record_vpn_event reachable --ms "$ttfb_ms"
             return 0
         else
             echo "$(date): ✗ Target website: FAILED (curl test failed)"
+            record_vpn_event unreachable
             return 1
         fi
     # Fallback to wget if curl is not available
@@ -219,10 +293,10 @@ except:
 establish_vpn_connection() {
     local tried_vpns=()
     local total_vpns=${#VPN_OPTIONS[@]}
-    local max_connectivity_attempts=5
+    local max_connectivity_attempts=3
 
     while [ ${#tried_vpns[@]} -lt $total_vpns ]; do
-        select_random_vpn
+        select_vpn "${tried_vpns[@]}"
 
         if [[ " ${tried_vpns[*]} " == *" $VPN_NAME "* ]]; then
             continue
@@ -248,8 +322,8 @@ establish_vpn_connection() {
                 else
                     echo "$(date): Connectivity test failed. Attempt $connectivity_attempt/$max_connectivity_attempts"
                     if [ $connectivity_attempt -lt $max_connectivity_attempts ]; then
-                        echo "$(date): Waiting 3 seconds before retry..."
-                        sleep 3
+                        echo "$(date): Waiting 2 seconds before retry..."
+                        sleep 2
                     fi
                     connectivity_attempt=$((connectivity_attempt + 1))
                 fi
@@ -297,7 +371,8 @@ shutdown_vpn() {
 trap shutdown_vpn EXIT INT TERM
 
 # Function to run Hungary script with IP block retry logic
-# Exit code 2 means IP was blocked - will rotate VPN and retry
+# Exit code 2 means IP was blocked, 3 means the booking site was unreachable
+# from this exit - both rotate VPN and retry
 run_hungary_with_ip_retry() {
     local max_ip_retries=3
     local ip_retry_attempt=1
@@ -323,13 +398,18 @@ run_hungary_with_ip_retry() {
         if [ $hungary_exit -eq 0 ]; then
             echo "$(date): Hungary script completed successfully"
             return 0
-        elif [ $hungary_exit -eq 2 ]; then
-            # Exit code 2 = IP blocked
-            echo "$(date): Hungary script detected IP block (exit code 2)"
+        elif [ $hungary_exit -eq 2 ] || [ $hungary_exit -eq 3 ]; then
+            # Exit code 2 = IP blocked, 3 = booking site unreachable (pre-flight failed)
+            if [ $hungary_exit -eq 2 ]; then
+                echo "$(date): Hungary script detected IP block (exit code 2)"
+            else
+                echo "$(date): Hungary script pre-flight could not reach the booking site (exit code 3)"
+                record_vpn_event unreachable
+            fi
             if [ $ip_retry_attempt -lt $max_ip_retries ]; then
                 echo "$(date): Rotating VPN IP and retrying..."
                 shutdown_vpn
-                select_random_vpn
+                select_vpn "$VPN_NAME"
                 if ! start_vpn; then
                     echo "$(date): ERROR: Failed to restart VPN after IP block. Attempt $ip_retry_attempt/$max_ip_retries."
                     ip_retry_attempt=$((ip_retry_attempt + 1))
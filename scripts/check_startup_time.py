@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Startup-time regression check for the fill_form entry point.
+
+Imports the runner and each scraper in a fresh interpreter under
+`python -X importtime` and fails (exit 1) when:
+  - the import time of embassy_eye code and its dependencies exceeds the budget, or
+  - a scraper pulls in another scraper's browser stack (Hungary must not load
+    Playwright, Italy must not load Selenium/undetected-chromedriver).
+
+A scraper whose dependencies are not installed is reported as SKIP.
+
+    python scripts/check_startup_time.py [--scraper hungary] [--budget-ms runner=300 --budget-ms hungary=2000]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# What each target imports, and the modules it must never load
+TARGETS = {
+    "runner": "import embassy_eye.runner.fill_form",
+    "hungary": "from embassy_eye.scrapers import load_scraper; load_scraper('hungary')",
+    "italy": "from embassy_eye.scrapers import load_scraper; load_scraper('italy')",
+    "italy-async": "from embassy_eye.scrapers import load_scraper; load_scraper('italy-async')",
+}
+FORBIDDEN = {
+    "runner": ("selenium", "undetected_chromedriver", "playwright"),
+    "hungary": ("playwright",),
+    "italy": ("selenium", "undetected_chromedriver"),
+    "italy-async": ("selenium", "undetected_chromedriver"),
+}
+# Default budgets in milliseconds (cumulative import time, excluding interpreter startup)
+BUDGETS_MS = {
+    "runner": 300.0,
+    "hungary": 2500.0,
+    "italy": 2500.0,
+    "italy-async": 2500.0,
+}
+
+# "import time:       123 |       4567 |     package.module"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def _importtime(code):
+    """Run code under -X importtime; return (returncode, stderr lines)."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(PROJECT_ROOT), env=env, capture_output=True, text=True,
+    )
+    return result.returncode, result.stderr.splitlines()
+
+
+def _parse(lines):
+    """Return [(module, cumulative_us, depth)] from importtime output."""
+    entries = []
+    for line in lines:
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append((match.group(4), int(match.group(2)), len(match.group(3)) // 2))
+    return entries
+
+
+def check(name, baseline, budget_ms):
+    """Check one target; returns True if it passes (or is skipped)."""
+    returncode, lines = _importtime(TARGETS[name])
+    if returncode != 0:
+        missing = next((line for line in reversed(lines) if "ModuleNotFoundError" in line), None)
+        if missing:
+            print(f"SKIP {name:<12} {missing.split(':', 1)[-1].strip()}")
+            return True
+        print(f"FAIL {name:<12} import failed:\n" + "\n".join(lines[-10:]))
+        return False
+
+    entries = _parse(lines)
+    imported = {module.split(".")[0] for module, _, _ in entries}
+    # Top-level imports made by the target, not by interpreter startup
+    total_ms = sum(us for module, us, depth in entries if depth == 0 and module not in baseline) / 1000
+    forbidden = sorted(imported & set(FORBIDDEN[name]))
+
+    ok = total_ms <= budget_ms and not forbidden
+    slowest = sorted(
+        ((module, us) for module, us, depth in entries if depth == 0 and module not in baseline),
+        key=lambda item: item[1], reverse=True,
+    )[:3]
+    detail = ", ".join(f"{module} {us / 1000:.0f}ms" for module, us in slowest)
+    print(f"{'OK  ' if ok else 'FAIL'} {name:<12} {total_ms:7.1f}ms / {budget_ms:.0f}ms budget  ({detail})")
+    if forbidden:
+        print(f"     {name} imported {', '.join(forbidden)}")
+    return ok
+
+
+def _parse_budget(value):
+    target, _, ms = value.partition("=")
+    if target not in TARGETS or not ms:
+        raise argparse.ArgumentTypeError(f"expected TARGET=MS with TARGET in {', '.join(TARGETS)}")
+    return target, float(ms)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check import-time budgets of the fill_form entry point")
+    parser.add_argument("--scraper", action="append", choices=list(TARGETS),
+                        help="Target to check (repeatable; default: all)")
+    parser.add_argument("--budget-ms", action="append", type=_parse_budget, default=[],
+                        help="Override a budget, e.g. hungary=2000 (repeatable)")
+    args = parser.parse_args(argv)
+
+    budgets = {**BUDGETS_MS, **dict(args.budget_ms)}
+    # Modules the bare interpreter imports at startup (site, encodings, ...) don't count
+    _, baseline_lines = _importtime("pass")
+    baseline = {module for module, _, _ in _parse(baseline_lines)}
+
+    results = [check(name, baseline, budgets[name]) for name in (args.scraper or TARGETS)]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
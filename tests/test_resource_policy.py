@@ -0,0 +1,43 @@
+"""CDP block patterns must never match captcha assets: Network.setBlockedURLs has no allow list."""
+
+import re
+
+import pytest
+
+from embassy_eye.netstate.resource_policy import POLICIES
+
+CAPTCHA_URLS = (
+    "https://www.google.com/recaptcha/api.js",
+    "https://www.google.com/recaptcha/api2/anchor?ar=1&k=site-key",
+    "https://www.gstatic.com/recaptcha/releases/abc123/recaptcha__en.js",
+    "https://www.gstatic.com/recaptcha/api2/logo_48.png",
+    "https://www.gstatic.com/recaptcha/api2/refresh_2x.png?v=2",
+    "https://fonts.gstatic.com/s/roboto/v18/KFOmCnqEu92Fr1Mu4mxK.woff2",
+    "https://www.recaptcha.net/recaptcha/api2/payload/image.jpg",
+)
+
+
+def cdp_matches(pattern: str, url: str) -> bool:
+    """setBlockedURLs semantics: '*' matches any run of characters, everything else is literal."""
+    return re.fullmatch(".*".join(map(re.escape, pattern.split("*"))), url) is not None
+
+
+@pytest.mark.parametrize("site", sorted(POLICIES))
+@pytest.mark.parametrize("url", CAPTCHA_URLS)
+def test_cdp_patterns_leave_captcha_assets_alone(site, url):
+    matching = [pattern for pattern in POLICIES[site].url_patterns() if cdp_matches(pattern, url)]
+    assert matching == []
+
+
+@pytest.mark.parametrize("url", (
+    "https://konzinfobooking.mfa.gov.hu/assets/logo.png",
+    "https://konzinfobooking.mfa.gov.hu/fonts/icons.woff2?v=4",
+    "https://www.google-analytics.com/analytics.js",
+))
+def test_cdp_patterns_still_block_first_party_assets_and_analytics(url):
+    assert any(cdp_matches(pattern, url) for pattern in POLICIES["hungary"].url_patterns())
+
+
+@pytest.mark.parametrize("url", CAPTCHA_URLS[:5])
+def test_route_policy_allows_captcha_assets(url):
+    assert not POLICIES["italy"].should_block(url, "image")